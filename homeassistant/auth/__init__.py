@@ -20,6 +20,11 @@ from .providers import auth_provider_from_config, AuthProvider, LoginFlow
 EVENT_USER_ADDED = "user_added"
 EVENT_USER_REMOVED = "user_removed"
 
+# Most validated access tokens remembered and seconds an access token is
+# accepted after it expired
+ACCESS_TOKEN_CACHE_SIZE = 256
+ACCESS_TOKEN_LEEWAY = 10
+
 _LOGGER = logging.getLogger(__name__)
 _MfaModuleDict = Dict[str, MultiFactorAuthModule]
 _ProviderKey = Tuple[str, Optional[str]]
@@ -82,6 +87,10 @@ class AuthManager:
         self._store = store
         self._providers = providers
         self._mfa_modules = mfa_modules
+        # Refresh token and expiration of validated access tokens, oldest first
+        self._access_tokens = (
+            OrderedDict()
+        )  # type: OrderedDict[str, Tuple[models.RefreshToken, float]]
         self.login_flow = data_entry_flow.FlowManager(
             hass, self._async_create_login_flow, self._async_finish_login_flow
         )
@@ -406,7 +415,27 @@ class AuthManager:
     async def async_validate_access_token(
         self, token: str
     ) -> Optional[models.RefreshToken]:
-        """Return refresh token if an access token is valid."""
+        """Return refresh token if an access token is valid.
+
+        Validated access tokens are remembered until they expire, so only the
+        revocation of their refresh token and the user are checked again.
+        """
+        cached = self._access_tokens.get(token)
+
+        if cached is not None:
+            refresh_token, expire = cached
+            if (
+                dt_util.utcnow().timestamp() <= expire
+                and await self.async_get_refresh_token(refresh_token.id)
+                is refresh_token
+                and refresh_token.user.is_active
+            ):
+                self._access_tokens.move_to_end(token)
+                return refresh_token
+
+            del self._access_tokens[token]
+            return None
+
         try:
             unverif_claims = jwt.decode(token, verify=False)
         except jwt.InvalidTokenError:
@@ -424,13 +453,26 @@ class AuthManager:
             issuer = refresh_token.id
 
         try:
-            jwt.decode(token, jwt_key, leeway=10, issuer=issuer, algorithms=["HS256"])
+            claims = jwt.decode(
+                token,
+                jwt_key,
+                leeway=ACCESS_TOKEN_LEEWAY,
+                issuer=issuer,
+                algorithms=["HS256"],
+            )
         except jwt.InvalidTokenError:
             return None
 
         if refresh_token is None or not refresh_token.user.is_active:
             return None
 
+        self._access_tokens[token] = (
+            refresh_token,
+            claims["exp"] + ACCESS_TOKEN_LEEWAY,
+        )
+        if len(self._access_tokens) > ACCESS_TOKEN_CACHE_SIZE:
+            self._access_tokens.popitem(last=False)
+
         return refresh_token
 
     async def _async_create_login_flow(
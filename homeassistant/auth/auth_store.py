@@ -7,7 +7,9 @@ from logging import getLogger
 from typing import Any, Dict, List, Optional  # noqa: F401
 
 from homeassistant.auth.const import ACCESS_TOKEN_EXPIRATION
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.device_registry import EVENT_DEVICE_REGISTRY_UPDATED
+from homeassistant.helpers.entity_registry import EVENT_ENTITY_REGISTRY_UPDATED
 from homeassistant.util import dt as dt_util
 
 from . import models
@@ -36,6 +38,8 @@ class AuthStore:
         self.hass = hass
         self._users = None  # type: Optional[Dict[str, models.User]]
         self._groups = None  # type: Optional[Dict[str, models.Group]]
+        # Refresh tokens of all users by id, loaded together with the users
+        self._refresh_tokens = {}  # type: Dict[str, models.RefreshToken]
         self._perm_lookup = None  # type: Optional[PermissionLookup]
         self._store = hass.helpers.storage.Store(
             STORAGE_VERSION, STORAGE_KEY, private=True
@@ -141,6 +145,8 @@ class AuthStore:
             assert self._users is not None
 
         self._users.pop(user.id)
+        for token_id in user.refresh_tokens:
+            self._refresh_tokens.pop(token_id, None)
         self._async_schedule_save()
 
     async def async_update_user(
@@ -223,6 +229,7 @@ class AuthStore:
 
         refresh_token = models.RefreshToken(**kwargs)
         user.refresh_tokens[refresh_token.id] = refresh_token
+        self._refresh_tokens[refresh_token.id] = refresh_token
 
         self._async_schedule_save()
         return refresh_token
@@ -235,10 +242,11 @@ class AuthStore:
             await self._async_load()
             assert self._users is not None
 
-        for user in self._users.values():
-            if user.refresh_tokens.pop(refresh_token.id, None):
-                self._async_schedule_save()
-                break
+        found = self._refresh_tokens.pop(refresh_token.id, None)
+
+        if found is not None:
+            found.user.refresh_tokens.pop(found.id, None)
+            self._async_schedule_save()
 
     async def async_get_refresh_token(
         self, token_id: str
@@ -248,12 +256,7 @@ class AuthStore:
             await self._async_load()
             assert self._users is not None
 
-        for user in self._users.values():
-            refresh_token = user.refresh_tokens.get(token_id)
-            if refresh_token is not None:
-                return refresh_token
-
-        return None
+        return self._refresh_tokens.get(token_id)
 
     async def async_get_refresh_token_by_token(
         self, token: str
@@ -303,12 +306,21 @@ class AuthStore:
 
         self._perm_lookup = perm_lookup = PermissionLookup(ent_reg, dev_reg)
 
+        # Permissions by area and device depend on the registries
+        self.hass.bus.async_listen(
+            EVENT_ENTITY_REGISTRY_UPDATED, self._async_entity_registry_updated
+        )
+        self.hass.bus.async_listen(
+            EVENT_DEVICE_REGISTRY_UPDATED, self._async_device_registry_updated
+        )
+
         if data is None:
             self._set_defaults()
             return
 
         users = OrderedDict()  # type: Dict[str, models.User]
         groups = OrderedDict()  # type: Dict[str, models.Group]
+        refresh_tokens = {}  # type: Dict[str, models.RefreshToken]
 
         # Soft-migrating data as we load. We are going to make sure we have a
         # read only group and an admin group. There are two states that we can
@@ -471,10 +483,47 @@ class AuthStore:
                 last_used_ip=rt_dict.get("last_used_ip"),
             )
             users[rt_dict["user_id"]].refresh_tokens[token.id] = token
+            refresh_tokens[token.id] = token
 
         self._groups = groups
+        self._refresh_tokens = refresh_tokens
         self._users = users
 
+    @callback
+    def _async_entity_registry_updated(self, event: Event) -> None:
+        """Invalidate the permissions of an entity that changed device."""
+        data = event.data
+
+        if data["action"] != "update":
+            self._async_invalidate_entities([data["entity_id"]])
+        elif "old_entity_id" in data:
+            self._async_invalidate_entities([data["entity_id"], data["old_entity_id"]])
+        elif "device_id" in data["changes"]:
+            self._async_invalidate_entities([data["entity_id"]])
+
+    @callback
+    def _async_device_registry_updated(self, event: Event) -> None:
+        """Invalidate the permissions of the entities of a device that moved."""
+        data = event.data
+
+        if data["action"] != "update" or "area_id" not in data["changes"]:
+            return
+
+        assert self._perm_lookup is not None
+        entries = self._perm_lookup.entity_registry.async_entries_for_device(
+            data["device_id"]
+        )
+        self._async_invalidate_entities([entry.entity_id for entry in entries])
+
+    @callback
+    def _async_invalidate_entities(self, entity_ids: List[str]) -> None:
+        """Invalidate the cached permissions of entities for all users."""
+        if self._users is None:
+            return
+
+        for user in self._users.values():
+            user.invalidate_entity_permission_cache(entity_ids)
+
     @callback
     def _async_schedule_save(self) -> None:
         """Save users."""
@@ -81,6 +81,11 @@ class User:
         """Invalidate permission cache."""
         self._permissions = None
 
+    def invalidate_entity_permission_cache(self, entity_ids: List[str]) -> None:
+        """Invalidate the permission cache of entities."""
+        if self._permissions is not None:
+            self._permissions.invalidate_entity_cache(entity_ids)
+
 
 @attr.s(slots=True)
 class RefreshToken:
@@ -16,7 +16,7 @@ from typing import (  # noqa: F401
 
 import voluptuous as vol
 
-from .const import CAT_ENTITIES
+from .const import CAT_ENTITIES, POLICY_CONTROL, POLICY_EDIT, POLICY_READ
 from .models import PermissionLookup
 from .types import PolicyType
 from .entities import ENTITY_POLICY_SCHEMA, compile_entities
@@ -28,6 +28,10 @@ POLICY_SCHEMA = vol.Schema({vol.Optional(CAT_ENTITIES): ENTITY_POLICY_SCHEMA})
 
 _LOGGER = logging.getLogger(__name__)
 
+# Bits of the entity access cached per entity id and most cached entities
+ENTITY_POLICY_BITS = {POLICY_READ: 1, POLICY_CONTROL: 2, POLICY_EDIT: 4}
+ENTITY_CACHE_SIZE = 10000
+
 
 class AbstractPermissions:
     """Default permissions class."""
@@ -59,6 +63,7 @@ class PolicyPermissions(AbstractPermissions):
         """Initialize the permission class."""
         self._policy = policy
         self._perm_lookup = perm_lookup
+        self._entity_cache = {}  # type: Dict[str, Tuple[int, int]]
 
     def access_all_entities(self, key: str) -> bool:
         """Check if we have a certain access to all entities."""
@@ -68,6 +73,40 @@ class PolicyPermissions(AbstractPermissions):
         """Return a function that can test entity access."""
         return compile_entities(self._policy.get(CAT_ENTITIES), self._perm_lookup)
 
+    def check_entity(self, entity_id: str, key: str) -> bool:
+        """Check if we can access entity.
+
+        The access to an entity is cached as the bits of the policy keys that
+        were checked and the bits of those that are allowed. The user drops
+        the permissions, and with them the cache, when the policy changes.
+        """
+        bit = ENTITY_POLICY_BITS.get(key)
+
+        if bit is None:
+            return super().check_entity(entity_id, key)
+
+        cached = self._entity_cache.get(entity_id)
+
+        if cached is None:
+            if len(self._entity_cache) >= ENTITY_CACHE_SIZE:
+                self._entity_cache.clear()
+            checked = allowed = 0
+        else:
+            checked, allowed = cached
+            if checked & bit:
+                return bool(allowed & bit)
+
+        if super().check_entity(entity_id, key):
+            allowed |= bit
+
+        self._entity_cache[entity_id] = (checked | bit, allowed)
+        return bool(allowed & bit)
+
+    def invalidate_entity_cache(self, entity_ids: List[str]) -> None:
+        """Drop the cached access to entities moved in the registries."""
+        for entity_id in entity_ids:
+            self._entity_cache.pop(entity_id, None)
+
     def __eq__(self, other: Any) -> bool:
         """Equals check."""
         # pylint: disable=protected-access
@@ -1,10 +1,9 @@
 """Allows the creation of a sensor that filters state property."""
+import asyncio
 import logging
-import statistics
+from array import array
+from bisect import bisect_left, insort
 from collections import deque, Counter
-from numbers import Number
-from functools import partial
-from copy import copy
 from datetime import timedelta
 from typing import Optional
 
@@ -25,7 +24,7 @@ import homeassistant.helpers.config_validation as cv
 from homeassistant.util.decorator import Registry
 from homeassistant.helpers.entity import Entity
 from homeassistant.helpers.event import async_track_state_change
-from homeassistant.components import history
+from homeassistant.components.recorder.preload import async_preload_states
 import homeassistant.util.dt as dt_util
 
 _LOGGER = logging.getLogger(__name__)
@@ -58,6 +57,9 @@ DEFAULT_PRECISION = 2
 DEFAULT_FILTER_RADIUS = 2.0
 DEFAULT_FILTER_TIME_CONSTANT = 10
 
+EPOCH = dt_util.utc_from_timestamp(0)
+ONE_MICROSECOND = timedelta(microseconds=1)
+
 NAME_TEMPLATE = "{} filter"
 ICON = "mdi:chart-line-variant"
 
@@ -171,51 +173,32 @@ class SensorFilter(Entity):
         self._unit_of_measurement = None
         self._state = None
         self._filters = filters
+        self._chain = FilterChain(filters, entity_id)
         self._icon = None
 
     async def async_added_to_hass(self):
         """Register callbacks."""
 
         @callback
-        def filter_sensor_state_listener(entity, old_state, new_state, update_ha=True):
+        def filter_sensor_state_listener(entity, old_state, new_state):
             """Handle device state changes."""
             if new_state.state in [STATE_UNKNOWN, STATE_UNAVAILABLE]:
                 return
 
-            temp_state = new_state
-
             try:
-                for filt in self._filters:
-                    filtered_state = filt.filter_state(copy(temp_state))
-                    _LOGGER.debug(
-                        "%s(%s=%s) -> %s",
-                        filt.name,
-                        self._entity,
-                        temp_state.state,
-                        "skip" if filt.skip_processing else filtered_state.state,
-                    )
-                    if filt.skip_processing:
-                        return
-                    temp_state = filtered_state
+                value = self._chain.filter_state(new_state)
             except ValueError:
-                _LOGGER.error("Could not convert state: %s to number", self._state)
+                _LOGGER.error("Could not convert state: %s to number", new_state.state)
                 return
 
-            self._state = temp_state.state
-
-            if self._icon is None:
-                self._icon = new_state.attributes.get(ATTR_ICON, ICON)
-
-            if self._unit_of_measurement is None:
-                self._unit_of_measurement = new_state.attributes.get(
-                    ATTR_UNIT_OF_MEASUREMENT
-                )
+            if value is None:
+                return
 
-            if update_ha:
-                self.async_schedule_update_ha_state()
+            self._update_state(new_state, value)
+            self.async_schedule_update_ha_state()
 
         if "recorder" in self.hass.config.components:
-            history_list = []
+            history = {}
             largest_window_items = 0
             largest_window_time = timedelta(0)
 
@@ -232,52 +215,53 @@ class SensorFilter(Entity):
                 ):
                     largest_window_time = filt.window_size
 
-            # Retrieve the largest window_size of each type
+            # Retrieve the largest window_size of each type, both with the
+            # history of the other sensors loading at the same time
+            requests = []
             if largest_window_items > 0:
-                filter_history = await self.hass.async_add_job(
-                    partial(
-                        history.get_last_state_changes,
-                        self.hass,
-                        largest_window_items,
-                        entity_id=self._entity,
+                requests.append(
+                    async_preload_states(
+                        self.hass, self._entity, number_of_states=largest_window_items
                     )
                 )
-                if self._entity in filter_history:
-                    history_list.extend(filter_history[self._entity])
             if largest_window_time > timedelta(seconds=0):
                 start = dt_util.utcnow() - largest_window_time
-                filter_history = await self.hass.async_add_job(
-                    partial(
-                        history.state_changes_during_period,
-                        self.hass,
-                        start,
-                        entity_id=self._entity,
-                    )
+                requests.append(
+                    async_preload_states(self.hass, self._entity, start_time=start)
                 )
-                if self._entity in filter_history:
-                    history_list.extend(
-                        [
-                            state
-                            for state in filter_history[self._entity]
-                            if state not in history_list
-                        ]
-                    )
+            for filter_history in await asyncio.gather(*requests):
+                for state in filter_history:
+                    # The windows overlap, states updated at the same time
+                    # with different values are all kept
+                    history.setdefault((state.last_updated, state.state), state)
 
             # Sort the window states
-            history_list = sorted(history_list, key=lambda s: s.last_updated)
-            _LOGGER.debug(
-                "Loading from history: %s",
-                [(s.state, s.last_updated) for s in history_list],
+            history_list = sorted(
+                history.values(), key=lambda state: state.last_updated
             )
+            _LOGGER.debug("Loading %d states from history", len(history_list))
 
             # Replay history through the filter chain
-            prev_state = None
-            for state in history_list:
-                filter_sensor_state_listener(self._entity, prev_state, state, False)
-                prev_state = state
+            indexes, values = self._chain.filter_history(history_list)
+            if indexes:
+                # The icon and unit come from the first state that got through
+                self._update_state(history_list[indexes[0]], values[0])
+                self._update_state(history_list[indexes[-1]], values[-1])
 
         async_track_state_change(self.hass, self._entity, filter_sensor_state_listener)
 
+    def _update_state(self, new_state, value):
+        """Set the filtered value of new_state as the state of the sensor."""
+        self._state = value
+
+        if self._icon is None:
+            self._icon = new_state.attributes.get(ATTR_ICON, ICON)
+
+        if self._unit_of_measurement is None:
+            self._unit_of_measurement = new_state.attributes.get(
+                ATTR_UNIT_OF_MEASUREMENT
+            )
+
     @property
     def name(self):
         """Return the name of the sensor."""
@@ -310,29 +294,120 @@ class SensorFilter(Entity):
         return state_attr
 
 
-class FilterState:
-    """State abstraction for filter usage."""
+def _state_value(state):
+    """Return a state as a float, or unchanged if it is not a number."""
+    try:
+        return float(state)
+    except ValueError:
+        return state
+
+
+def _number(value):
+    """Return value if it is a number, or raise ValueError."""
+    if not isinstance(value, (float, int)):
+        raise ValueError(f"{value} is not a number")
+    return value
+
+
+class RingBuffer:
+    """Window of the last maxlen floats, kept in a circular array."""
+
+    def __init__(self, maxlen):
+        """Initialize an empty window."""
+        self.maxlen = maxlen
+        self._values = array("d", [0.0]) * maxlen
+        self._start = 0
+        self._count = 0
+
+    def __len__(self):
+        """Return the number of values."""
+        return self._count
+
+    def __getitem__(self, index):
+        """Return the value at index, counting from the oldest value."""
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("ring buffer index out of range")
+        return self._values[(self._start + index) % self.maxlen]
+
+    def __iter__(self):
+        """Iterate over the values, oldest first."""
+        for index in range(self._count):
+            yield self._values[(self._start + index) % self.maxlen]
+
+    def append(self, value):
+        """Append a value and return the value it pushed out, or None."""
+        if not self.maxlen:
+            return value
+
+        if self._count < self.maxlen:
+            self._values[(self._start + self._count) % self.maxlen] = value
+            self._count += 1
+            return None
+
+        dropped = self._values[self._start]
+        self._values[self._start] = value
+        self._start = (self._start + 1) % self.maxlen
+        return dropped
+
+
+class FilterChain:
+    """Filters applied one after another to the values of states.
+
+    A state is converted to a timestamp and a value once, which are passed
+    through the filters without copying the state. The history of a sensor
+    is filtered one filter at a time over all its states, instead of one
+    state at a time through all filters.
+    """
+
+    def __init__(self, filters, entity):
+        """Initialize the chain of filters."""
+        self.filters = filters
+        self._entity = entity
+
+    def filter_state(self, new_state):
+        """Return the filtered value of a state, or None if it is skipped."""
+        timestamp = new_state.last_updated
+        value = _state_value(new_state.state)
+
+        for filt in self.filters:
+            filtered = filt.filter_value(timestamp, value)
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.debug(
+                    "%s(%s=%s) -> %s",
+                    filt.name,
+                    self._entity,
+                    value,
+                    "skip" if filt.skip_processing else filtered,
+                )
+            if filt.skip_processing:
+                return None
+            value = filtered
+
+        return value
 
-    def __init__(self, state):
-        """Initialize with HA State object."""
-        self.timestamp = state.last_updated
-        try:
-            self.state = float(state.state)
-        except ValueError:
-            self.state = state.state
+    def filter_history(self, states):
+        """Filter states in one pass per filter.
 
-    def set_precision(self, precision):
-        """Set precision of Number based states."""
-        if isinstance(self.state, Number):
-            self.state = round(float(self.state), precision)
+        Returns the indexes of the states that made it through all filters
+        and their filtered values.
+        """
+        indexes = [
+            index
+            for index, state in enumerate(states)
+            if state.state not in (STATE_UNKNOWN, STATE_UNAVAILABLE)
+        ]
+        timestamps = [states[index].last_updated for index in indexes]
+        values = [_state_value(states[index].state) for index in indexes]
 
-    def __str__(self):
-        """Return state as the string representation of FilterState."""
-        return str(self.state)
+        for filt in self.filters:
+            kept, values = filt.filter_values(timestamps, values)
+            if len(kept) < len(timestamps):
+                indexes = [indexes[position] for position in kept]
+                timestamps = [timestamps[position] for position in kept]
 
-    def __repr__(self):
-        """Return timestamp and state as the representation of FilterState."""
-        return "{} : {}".format(self.timestamp, self.state)
+        return indexes, values
 
 
 class Filter:
@@ -352,17 +427,16 @@ class Filter:
         :param entity: used for debugging only
         """
         if isinstance(window_size, int):
-            self.states = deque(maxlen=window_size)
+            self.states = RingBuffer(window_size)
             self.window_unit = WINDOW_SIZE_UNIT_NUMBER_EVENTS
         else:
-            self.states = deque(maxlen=0)
+            self.states = RingBuffer(0)
             self.window_unit = WINDOW_SIZE_UNIT_TIME
         self.precision = precision
         self._name = name
         self._entity = entity
         self._skip_processing = False
         self._window_size = window_size
-        self._store_raw = False
 
     @property
     def window_size(self):
@@ -379,19 +453,42 @@ class Filter:
         """Return wether the current filter_state should be skipped."""
         return self._skip_processing
 
-    def _filter_state(self, new_state):
-        """Implement filter."""
+    def _round(self, value):
+        """Round a numeric value to the precision of the filter."""
+        if isinstance(value, (float, int)):
+            return round(float(value), self.precision)
+        return value
+
+    def filter_value(self, timestamp, value):
+        """Implement filter, returning the rounded filtered value."""
         raise NotImplementedError()
 
+    def filter_values(self, timestamps, values):
+        """Filter a batch of values.
+
+        Returns the positions of the values that were not skipped and their
+        filtered values. Values that can not be filtered are skipped.
+        """
+        filter_value = self.filter_value
+        kept = []
+        filtered = []
+
+        for position, (timestamp, value) in enumerate(zip(timestamps, values)):
+            try:
+                result = filter_value(timestamp, value)
+            except ValueError:
+                continue
+            if not self._skip_processing:
+                kept.append(position)
+                filtered.append(result)
+
+        return kept, filtered
+
     def filter_state(self, new_state):
         """Implement a common interface for filters."""
-        filtered = self._filter_state(FilterState(new_state))
-        filtered.set_precision(self.precision)
-        if self._store_raw:
-            self.states.append(copy(FilterState(new_state)))
-        else:
-            self.states.append(copy(filtered))
-        new_state.state = filtered.state
+        new_state.state = self.filter_value(
+            new_state.last_updated, _state_value(new_state.state)
+        )
         return new_state
 
 
@@ -419,9 +516,10 @@ class RangeFilter(Filter):
         self._upper_bound = upper_bound
         self._stats_internal = Counter()
 
-    def _filter_state(self, new_state):
+    def filter_value(self, timestamp, value):
         """Implement the range filter."""
-        if self._upper_bound is not None and new_state.state > self._upper_bound:
+        value = _number(value)
+        if self._upper_bound is not None and value > self._upper_bound:
 
             self._stats_internal["erasures_up"] += 1
 
@@ -429,11 +527,11 @@ class RangeFilter(Filter):
                 "Upper outlier nr. %s in %s: %s",
                 self._stats_internal["erasures_up"],
                 self._entity,
-                new_state,
+                value,
             )
-            new_state.state = self._upper_bound
+            value = self._upper_bound
 
-        elif self._lower_bound is not None and new_state.state < self._lower_bound:
+        elif self._lower_bound is not None and value < self._lower_bound:
 
             self._stats_internal["erasures_low"] += 1
 
@@ -441,18 +539,19 @@ class RangeFilter(Filter):
                 "Lower outlier nr. %s in %s: %s",
                 self._stats_internal["erasures_low"],
                 self._entity,
-                new_state,
+                value,
             )
-            new_state.state = self._lower_bound
+            value = self._lower_bound
 
-        return new_state
+        return self._round(value)
 
 
 @FILTERS.register(FILTER_NAME_OUTLIER)
 class OutlierFilter(Filter):
     """BASIC outlier filter.
 
-    Determines if new state is in a band around the median.
+    Determines if new state is in a band around the median. The window is
+    also kept sorted, so the median does not have to be recomputed.
     """
 
     def __init__(self, window_size, precision, entity, radius: float):
@@ -463,14 +562,24 @@ class OutlierFilter(Filter):
         super().__init__(FILTER_NAME_OUTLIER, window_size, precision, entity)
         self._radius = radius
         self._stats_internal = Counter()
-        self._store_raw = True
+        self._sorted = []
+
+    def _median(self):
+        """Return the median of the window."""
+        count = len(self._sorted)
+        middle = count // 2
+        if count % 2:
+            return self._sorted[middle]
+        return (self._sorted[middle - 1] + self._sorted[middle]) / 2
 
-    def _filter_state(self, new_state):
+    def filter_value(self, timestamp, value):
         """Implement the outlier filter."""
-        median = statistics.median([s.state for s in self.states]) if self.states else 0
+        value = _number(value)
+        median = self._median() if self._sorted else 0
+        filtered = value
         if (
             len(self.states) == self.states.maxlen
-            and abs(new_state.state - median) > self._radius
+            and abs(value - median) > self._radius
         ):
 
             self._stats_internal["erasures"] += 1
@@ -479,10 +588,17 @@ class OutlierFilter(Filter):
                 "Outlier nr. %s in %s: %s",
                 self._stats_internal["erasures"],
                 self._entity,
-                new_state,
+                value,
             )
-            new_state.state = median
-        return new_state
+            filtered = median
+
+        # The window holds the raw values
+        dropped = self.states.append(value)
+        insort(self._sorted, value)
+        if dropped is not None:
+            del self._sorted[bisect_left(self._sorted, dropped)]
+
+        return self._round(filtered)
 
 
 @FILTERS.register(FILTER_NAME_LOWPASS)
@@ -494,18 +610,17 @@ class LowPassFilter(Filter):
         super().__init__(FILTER_NAME_LOWPASS, window_size, precision, entity)
         self._time_constant = time_constant
 
-    def _filter_state(self, new_state):
+    def filter_value(self, timestamp, value):
         """Implement the low pass filter."""
-        if not self.states:
-            return new_state
+        value = _number(value)
+        if self.states:
+            new_weight = 1.0 / self._time_constant
+            prev_weight = 1.0 - new_weight
+            value = prev_weight * self.states[-1] + new_weight * value
 
-        new_weight = 1.0 / self._time_constant
-        prev_weight = 1.0 - new_weight
-        new_state.state = (
-            prev_weight * self.states[-1].state + new_weight * new_state.state
-        )
-
-        return new_state
+        value = self._round(value)
+        self.states.append(value)
+        return value
 
 
 @FILTERS.register(FILTER_NAME_TIME_SMA)
@@ -524,33 +639,37 @@ class TimeSMAFilter(Filter):
         """
         super().__init__(FILTER_NAME_TIME_SMA, window_size, precision, entity)
         self._time_window = window_size
+        self._window_microseconds = window_size // ONE_MICROSECOND
+        # Timestamps in microseconds and values of the window, and of the
+        # last value that left it
         self.last_leak = None
         self.queue = deque()
 
     def _leak(self, left_boundary):
         """Remove timeouted elements."""
         while self.queue:
-            if self.queue[0].timestamp + self._time_window <= left_boundary:
+            if self.queue[0][0] + self._window_microseconds <= left_boundary:
                 self.last_leak = self.queue.popleft()
             else:
                 return
 
-    def _filter_state(self, new_state):
+    def filter_value(self, timestamp, value):
         """Implement the Simple Moving Average filter."""
-        self._leak(new_state.timestamp)
-        self.queue.append(copy(new_state))
+        value = _number(value)
+        timestamp = (timestamp - EPOCH) // ONE_MICROSECOND
+        self._leak(timestamp)
+        self.queue.append((timestamp, value))
 
         moving_sum = 0
-        start = new_state.timestamp - self._time_window
-        prev_state = self.last_leak or self.queue[0]
-        for state in self.queue:
-            moving_sum += (state.timestamp - start).total_seconds() * prev_state.state
-            start = state.timestamp
-            prev_state = state
+        start = timestamp - self._window_microseconds
+        prev_value = (self.last_leak or self.queue[0])[1]
+        for state_timestamp, state_value in self.queue:
+            # Dividing the microseconds gives exactly timedelta.total_seconds()
+            moving_sum += (state_timestamp - start) / 1000000 * prev_value
+            start = state_timestamp
+            prev_value = state_value
 
-        new_state.state = moving_sum / self._time_window.total_seconds()
-
-        return new_state
+        return self._round(moving_sum / self._time_window.total_seconds())
 
 
 @FILTERS.register(FILTER_NAME_THROTTLE)
@@ -563,16 +682,18 @@ class ThrottleFilter(Filter):
     def __init__(self, window_size, precision, entity):
         """Initialize Filter."""
         super().__init__(FILTER_NAME_THROTTLE, window_size, precision, entity)
+        self._count = 0
 
-    def _filter_state(self, new_state):
+    def filter_value(self, timestamp, value):
         """Implement the throttle filter."""
-        if not self.states or len(self.states) == self.states.maxlen:
-            self.states.clear()
+        if not self._count or self._count >= self._window_size:
+            self._count = 0
             self._skip_processing = False
         else:
             self._skip_processing = True
 
-        return new_state
+        self._count += 1
+        return self._round(value)
 
 
 @FILTERS.register(FILTER_NAME_TIME_THROTTLE)
@@ -588,13 +709,13 @@ class TimeThrottleFilter(Filter):
         self._time_window = window_size
         self._last_emitted_at = None
 
-    def _filter_state(self, new_state):
+    def filter_value(self, timestamp, value):
         """Implement the filter."""
-        window_start = new_state.timestamp - self._time_window
+        window_start = timestamp - self._time_window
         if not self._last_emitted_at or self._last_emitted_at <= window_start:
-            self._last_emitted_at = new_state.timestamp
+            self._last_emitted_at = timestamp
             self._skip_processing = False
         else:
             self._skip_processing = True
 
-        return new_state
+        return self._round(value)
@@ -1,5 +1,6 @@
 """Provide the functionality to group entities."""
 import asyncio
+from collections import Counter, OrderedDict
 import logging
 
 import voluptuous as vol
@@ -36,6 +37,7 @@ from homeassistant.util.async_ import run_coroutine_threadsafe
 
 
 DOMAIN = "group"
+DATA_EXPANSIONS = "group_expansions"
 
 ENTITY_ID_FORMAT = DOMAIN + ".{}"
 
@@ -148,37 +150,81 @@ def expand_entity_ids(hass, entity_ids):
 
     Async friendly.
     """
-    found_ids = []
+    expansions = hass.data.setdefault(DATA_EXPANSIONS, {})
+    # Ordered set of the found entity ids
+    found_ids = OrderedDict()
+
     for entity_id in entity_ids:
         if not isinstance(entity_id, str):
             continue
 
         entity_id = entity_id.lower()
 
-        try:
-            # If entity_id points at a group, expand it
-            domain, _ = ha.split_entity_id(entity_id)
+        # If entity_id points at a group, expand it
+        if ha.split_entity_id(entity_id)[0] == DOMAIN:
+            members = _expand_group(hass, expansions, entity_id, set())[0]
+            found_ids.update(OrderedDict.fromkeys(members))
+        else:
+            found_ids[entity_id] = None
+
+    return list(found_ids)
+
+
+def _expand_group(hass, expansions, entity_id, expanding):
+    """Return the members of a group with nested groups replaced by theirs.
+
+    Returns the members, the states of the group and its nested groups the
+    members were expanded from and whether a nested group that is being
+    expanded was skipped. Expansions are remembered until one of the states
+    they were expanded from changes. Expansions that skipped a group are not
+    remembered, as they depend on where the cycle was entered.
+    """
+    state = hass.states.get(entity_id)
+    expansion = expansions.get(entity_id)
+
+    if expansion is not None and all(
+        hass.states.get(group_id) is group_state
+        for group_id, group_state in expansion[1].items()
+    ):
+        return expansion[0], expansion[1], False
+
+    members = OrderedDict()
+    sources = {entity_id: state}
+    skipped = False
+
+    if state is not None:
+        expanding.add(entity_id)
 
-            if domain == DOMAIN:
-                child_entities = get_entity_ids(hass, entity_id)
-                if entity_id in child_entities:
-                    child_entities = list(child_entities)
-                    child_entities.remove(entity_id)
-                found_ids.extend(
-                    ent_id
-                    for ent_id in expand_entity_ids(hass, child_entities)
-                    if ent_id not in found_ids
-                )
+        for member in state.attributes.get(ATTR_ENTITY_ID, ()):
+            if not isinstance(member, str):
+                continue
 
-            else:
-                if entity_id not in found_ids:
-                    found_ids.append(entity_id)
+            member = member.lower()
+
+            if ha.split_entity_id(member)[0] != DOMAIN:
+                members[member] = None
+                continue
+
+            if member in expanding:
+                # A group containing itself adds nothing
+                skipped = skipped or member != entity_id
+                continue
+
+            nested, nested_sources, nested_skipped = _expand_group(
+                hass, expansions, member, expanding
+            )
+            members.update(OrderedDict.fromkeys(nested))
+            sources.update(nested_sources)
+            skipped = skipped or nested_skipped
 
-        except AttributeError:
-            # Raised by split_entity_id if entity_id is not a string
-            pass
+        expanding.discard(entity_id)
 
-    return found_ids
+    members = tuple(members)
+
+    if not skipped:
+        expansions[entity_id] = (members, sources)
+
+    return members, sources, skipped
 
 
 @bind_hass
@@ -409,6 +455,12 @@ class Group(Entity):
         self._order = order
         self._assumed_state = False
         self._async_unsub_state_changed = None
+        # If members are on and assumed by entity id of the members with a
+        # state, and how many of them are
+        self._member_states = {}
+        self._on_count = 0
+        self._assumed_count = 0
+        self._write_pending = False
 
     @staticmethod
     def create_group(
@@ -592,17 +644,34 @@ class Group(Entity):
             self._async_unsub_state_changed()
             self._async_unsub_state_changed = None
 
-    async def _async_state_changed_listener(self, entity_id, old_state, new_state):
+    @callback
+    def _async_state_changed_listener(self, entity_id, old_state, new_state):
         """Respond to a member state changing.
 
+        The group state is written once for the members changing before the
+        write runs.
+
         This method must be run in the event loop.
         """
         # removed
         if self._async_unsub_state_changed is None:
             return
 
-        self._async_update_group_state(new_state)
-        await self.async_update_ha_state()
+        self._async_update_group_state(entity_id, new_state)
+
+        if not self._write_pending:
+            self._write_pending = True
+            self.hass.async_create_task(self._async_write_group_state())
+
+    async def _async_write_group_state(self):
+        """Write the group state after members changed."""
+        self._write_pending = False
+
+        # removed
+        if self._async_unsub_state_changed is None:
+            return
+
+        self.async_write_ha_state()
 
     @property
     def _tracking_states(self):
@@ -618,67 +687,135 @@ class Group(Entity):
         return states
 
     @callback
-    def _async_update_group_state(self, tr_state=None):
+    def _async_update_group_state(self, entity_id=None, new_state=None):
         """Update group state.
 
-        Optionally you can provide the only state changed since last update
-        allowing this method to take shortcuts.
+        Optionally you can provide the only member changed since last update,
+        then only the counts of that member are updated instead of counting
+        all members.
 
         This method must be run in the event loop.
         """
-        # To store current states of group entities. Might not be needed.
-        states = None
-        gr_state = self._state
-        gr_on = self.group_on
-        gr_off = self.group_off
-
         # We have not determined type of group yet
-        if gr_on is None:
-            if tr_state is None:
-                states = self._tracking_states
+        if self.group_on is None and new_state is not None:
+            self.group_on, self.group_off = _get_group_on_off(new_state.state)
 
-                for state in states:
-                    gr_on, gr_off = _get_group_on_off(state.state)
-                    if gr_on is not None:
-                        break
-            else:
-                gr_on, gr_off = _get_group_on_off(tr_state.state)
+            # The members counted so far were not compared to the on state
+            if self.group_on is not None:
+                entity_id = None
 
-            if gr_on is not None:
-                self.group_on, self.group_off = gr_on, gr_off
+        if entity_id is None:
+            self._async_count_members()
+        else:
+            self._async_count_member(entity_id, new_state)
 
         # We cannot determine state of the group
-        if gr_on is None:
+        if self.group_on is None:
             return
 
-        # pylint: disable=too-many-boolean-expressions
-        if tr_state is None or (
-            (gr_state == gr_on and tr_state.state == gr_off)
-            or (gr_state == gr_off and tr_state.state == gr_on)
-            or tr_state.state not in (gr_on, gr_off)
-        ):
-            if states is None:
-                states = self._tracking_states
+        if self._test_mode(self._on_count):
+            self._state = self.group_on
+        else:
+            self._state = self.group_off
 
-            if self.mode(state.state == gr_on for state in states):
-                self._state = gr_on
-            else:
-                self._state = gr_off
+        self._assumed_state = self._test_mode(self._assumed_count)
 
-        elif tr_state.state in (gr_on, gr_off):
-            self._state = tr_state.state
+    def _test_mode(self, count):
+        """Test the mode of the group against a count of the members."""
+        if self.mode is all:
+            return count == len(self._member_states)
+        return count > 0
 
-        if (
-            tr_state is None
-            or self._assumed_state
-            and not tr_state.attributes.get(ATTR_ASSUMED_STATE)
-        ):
-            if states is None:
-                states = self._tracking_states
+    @callback
+    def _async_count_members(self):
+        """Count all members from their current states."""
+        states = self._tracking_states
 
-            self._assumed_state = self.mode(
-                state.attributes.get(ATTR_ASSUMED_STATE) for state in states
-            )
+        if self.group_on is None:
+            for state in states:
+                self.group_on, self.group_off = _get_group_on_off(state.state)
+                if self.group_on is not None:
+                    break
+
+        self._member_states = {}
+        self._on_count = self._assumed_count = 0
+
+        for state in states:
+            self._async_count_member(state.entity_id, state)
+
+    @callback
+    def _async_count_member(self, entity_id, new_state):
+        """Replace the counts of a member by the counts of its new state."""
+        counted = self._member_states.pop(entity_id, None)
+
+        if counted is not None:
+            self._on_count -= counted[0]
+            self._assumed_count -= counted[1]
+
+        if new_state is None:
+            return
+
+        counted = self._member_states[entity_id] = (
+            new_state.state == self.group_on,
+            bool(new_state.attributes.get(ATTR_ASSUMED_STATE)),
+        )
+        self._on_count += counted[0]
+        self._assumed_count += counted[1]
+
+
+class GroupUpdateMixin:
+    """Mixin for group platform entities updated from their members.
+
+    The member changes arriving before a scheduled update runs are all
+    handled by that one update.
+    """
+
+    _update_pending = False
+
+    @callback
+    def _async_schedule_group_update(self):
+        """Schedule one update for the members changing before it runs."""
+        if self._update_pending:
+            return
+
+        self._update_pending = True
+        self.hass.async_create_task(self._async_group_update())
+
+    async def _async_group_update(self):
+        """Update the group from its members."""
+        self._update_pending = False
+        await self.async_update_ha_state(True)
 
-        elif tr_state.attributes.get(ATTR_ASSUMED_STATE):
-            self._assumed_state = True
+
+class MemberValues:
+    """Count the values an attribute has across the members of a group.
+
+    Members change one at a time, and aggregates are computed from the
+    counts of the distinct values. Their cost depends on how many distinct
+    values the members have, not on how many members there are.
+    """
+
+    def __init__(self):
+        """Initialize the values without members."""
+        self._values = {}
+        self.counts = Counter()
+
+    def __len__(self):
+        """Return the number of members with a value."""
+        return len(self._values)
+
+    @callback
+    def async_set(self, entity_id, value):
+        """Set the value of a member, None if it has none."""
+        if isinstance(value, list):
+            value = tuple(value)
+
+        old_value = self._values.pop(entity_id, None)
+        if old_value is not None:
+            self.counts[old_value] -= 1
+            if not self.counts[old_value]:
+                del self.counts[old_value]
+
+        if value is not None:
+            self._values[entity_id] = value
+            self.counts[value] += 1
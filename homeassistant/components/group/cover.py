@@ -41,6 +41,8 @@ from homeassistant.components.cover import (
     CoverDevice,
 )
 
+from . import GroupUpdateMixin, MemberValues
+
 _LOGGER = logging.getLogger(__name__)
 
 KEY_OPEN_CLOSE = "open_close"
@@ -63,7 +65,7 @@ async def async_setup_platform(hass, config, async_add_entities, discovery_info=
     async_add_entities([CoverGroup(config[CONF_NAME], config[CONF_ENTITIES])])
 
 
-class CoverGroup(CoverDevice):
+class CoverGroup(GroupUpdateMixin, CoverDevice):
     """Representation of a CoverGroup."""
 
     def __init__(self, name, entities):
@@ -78,19 +80,30 @@ class CoverGroup(CoverDevice):
         self._entities = entities
         self._covers = {KEY_OPEN_CLOSE: set(), KEY_STOP: set(), KEY_POSITION: set()}
         self._tilts = {KEY_OPEN_CLOSE: set(), KEY_STOP: set(), KEY_POSITION: set()}
+        self._member_states = MemberValues()
+        self._member_assumed = MemberValues()
+        self._cover_positions = MemberValues()
+        self._tilt_positions = MemberValues()
 
     @callback
     def update_supported_features(
         self, entity_id, old_state, new_state, update_state=True
     ):
-        """Update dictionaries with supported features."""
+        """Update dictionaries with supported features and member states."""
         if not new_state:
             for values in self._covers.values():
                 values.discard(entity_id)
             for values in self._tilts.values():
                 values.discard(entity_id)
+            for member_values in (
+                self._member_states,
+                self._member_assumed,
+                self._cover_positions,
+                self._tilt_positions,
+            ):
+                member_values.async_set(entity_id, None)
             if update_state:
-                self.async_schedule_update_ha_state(True)
+                self._async_schedule_group_update()
             return
 
         features = new_state.attributes.get(ATTR_SUPPORTED_FEATURES, 0)
@@ -121,8 +134,27 @@ class CoverGroup(CoverDevice):
         else:
             self._tilts[KEY_POSITION].discard(entity_id)
 
+        self._member_states.async_set(entity_id, new_state.state)
+        self._member_assumed.async_set(
+            entity_id, True if new_state.attributes.get(ATTR_ASSUMED_STATE) else None
+        )
+        # Positions of the members supporting them, members without one
+        # count as a differing position
+        self._cover_positions.async_set(
+            entity_id,
+            new_state.attributes.get(ATTR_CURRENT_POSITION)
+            if entity_id in self._covers[KEY_POSITION]
+            else None,
+        )
+        self._tilt_positions.async_set(
+            entity_id,
+            new_state.attributes.get(ATTR_CURRENT_TILT_POSITION)
+            if entity_id in self._tilts[KEY_POSITION]
+            else None,
+        )
+
         if update_state:
-            self.async_schedule_update_ha_state(True)
+            self._async_schedule_group_update()
 
     async def async_added_to_hass(self):
         """Register listeners."""
@@ -234,49 +266,33 @@ class CoverGroup(CoverDevice):
         )
 
     async def async_update(self):
-        """Update state and attributes."""
+        """Update state and attributes from the counted member states."""
         self._assumed_state = False
 
-        self._is_closed = True
-        for entity_id in self._entities:
-            state = self.hass.states.get(entity_id)
-            if not state:
-                continue
-            if state.state != STATE_CLOSED:
-                self._is_closed = False
-                break
+        states = self._member_states
+        self._is_closed = len(states) == states.counts[STATE_CLOSED]
 
         self._cover_position = None
         if self._covers[KEY_POSITION]:
-            position = -1
             self._cover_position = 0 if self.is_closed else 100
-            for entity_id in self._covers[KEY_POSITION]:
-                state = self.hass.states.get(entity_id)
-                pos = state.attributes.get(ATTR_CURRENT_POSITION)
-                if position == -1:
-                    position = pos
-                elif position != pos:
-                    self._assumed_state = True
-                    break
+            position = _same_position(
+                self._cover_positions, len(self._covers[KEY_POSITION])
+            )
+            if position is _DIFFERENT:
+                self._assumed_state = True
             else:
-                if position != -1:
-                    self._cover_position = position
+                self._cover_position = position
 
         self._tilt_position = None
         if self._tilts[KEY_POSITION]:
-            position = -1
             self._tilt_position = 100
-            for entity_id in self._tilts[KEY_POSITION]:
-                state = self.hass.states.get(entity_id)
-                pos = state.attributes.get(ATTR_CURRENT_TILT_POSITION)
-                if position == -1:
-                    position = pos
-                elif position != pos:
-                    self._assumed_state = True
-                    break
+            position = _same_position(
+                self._tilt_positions, len(self._tilts[KEY_POSITION])
+            )
+            if position is _DIFFERENT:
+                self._assumed_state = True
             else:
-                if position != -1:
-                    self._tilt_position = position
+                self._tilt_position = position
 
         supported_features = 0
         supported_features |= (
@@ -293,9 +309,21 @@ class CoverGroup(CoverDevice):
         )
         self._supported_features = supported_features
 
-        if not self._assumed_state:
-            for entity_id in self._entities:
-                state = self.hass.states.get(entity_id)
-                if state and state.attributes.get(ATTR_ASSUMED_STATE):
-                    self._assumed_state = True
-                    break
+        if self._member_assumed.counts:
+            self._assumed_state = True
+
+
+_DIFFERENT = object()
+
+
+def _same_position(positions, member_count):
+    """Return the position all members have, or _DIFFERENT if they differ.
+
+    Members whose position is None are not counted in positions. If none
+    of the members has a position, the position is None.
+    """
+    if not positions:
+        return None
+    if len(positions) < member_count or len(positions.counts) > 1:
+        return _DIFFERENT
+    return next(iter(positions.counts))
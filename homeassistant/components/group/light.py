@@ -1,8 +1,7 @@
 """This platform allows several lights to be grouped into one light."""
 from collections import Counter
-import itertools
 import logging
-from typing import Any, Callable, Iterator, List, Optional, Tuple
+from typing import Any, Callable, List, Optional, Tuple
 
 import voluptuous as vol
 
@@ -41,6 +40,8 @@ from homeassistant.components.light import (
     SUPPORT_WHITE_VALUE,
 )
 
+from . import GroupUpdateMixin, MemberValues
+
 _LOGGER = logging.getLogger(__name__)
 
 DEFAULT_NAME = "Light Group"
@@ -52,6 +53,21 @@ PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend(
     }
 )
 
+# Attributes of the members that are on, and of all members
+ON_ATTRIBUTES = (
+    ATTR_BRIGHTNESS,
+    ATTR_HS_COLOR,
+    ATTR_WHITE_VALUE,
+    ATTR_COLOR_TEMP,
+    ATTR_EFFECT,
+)
+MEMBER_ATTRIBUTES = (
+    ATTR_MIN_MIREDS,
+    ATTR_MAX_MIREDS,
+    ATTR_EFFECT_LIST,
+    ATTR_SUPPORTED_FEATURES,
+)
+
 SUPPORT_GROUP_LIGHT = (
     SUPPORT_BRIGHTNESS
     | SUPPORT_COLOR_TEMP
@@ -70,7 +86,7 @@ async def async_setup_platform(
     async_add_entities([LightGroup(config.get(CONF_NAME), config[CONF_ENTITIES])])
 
 
-class LightGroup(light.Light):
+class LightGroup(GroupUpdateMixin, light.Light):
     """Representation of a light group."""
 
     def __init__(self, name: str, entity_ids: List[str]) -> None:
@@ -89,6 +105,10 @@ class LightGroup(light.Light):
         self._effect = None  # type: Optional[str]
         self._supported_features = 0  # type: int
         self._async_unsub_state_changed = None
+        self._member_states = MemberValues()
+        self._member_attributes = {
+            key: MemberValues() for key in ON_ATTRIBUTES + MEMBER_ATTRIBUTES
+        }
 
     async def async_added_to_hass(self) -> None:
         """Register callbacks."""
@@ -98,8 +118,11 @@ class LightGroup(light.Light):
             entity_id: str, old_state: State, new_state: State
         ):
             """Handle child updates."""
-            self.async_schedule_update_ha_state(True)
+            self._async_update_member(entity_id, new_state)
+            self._async_schedule_group_update()
 
+        for entity_id in self._entity_ids:
+            self._async_update_member(entity_id, self.hass.states.get(entity_id))
         self._async_unsub_state_changed = async_track_state_change(
             self.hass, self._entity_ids, async_state_changed_listener
         )
@@ -111,6 +134,23 @@ class LightGroup(light.Light):
             self._async_unsub_state_changed()
             self._async_unsub_state_changed = None
 
+    @callback
+    def _async_update_member(self, entity_id: str, new_state: State) -> None:
+        """Count the state and attributes of a member."""
+        if new_state is None:
+            self._member_states.async_set(entity_id, None)
+            for values in self._member_attributes.values():
+                values.async_set(entity_id, None)
+            return
+
+        self._member_states.async_set(entity_id, new_state.state)
+        is_on = new_state.state == STATE_ON
+        for key, values in self._member_attributes.items():
+            if is_on or key not in ON_ATTRIBUTES:
+                values.async_set(entity_id, new_state.attributes.get(key))
+            else:
+                values.async_set(entity_id, None)
+
     @property
     def name(self) -> str:
         """Return the name of the entity."""
@@ -217,43 +257,43 @@ class LightGroup(light.Light):
         )
 
     async def async_update(self):
-        """Query all members and determine the light group state."""
-        all_states = [self.hass.states.get(x) for x in self._entity_ids]
-        states = list(filter(None, all_states))
-        on_states = [state for state in states if state.state == STATE_ON]
+        """Determine the light group state from the counted member states."""
+        states = self._member_states
+        attributes = self._member_attributes
 
-        self._is_on = len(on_states) > 0
-        self._available = any(state.state != STATE_UNAVAILABLE for state in states)
+        self._is_on = states.counts[STATE_ON] > 0
+        self._available = len(states) > states.counts[STATE_UNAVAILABLE]
 
-        self._brightness = _reduce_attribute(on_states, ATTR_BRIGHTNESS)
+        self._brightness = _reduce_attribute(attributes[ATTR_BRIGHTNESS])
 
-        self._hs_color = _reduce_attribute(on_states, ATTR_HS_COLOR, reduce=_mean_tuple)
+        self._hs_color = _reduce_attribute(
+            attributes[ATTR_HS_COLOR], reduce=_mean_tuple
+        )
 
-        self._white_value = _reduce_attribute(on_states, ATTR_WHITE_VALUE)
+        self._white_value = _reduce_attribute(attributes[ATTR_WHITE_VALUE])
 
-        self._color_temp = _reduce_attribute(on_states, ATTR_COLOR_TEMP)
+        self._color_temp = _reduce_attribute(attributes[ATTR_COLOR_TEMP])
         self._min_mireds = _reduce_attribute(
-            states, ATTR_MIN_MIREDS, default=154, reduce=min
+            attributes[ATTR_MIN_MIREDS], default=154, reduce=min
         )
         self._max_mireds = _reduce_attribute(
-            states, ATTR_MAX_MIREDS, default=500, reduce=max
+            attributes[ATTR_MAX_MIREDS], default=500, reduce=max
         )
 
         self._effect_list = None
-        all_effect_lists = list(_find_state_attributes(states, ATTR_EFFECT_LIST))
+        all_effect_lists = attributes[ATTR_EFFECT_LIST].counts
         if all_effect_lists:
             # Merge all effects from all effect_lists with a union merge.
             self._effect_list = list(set().union(*all_effect_lists))
 
         self._effect = None
-        all_effects = list(_find_state_attributes(on_states, ATTR_EFFECT))
-        if all_effects:
+        effects_count = attributes[ATTR_EFFECT].counts
+        if effects_count:
             # Report the most common effect.
-            effects_count = Counter(itertools.chain(all_effects))
             self._effect = effects_count.most_common(1)[0][0]
 
         self._supported_features = 0
-        for support in _find_state_attributes(states, ATTR_SUPPORTED_FEATURES):
+        for support in attributes[ATTR_SUPPORTED_FEATURES].counts:
             # Merge supported features by emulating support for every feature
             # we find.
             self._supported_features |= support
@@ -262,40 +302,34 @@ class LightGroup(light.Light):
         self._supported_features &= SUPPORT_GROUP_LIGHT
 
 
-def _find_state_attributes(states: List[State], key: str) -> Iterator[Any]:
-    """Find attributes with matching key from states."""
-    for state in states:
-        value = state.attributes.get(key)
-        if value is not None:
-            yield value
-
+def _mean_int(counts: Counter) -> int:
+    """Return the mean of the counted values."""
+    total = sum(value * count for value, count in counts.items())
+    return int(total / sum(counts.values()))
 
-def _mean_int(*args):
-    """Return the mean of the supplied values."""
-    return int(sum(args) / len(args))
 
-
-def _mean_tuple(*args):
-    """Return the mean values along the columns of the supplied values."""
-    return tuple(sum(l) / len(l) for l in zip(*args))
+def _mean_tuple(counts: Counter) -> Tuple[float, ...]:
+    """Return the mean values along the columns of the counted values."""
+    total = sum(counts.values())
+    return tuple(
+        sum(column[idx] * count for idx, count in enumerate(counts.values())) / total
+        for column in zip(*counts)
+    )
 
 
 def _reduce_attribute(
-    states: List[State],
-    key: str,
+    values: MemberValues,
     default: Optional[Any] = None,
-    reduce: Callable[..., Any] = _mean_int,
+    reduce: Callable[[Counter], Any] = _mean_int,
 ) -> Any:
-    """Find the first attribute matching key from states.
+    """Reduce the counted values of an attribute of the members.
 
-    If none are found, return default.
+    If no member has a value, return default.
     """
-    attrs = list(_find_state_attributes(states, key))
-
-    if not attrs:
+    if not values.counts:
         return default
 
-    if len(attrs) == 1:
-        return attrs[0]
+    if len(values.counts) == 1:
+        return next(iter(values.counts))
 
-    return reduce(*attrs)
+    return reduce(values.counts)
@@ -1,10 +1,14 @@
 """Provide pre-made queries on top of the recorder component."""
+import asyncio
 from collections import defaultdict
 from datetime import timedelta
-from itertools import groupby
+from itertools import chain, groupby
+import json
 import logging
+import threading
 import time
 
+from aiohttp import web
 import voluptuous as vol
 
 from homeassistant.const import (
@@ -14,12 +18,21 @@ from homeassistant.const import (
     CONF_EXCLUDE,
     CONF_INCLUDE,
 )
+from homeassistant.core import State
 import homeassistant.util.dt as dt_util
 from homeassistant.components import recorder, script
 from homeassistant.components.http import HomeAssistantView
-from homeassistant.const import ATTR_HIDDEN
+from homeassistant.const import ATTR_HIDDEN, ATTR_UNIT_OF_MEASUREMENT, CONTENT_TYPE_JSON
+from homeassistant.components.recorder.statistics import (
+    PERIOD_DAY,
+    PERIOD_HOUR,
+    compiled_until,
+    statistics_during_period,
+)
 from homeassistant.components.recorder.util import session_scope, execute
 import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.entityfilter import generate_filter
+from homeassistant.helpers.json import JSONEncoder
 
 
 # mypy: allow-untyped-defs, no-check-untyped-defs
@@ -41,6 +54,20 @@ CONFIG_SCHEMA = vol.Schema(
 SIGNIFICANT_DOMAINS = ("thermostat", "climate", "water_heater")
 IGNORE_DOMAINS = ("zone", "scene")
 
+# Periods longer than these are served from the hourly or daily recorder
+# statistics for the numeric sensors that have them.
+HOURLY_STATISTICS_THRESHOLD = timedelta(days=3)
+DAILY_STATISTICS_THRESHOLD = timedelta(days=60)
+
+ATTR_MIN = "min"
+ATTR_MAX = "max"
+
+# Rows fetched per round trip and characters buffered per chunk written
+# when streaming a history response.
+STREAM_YIELD_PER = 1000
+STREAM_CHUNK_SIZE = 65536
+STREAM_QUEUE_SIZE = 8
+
 
 def get_significant_states(
     hass,
@@ -49,6 +76,8 @@ def get_significant_states(
     entity_ids=None,
     filters=None,
     include_start_time_state=True,
+    minimal_response=False,
+    statistics_period=None,
 ):
     """
     Return states changes during UTC period start_time - end_time.
@@ -56,41 +85,251 @@ def get_significant_states(
     Significant states are all states where there is a state change,
     as well as all states from certain domains (for instance
     thermostat so that we get current temperature in our graphs).
+
+    With minimal_response only the first state of each entity is returned
+    in full, the ones after it are reduced to [state, last_changed] pairs.
+
+    With a statistics_period the entities that have recorder statistics of
+    that period get a state per period with its mean, followed by their
+    states after the last compiled period.
     """
     timer_start = time.perf_counter()
-    from homeassistant.components.recorder.models import States
+    from homeassistant.components.recorder.models import States, Statistics
 
-    with session_scope(hass=hass) as session:
-        query = session.query(States).filter(
-            (
-                States.domain.in_(SIGNIFICANT_DOMAINS)
-                | (States.last_changed == States.last_updated)
-            )
-            & (States.last_updated > start_time)
+    statistics = {}
+    if statistics_period is not None:
+        statistics = _statistics_states(
+            hass, start_time, end_time, entity_ids, filters, statistics_period
         )
+        # States of compiled periods are served from their statistics
+        statistics_until = compiled_until(hass, statistics_period)
 
-        if filters:
-            query = filters.apply(query, entity_ids)
-
-        if end_time is not None:
-            query = query.filter(States.last_updated < end_time)
-
+    with session_scope(hass=hass) as session:
+        query = _significant_states_query(
+            session, start_time, end_time, entity_ids, filters, minimal_response
+        )
+        if statistics:
+            # A subquery instead of the entity ids, which could be more than
+            # the database takes as parameters
+            with_statistics = session.query(Statistics.entity_id).filter(
+                (Statistics.period == statistics_period)
+                & (Statistics.start >= start_time)
+            )
+            if end_time is not None:
+                with_statistics = with_statistics.filter(Statistics.start < end_time)
+            query = query.filter(
+                ~States.entity_id.in_(with_statistics.subquery())
+                | (States.last_updated >= statistics_until)
+            )
         query = query.order_by(States.last_updated)
 
-        states = (
-            state
-            for state in execute(query)
-            if (_is_significant(state) and not state.attributes.get(ATTR_HIDDEN, False))
-        )
+        if minimal_response:
+            states = [
+                row
+                for row in execute(query, to_native=False)
+                if _is_significant_row(row)
+            ]
+        else:
+            states = (
+                state
+                for state in execute(query)
+                if (
+                    _is_significant(state)
+                    and not state.attributes.get(ATTR_HIDDEN, False)
+                )
+            )
 
     if _LOGGER.isEnabledFor(logging.DEBUG):
         elapsed = time.perf_counter() - timer_start
         _LOGGER.debug("get_significant_states took %fs", elapsed)
 
     return states_to_json(
-        hass, states, start_time, entity_ids, filters, include_start_time_state
+        hass,
+        states,
+        start_time,
+        entity_ids,
+        filters,
+        include_start_time_state,
+        minimal_response,
+        statistics,
+    )
+
+
+def _statistics_states(hass, start_time, end_time, entity_ids, filters, period):
+    """Return the recorder statistics of a period as states by entity_id.
+
+    The state is the time weighted mean of the period, with its minimum and
+    maximum added to the current attributes of the entity.
+    """
+    from homeassistant.components.recorder.models import process_timestamp
+
+    entity_filter = None
+    if filters and entity_ids is None:
+        entity_filter = filters.entity_filter()
+
+    result = {}
+    for entity_id, rows in statistics_during_period(
+        hass, start_time, end_time, period, entity_ids
+    ).items():
+        if entity_filter is not None and not entity_filter(entity_id):
+            continue
+
+        current = hass.states.get(entity_id)
+        attributes = dict(current.attributes) if current is not None else {}
+        if attributes.get(ATTR_HIDDEN, False):
+            continue
+
+        states = result[entity_id] = []
+        for row in rows:
+            start = process_timestamp(row.start)
+            states.append(
+                State(
+                    entity_id,
+                    str(row.mean),
+                    {
+                        **attributes,
+                        ATTR_UNIT_OF_MEASUREMENT: row.unit_of_measurement,
+                        ATTR_MIN: row.min,
+                        ATTR_MAX: row.max,
+                    },
+                    start,
+                    start,
+                )
+            )
+
+    return result
+
+
+def stream_significant_states(
+    hass,
+    start_time,
+    end_time=None,
+    entity_ids=None,
+    filters=None,
+    include_start_time_state=True,
+    chunk_size=STREAM_CHUNK_SIZE,
+    minimal_response=False,
+):
+    """Yield the significant states during a period as chunks of JSON text.
+
+    The chunks join up to the same list of per entity state lists that
+    get_significant_states returns, but states are read with a server side
+    cursor grouped by entity and encoded as they arrive, so memory use is
+    bounded by chunk_size instead of the length of the period. Entities
+    with changes come first, followed by those that only have a start
+    time state. Must be run outside of the event loop.
+    """
+    from homeassistant.components.recorder.models import States
+
+    start_states = {}
+    if include_start_time_state:
+        for state in get_states(hass, start_time, entity_ids, filters=filters):
+            state.last_changed = start_time
+            state.last_updated = start_time
+            start_states[state.entity_id] = state
+
+    with session_scope(hass=hass) as session:
+        query = _significant_states_query(
+            session, start_time, end_time, entity_ids, filters, minimal_response
+        )
+        query = query.order_by(States.entity_id, States.last_updated).yield_per(
+            STREAM_YIELD_PER
+        )
+
+        if minimal_response:
+            states = (row for row in query if _is_significant_row(row))
+        else:
+            states = (
+                state
+                for state in (row.to_native() for row in query)
+                if state is not None
+                and _is_significant(state)
+                and not state.attributes.get(ATTR_HIDDEN, False)
+            )
+
+        buffer = ["["]
+        size = 1
+        entity_sep = ""
+        for group in _merge_start_states(start_states, states):
+            if minimal_response:
+                group = _minimal_states(group, True)
+            buffer.append(entity_sep + "[")
+            entity_sep = ","
+            state_sep = ""
+            for state in group:
+                encoded = state_sep + json.dumps(
+                    state, sort_keys=True, cls=JSONEncoder, allow_nan=False
+                )
+                state_sep = ","
+                buffer.append(encoded)
+                size += len(encoded)
+                if size >= chunk_size:
+                    yield "".join(buffer)
+                    buffer = []
+                    size = 0
+            buffer.append("]")
+
+    buffer.append("]")
+    yield "".join(buffer)
+
+
+def _merge_start_states(start_states, states):
+    """Group states by entity and prepend the start time state of each."""
+    for ent_id, group in groupby(states, lambda state: state.entity_id):
+        start_state = start_states.pop(ent_id, None)
+        if start_state is not None:
+            group = chain((start_state,), group)
+        yield group
+
+    for start_state in start_states.values():
+        yield (start_state,)
+
+
+def _significant_states_query(
+    session, start_time, end_time, entity_ids, filters, minimal_response=False
+):
+    """Return an unordered query for the significant states in a period.
+
+    For minimal responses the columns are selected as plain rows, which
+    are only converted to states where the attributes are needed.
+    """
+    from homeassistant.components.recorder.models import States, StateAttributes
+    from sqlalchemy import func
+
+    if minimal_response:
+        query = session.query(
+            States.domain,
+            States.entity_id,
+            States.state,
+            func.coalesce(StateAttributes.shared_attrs, States.attributes).label(
+                "attributes"
+            ),
+            States.last_changed,
+            States.last_updated,
+            States.context_id,
+            States.context_user_id,
+        ).outerjoin(
+            StateAttributes, States.attributes_id == StateAttributes.attributes_id
+        )
+    else:
+        query = session.query(States)
+
+    query = query.filter(
+        (
+            States.domain.in_(SIGNIFICANT_DOMAINS)
+            | (States.last_changed == States.last_updated)
+        )
+        & (States.last_updated > start_time)
     )
 
+    if filters:
+        query = filters.apply(query, entity_ids)
+
+    if end_time is not None:
+        query = query.filter(States.last_updated < end_time)
+
+    return query
+
 
 def state_changes_during_period(hass, start_time, end_time=None, entity_id=None):
     """Return states changes during UTC period start_time - end_time."""
@@ -151,7 +390,7 @@ def get_states(hass, utc_point_in_time, entity_ids=None, run=None, filters=None)
         if run is None:
             return []
 
-    from sqlalchemy import and_, func
+    from homeassistant.components.recorder.snapshot import states_at
 
     with session_scope(hass=hass) as session:
         if entity_ids and len(entity_ids) == 1:
@@ -166,66 +405,52 @@ def get_states(hass, utc_point_in_time, entity_ids=None, run=None, filters=None)
                 .order_by(States.last_updated.desc())
             )
 
-            most_recent_state_ids = most_recent_state_ids.limit(1)
+            most_recent_state_ids = most_recent_state_ids.limit(1).subquery()
+
+            queries = [
+                session.query(States).join(
+                    most_recent_state_ids,
+                    States.state_id == most_recent_state_ids.c.max_state_id,
+                )
+            ]
 
         else:
             # We have more than one entity to look at (most commonly we want
-            # all entities,) so we need to do a search on all states since the
-            # last recorder run started.
-
-            most_recent_states_by_date = session.query(
-                States.entity_id.label("max_entity_id"),
-                func.max(States.last_updated).label("max_last_updated"),
-            ).filter(
-                (States.last_updated >= run.start)
-                & (States.last_updated < utc_point_in_time)
-            )
-
-            if entity_ids:
-                most_recent_states_by_date.filter(States.entity_id.in_(entity_ids))
-
-            most_recent_states_by_date = most_recent_states_by_date.group_by(
-                States.entity_id
-            )
-
-            most_recent_states_by_date = most_recent_states_by_date.subquery()
-
-            most_recent_state_ids = session.query(
-                func.max(States.state_id).label("max_state_id")
-            ).join(
-                most_recent_states_by_date,
-                and_(
-                    States.entity_id == most_recent_states_by_date.c.max_entity_id,
-                    States.last_updated
-                    == most_recent_states_by_date.c.max_last_updated,
-                ),
+            # all entities,) so we need the latest states since the last
+            # snapshot of the run, on top of the states of that snapshot.
+            recent_query, snapshot_query = states_at(
+                session, run.start, utc_point_in_time
             )
+            queries = [recent_query]
+            if snapshot_query is not None:
+                queries.insert(0, snapshot_query)
 
-            most_recent_state_ids = most_recent_state_ids.group_by(States.entity_id)
+        states = {}
+        for query in queries:
+            query = query.filter(~States.domain.in_(IGNORE_DOMAINS))
 
-        most_recent_state_ids = most_recent_state_ids.subquery()
+            if filters:
+                query = filters.apply(query, entity_ids)
 
-        query = (
-            session.query(States)
-            .join(
-                most_recent_state_ids,
-                States.state_id == most_recent_state_ids.c.max_state_id,
-            )
-            .filter((~States.domain.in_(IGNORE_DOMAINS)))
-        )
-
-        if filters:
-            query = filters.apply(query, entity_ids)
+            for state in execute(query):
+                states[state.entity_id] = state
 
         return [
             state
-            for state in execute(query)
+            for state in states.values()
             if not state.attributes.get(ATTR_HIDDEN, False)
         ]
 
 
 def states_to_json(
-    hass, states, start_time, entity_ids, filters=None, include_start_time_state=True
+    hass,
+    states,
+    start_time,
+    entity_ids,
+    filters=None,
+    include_start_time_state=True,
+    minimal_response=False,
+    statistics=None,
 ):
     """Convert SQL results into JSON friendly data structure.
 
@@ -235,6 +460,12 @@ def states_to_json(
     We also need to go back and create a synthetic zero data point for
     each list of states, otherwise our graphs won't start on the Y
     axis correctly.
+
+    With minimal_response states are the rows of a minimal query and only
+    the first state of each entity keeps its attributes.
+
+    The states made from statistics are placed between the start time
+    state and the states of each entity.
     """
     result = defaultdict(list)
     # Set all entity IDs to empty lists in result set to maintain the order
@@ -254,8 +485,14 @@ def states_to_json(
         elapsed = time.perf_counter() - timer_start
         _LOGGER.debug("getting %d first datapoints took %fs", len(result), elapsed)
 
+    if statistics:
+        for ent_id, statistics_states in statistics.items():
+            result[ent_id].extend(statistics_states)
+
     # Append all changes to it
     for ent_id, group in groupby(states, lambda state: state.entity_id):
+        if minimal_response:
+            group = _minimal_states(group, not result[ent_id])
         result[ent_id].extend(group)
 
     # Filter out the empty lists if some states had 0 results.
@@ -335,9 +572,29 @@ class HistoryPeriodView(HomeAssistantView):
         if entity_ids:
             entity_ids = entity_ids.lower().split(",")
         include_start_time_state = "skip_initial_state" not in request.query
+        minimal_response = "minimal_response" in request.query
 
         hass = request.app["hass"]
 
+        # Streamed responses are ordered by entity, so include ordering
+        # still needs the buffered response.
+        if "stream" in request.query and not self.use_include_order:
+            return await self._async_stream(
+                request,
+                hass,
+                start_time,
+                end_time,
+                entity_ids,
+                include_start_time_state,
+                minimal_response,
+            )
+
+        statistics_period = None
+        if end_time - start_time > DAILY_STATISTICS_THRESHOLD:
+            statistics_period = PERIOD_DAY
+        elif end_time - start_time > HOURLY_STATISTICS_THRESHOLD:
+            statistics_period = PERIOD_HOUR
+
         result = await hass.async_add_job(
             get_significant_states,
             hass,
@@ -346,6 +603,8 @@ class HistoryPeriodView(HomeAssistantView):
             entity_ids,
             self.filters,
             include_start_time_state,
+            minimal_response,
+            statistics_period,
         )
         result = list(result.values())
         if _LOGGER.isEnabledFor(logging.DEBUG):
@@ -367,6 +626,85 @@ class HistoryPeriodView(HomeAssistantView):
 
         return await hass.async_add_job(self.json, result)
 
+    async def _async_stream(
+        self,
+        request,
+        hass,
+        start_time,
+        end_time,
+        entity_ids,
+        include_start_time_state,
+        minimal_response,
+    ):
+        """Stream the significant states to the client as they are encoded.
+
+        The recorder query runs in the executor and hands chunks to the
+        event loop through a bounded queue, so a slow client pauses the
+        query instead of growing the buffer.
+        """
+        timer_start = time.perf_counter()
+        chunks = asyncio.Queue(STREAM_QUEUE_SIZE)
+        cancelled = threading.Event()
+
+        def put_chunk(chunk):
+            """Block until the event loop accepted the chunk."""
+            asyncio.run_coroutine_threadsafe(chunks.put(chunk), hass.loop).result()
+
+        def produce():
+            """Run the query and feed the encoded chunks to the queue."""
+            try:
+                for chunk in stream_significant_states(
+                    hass,
+                    start_time,
+                    end_time,
+                    entity_ids,
+                    self.filters,
+                    include_start_time_state,
+                    minimal_response=minimal_response,
+                ):
+                    if cancelled.is_set():
+                        return
+                    put_chunk(chunk.encode("UTF-8"))
+            finally:
+                if not cancelled.is_set():
+                    put_chunk(None)
+
+        response = web.StreamResponse(headers={"Content-Type": CONTENT_TYPE_JSON})
+        response.enable_compression()
+        await response.prepare(request)
+
+        producer = hass.async_add_executor_job(produce)
+        try:
+            while True:
+                chunk = await chunks.get()
+                if chunk is None:
+                    break
+                await response.write(chunk)
+        finally:
+            # Unblock the producer if the client went away mid stream.
+            cancelled.set()
+            while not chunks.empty():
+                chunks.get_nowait()
+
+        try:
+            await producer
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Error streaming history")
+            # Abort the response instead of ending it, aiohttp would end it
+            # like a complete one and the client would take the states
+            # streamed so far for the whole history.
+            if request.transport is not None:
+                request.transport.close()
+            return response
+
+        await response.write_eof()
+
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            elapsed = time.perf_counter() - timer_start
+            _LOGGER.debug("Streamed history in %fs", elapsed)
+
+        return response
+
 
 class Filters:
     """Container for the configured include and exclude filters."""
@@ -378,6 +716,15 @@ class Filters:
         self.included_entities = []
         self.included_domains = []
 
+    def entity_filter(self):
+        """Return a function testing if an entity id passes the filters."""
+        return generate_filter(
+            self.included_domains,
+            self.included_entities,
+            self.excluded_domains,
+            self.excluded_entities,
+        )
+
     def apply(self, query, entity_ids=None):
         """Apply the include/exclude filter on domains and entities on query.
 
@@ -433,6 +780,52 @@ class Filters:
         return query
 
 
+def _is_significant_row(row):
+    """Test if a row of a minimal query is significant and not hidden.
+
+    The attributes are only decoded when they can change the outcome.
+    """
+    if row.domain != "script" and ATTR_HIDDEN not in row.attributes:
+        return True
+
+    state = _row_to_state(row)
+    return (
+        state is not None
+        and _is_significant(state)
+        and not state.attributes.get(ATTR_HIDDEN, False)
+    )
+
+
+def _row_to_state(row):
+    """Convert a row of a minimal query to a state."""
+    from homeassistant.components.recorder.models import row_to_state
+
+    return row_to_state(row, row.attributes)
+
+
+def _minimal_states(rows, first):
+    """Yield the first state of an entity in full and pairs for the others.
+
+    States of the significant domains are always returned in full because
+    their graphs are drawn from the attributes.
+    """
+    from homeassistant.components.recorder.models import process_timestamp
+
+    for row in rows:
+        if isinstance(row, State):
+            state = row
+        elif first or row.domain in SIGNIFICANT_DOMAINS:
+            state = _row_to_state(row)
+            if state is None:
+                continue
+        else:
+            yield [row.state, process_timestamp(row.last_changed).isoformat()]
+            continue
+
+        first = False
+        yield state
+
+
 def _is_significant(state):
     """Test if state is significant for history charts.
 
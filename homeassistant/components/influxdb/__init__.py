@@ -16,6 +16,7 @@ from homeassistant.const import (
     CONF_HOST,
     CONF_INCLUDE,
     CONF_PASSWORD,
+    CONF_PATH,
     CONF_PORT,
     CONF_SSL,
     CONF_USERNAME,
@@ -29,6 +30,8 @@ from homeassistant.helpers import state as state_helper, event as event_helper
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.entity_values import EntityValues
 
+from .buffer import SpillBuffer
+
 _LOGGER = logging.getLogger(__name__)
 
 CONF_DB_NAME = "database"
@@ -40,9 +43,15 @@ CONF_COMPONENT_CONFIG = "component_config"
 CONF_COMPONENT_CONFIG_GLOB = "component_config_glob"
 CONF_COMPONENT_CONFIG_DOMAIN = "component_config_domain"
 CONF_RETRY_COUNT = "max_retries"
+CONF_BUFFER = "buffer"
+CONF_MAX_SIZE = "max_size"
+CONF_SEGMENT_SIZE = "segment_size"
 
 DEFAULT_DATABASE = "home_assistant"
 DEFAULT_VERIFY_SSL = True
+DEFAULT_BUFFER_PATH = "influxdb_buffer"
+DEFAULT_BUFFER_MAX_SIZE = 100  # MiB
+DEFAULT_BUFFER_SEGMENT_SIZE = 1024  # KiB
 DOMAIN = "influxdb"
 
 TIMEOUT = 5
@@ -53,6 +62,20 @@ RETRY_INTERVAL = 60  # seconds
 BATCH_TIMEOUT = 1
 BATCH_BUFFER_SIZE = 100
 
+# Seconds between attempts to replay the spill buffer
+BUFFER_RETRY_INTERVAL = 60
+BUFFER_REPLAY_BATCH_SIZE = 5000
+
+BUFFER_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_PATH, default=DEFAULT_BUFFER_PATH): cv.string,
+        vol.Optional(CONF_MAX_SIZE, default=DEFAULT_BUFFER_MAX_SIZE): cv.positive_int,
+        vol.Optional(
+            CONF_SEGMENT_SIZE, default=DEFAULT_BUFFER_SEGMENT_SIZE
+        ): cv.positive_int,
+    }
+)
+
 COMPONENT_CONFIG_SCHEMA_ENTRY = vol.Schema(
     {vol.Optional(CONF_OVERRIDE_MEASUREMENT): cv.string}
 )
@@ -85,6 +108,7 @@ CONFIG_SCHEMA = vol.Schema(
                     vol.Optional(CONF_PORT): cv.port,
                     vol.Optional(CONF_SSL): cv.boolean,
                     vol.Optional(CONF_RETRY_COUNT, default=0): cv.positive_int,
+                    vol.Optional(CONF_BUFFER): BUFFER_SCHEMA,
                     vol.Optional(CONF_DEFAULT_MEASUREMENT): cv.string,
                     vol.Optional(CONF_OVERRIDE_MEASUREMENT): cv.string,
                     vol.Optional(CONF_TAGS, default={}): vol.Schema(
@@ -265,13 +289,26 @@ def setup(hass, config):
 
         return json
 
-    instance = hass.data[DOMAIN] = InfluxThread(hass, influx, event_to_json, max_tries)
+    buffer = None
+    if CONF_BUFFER in conf:
+        buffer_conf = conf[CONF_BUFFER]
+        buffer = SpillBuffer(
+            hass.config.path(buffer_conf[CONF_PATH]),
+            buffer_conf[CONF_MAX_SIZE] * 1024 * 1024,
+            buffer_conf[CONF_SEGMENT_SIZE] * 1024,
+        )
+
+    instance = hass.data[DOMAIN] = InfluxThread(
+        hass, influx, event_to_json, max_tries, buffer
+    )
     instance.start()
 
     def shutdown(event):
         """Shut down the thread."""
         instance.queue.put(None)
         instance.join()
+        if buffer is not None:
+            buffer.close()
         influx.close()
 
     hass.bus.listen_once(EVENT_HOMEASSISTANT_STOP, shutdown)
@@ -279,18 +316,25 @@ def setup(hass, config):
     return True
 
 
+def _is_rejected(err):
+    """Return if influxdb rejected the points of a write with a 4xx error."""
+    return err.code is not None and 400 <= err.code < 500
+
+
 class InfluxThread(threading.Thread):
     """A threaded event handler class."""
 
-    def __init__(self, hass, influx, event_to_json, max_tries):
+    def __init__(self, hass, influx, event_to_json, max_tries, buffer=None):
         """Initialize the listener."""
         threading.Thread.__init__(self, name="InfluxDB")
         self.queue = queue.Queue()
         self.influx = influx
         self.event_to_json = event_to_json
         self.max_tries = max_tries
+        self.buffer = buffer
         self.write_errors = 0
         self.shutdown = False
+        self._next_replay = 0
         hass.bus.listen(EVENT_STATE_CHANGED, self._event_listener)
 
     def _event_listener(self, event):
@@ -314,7 +358,13 @@ class InfluxThread(threading.Thread):
 
         try:
             while len(json) < BATCH_BUFFER_SIZE and not self.shutdown:
-                timeout = None if count == 0 else self.batch_timeout()
+                if count:
+                    timeout = self.batch_timeout()
+                elif self.buffer is not None and self.buffer.has_data:
+                    # Wake up to replay the buffer without new events
+                    timeout = BUFFER_RETRY_INTERVAL
+                else:
+                    timeout = None
                 item = self.queue.get(timeout=timeout)
                 count += 1
 
@@ -324,7 +374,8 @@ class InfluxThread(threading.Thread):
                     timestamp, event = item
                     age = time.monotonic() - timestamp
 
-                    if age < queue_seconds:
+                    # Old events are spilled to the buffer instead of dropped
+                    if age < queue_seconds or self.buffer is not None:
                         event_json = self.event_to_json(event)
                         if event_json:
                             json.append(event_json)
@@ -361,11 +412,94 @@ class InfluxThread(threading.Thread):
                         _LOGGER.error("Write error: %s", err)
                     self.write_errors += len(json)
 
+    def write_to_buffer(self, json):
+        """Write events to influxdb, spilling them to the buffer on errors.
+
+        Events are only written directly once the buffer is replayed, so
+        they reach influxdb in order. Events rejected by influxdb are
+        dropped, as writing them again would fail too.
+        """
+        from influxdb import exceptions
+
+        if self.buffer.has_data:
+            self.replay_buffer()
+
+        if not json:
+            return
+
+        if not self.buffer.has_data:
+            try:
+                self.influx.write_points(json)
+                _LOGGER.debug("Wrote %d events", len(json))
+                return
+            except exceptions.InfluxDBClientError as err:
+                if _is_rejected(err):
+                    _LOGGER.error("Dropped %d events rejected: %s", len(json), err)
+                    return
+                _LOGGER.error("Write error, buffering events: %s", err)
+                self._next_replay = time.monotonic() + BUFFER_RETRY_INTERVAL
+            except (exceptions.InfluxDBServerError, IOError) as err:
+                _LOGGER.error("Write error, buffering events: %s", err)
+                self._next_replay = time.monotonic() + BUFFER_RETRY_INTERVAL
+
+        dropped = self.buffer.dropped
+        self.buffer.append(json)
+        if self.buffer.dropped > dropped:
+            _LOGGER.warning(
+                "Buffer is full, dropped %d old events", self.buffer.dropped - dropped
+            )
+        _LOGGER.debug(
+            "Buffered %d events, backlog is %d events",
+            len(json),
+            self.buffer.backlog_points,
+        )
+
+    def replay_buffer(self):
+        """Write the buffered events to influxdb, oldest first.
+
+        Segments are written one at a time until the buffer is empty or a
+        write fails. Server and connection errors stop the replay until the
+        next retry, segments rejected by influxdb are dropped.
+        """
+        from influxdb import exceptions
+
+        if time.monotonic() < self._next_replay:
+            return
+
+        replayed = 0
+        while self.buffer.has_data:
+            json = self.buffer.oldest()
+            try:
+                self.influx.write_points(json, batch_size=BUFFER_REPLAY_BATCH_SIZE)
+            except exceptions.InfluxDBClientError as err:
+                if not _is_rejected(err):
+                    _LOGGER.debug("Replay error: %s", err)
+                    self._next_replay = time.monotonic() + BUFFER_RETRY_INTERVAL
+                    break
+                _LOGGER.error("Dropped %d buffered events rejected: %s", len(json), err)
+                self.buffer.remove_oldest()
+                continue
+            except (exceptions.InfluxDBServerError, IOError) as err:
+                _LOGGER.debug("Replay error: %s", err)
+                self._next_replay = time.monotonic() + BUFFER_RETRY_INTERVAL
+                break
+            self.buffer.remove_oldest()
+            replayed += len(json)
+
+        if replayed:
+            _LOGGER.info(
+                "Replayed %d buffered events, backlog is %d events",
+                replayed,
+                self.buffer.backlog_points,
+            )
+
     def run(self):
         """Process incoming events."""
         while not self.shutdown:
             count, json = self.get_events_json()
-            if json:
+            if self.buffer is not None:
+                self.write_to_buffer(json)
+            elif json:
                 self.write_to_influxdb(json)
             for _ in range(count):
                 self.queue.task_done()
@@ -0,0 +1,128 @@
+"""On-disk buffer for points that could not be written to InfluxDB."""
+import json
+import logging
+import os
+
+from homeassistant.helpers.json import JSONEncoder
+
+_LOGGER = logging.getLogger(__name__)
+
+SEGMENT_SUFFIX = ".jsonl"
+
+
+class SpillBuffer:
+    """Append-only buffer of points kept in numbered segment files.
+
+    Points are appended to the newest segment and read back one whole
+    segment at a time starting with the oldest, so points are replayed in
+    the order they were spilled. Once the buffer grows beyond max_size
+    bytes, the oldest segments are dropped.
+
+    The buffer is only used from the InfluxDB thread.
+    """
+
+    def __init__(self, path, max_size, segment_size):
+        """Initialize the buffer and load the segments left on disk."""
+        self.path = path
+        self.max_size = max_size
+        self.segment_size = segment_size
+        self.dropped = 0
+        # Sequence number, points and bytes of each segment, oldest first
+        self._segments = []
+        self._file = None
+
+        os.makedirs(path, exist_ok=True)
+
+        for name in sorted(os.listdir(path)):
+            if not name.endswith(SEGMENT_SUFFIX):
+                continue
+            sequence = int(name[: -len(SEGMENT_SUFFIX)])
+            points = self._read_segment(sequence)
+            size = os.path.getsize(self._segment_path(sequence))
+            self._segments.append([sequence, len(points), size])
+
+        if self._segments:
+            _LOGGER.info("Loaded %d buffered points from %s", self.backlog_points, path)
+
+    @property
+    def backlog_points(self):
+        """Return the number of buffered points."""
+        return sum(segment[1] for segment in self._segments)
+
+    @property
+    def backlog_bytes(self):
+        """Return the size of the buffered points."""
+        return sum(segment[2] for segment in self._segments)
+
+    @property
+    def has_data(self):
+        """Return if there are buffered points."""
+        return len(self._segments) > 0
+
+    def _segment_path(self, sequence):
+        """Return the path of a segment file."""
+        return os.path.join(self.path, "{:012d}{}".format(sequence, SEGMENT_SUFFIX))
+
+    def _read_segment(self, sequence):
+        """Return the points in a segment."""
+        points = []
+        with open(self._segment_path(sequence), encoding="utf-8") as segment:
+            for line in segment:
+                try:
+                    points.append(json.loads(line))
+                except ValueError:
+                    # A line cut short when Home Assistant stopped
+                    _LOGGER.warning("Skipping incomplete buffered point")
+        return points
+
+    def append(self, points):
+        """Append points to the newest segment."""
+        if self._file is None or self._segments[-1][2] >= self.segment_size:
+            self._roll()
+
+        data = "".join(
+            json.dumps(point, cls=JSONEncoder, separators=(",", ":")) + "\n"
+            for point in points
+        ).encode("utf-8")
+        self._file.write(data)
+        self._file.flush()
+
+        segment = self._segments[-1]
+        segment[1] += len(points)
+        segment[2] += len(data)
+
+        while len(self._segments) > 1 and self.backlog_bytes > self.max_size:
+            self.dropped += self._segments[0][1]
+            self.remove_oldest()
+
+    def _roll(self):
+        """Start a new segment."""
+        self._close_file()
+        sequence = self._segments[-1][0] + 1 if self._segments else 0
+        self._file = open(self._segment_path(sequence), "ab")
+        self._segments.append([sequence, 0, 0])
+
+    def _close_file(self):
+        """Sync and close the newest segment."""
+        if self._file is None:
+            return
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+
+    def oldest(self):
+        """Return the points in the oldest segment."""
+        if len(self._segments) == 1:
+            self._close_file()
+        return self._read_segment(self._segments[0][0])
+
+    def remove_oldest(self):
+        """Remove the oldest segment."""
+        sequence = self._segments.pop(0)[0]
+        if not self._segments:
+            self._close_file()
+        os.remove(self._segment_path(sequence))
+
+    def close(self):
+        """Close the newest segment."""
+        self._close_file()
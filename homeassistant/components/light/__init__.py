@@ -279,10 +279,10 @@ async def async_setup(hass, config):
             entity_perms = user.permissions.check_entity
 
             for light in target_lights:
-                if not entity_perms(light, POLICY_CONTROL):
+                if not entity_perms(light.entity_id, POLICY_CONTROL):
                     raise Unauthorized(
                         context=service.context,
-                        entity_id=light,
+                        entity_id=light.entity_id,
                         permission=POLICY_CONTROL,
                     )
 
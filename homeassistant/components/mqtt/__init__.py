@@ -2,15 +2,16 @@
 import asyncio
 from functools import partial, wraps
 import inspect
-from itertools import groupby
+from itertools import count, groupby
 import json
 import logging
-from operator import attrgetter
+from operator import attrgetter, itemgetter
 import os
 import socket
 import ssl
+import threading
 import time
-from typing import Any, Callable, List, Optional, Union, cast  # noqa: F401
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union, cast  # noqa: F401
 
 import attr
 import requests.certs
@@ -119,6 +120,9 @@ CONNECTION_SUCCESS = "connection_success"
 CONNECTION_FAILED = "connection_failed"
 CONNECTION_FAILED_RECOVERABLE = "connection_failed_recoverable"
 
+# Seconds over which the received messages per second are counted
+STATS_RATE_WINDOW = 10
+
 
 def valid_topic(value: Any) -> str:
     """Validate that this is a valid topic name/filter."""
@@ -519,6 +523,7 @@ async def async_setup(hass: HomeAssistantType, config: ConfigType) -> bool:
     hass.data[DATA_MQTT_HASS_CONFIG] = config
 
     websocket_api.async_register_command(hass, websocket_subscribe)
+    websocket_api.async_register_command(hass, websocket_stats)
 
     if conf is None:
         # If we have a config entry, setup is done by that config entry.
@@ -713,6 +718,55 @@ class Subscription:
     encoding = attr.ib(type=str, default="utf-8")
 
 
+class MqttStats:
+    """Counters of the messages handled by the MQTT client."""
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.messages_received = 0
+        self.messages_published = 0
+        self.batches = 0
+        self.max_batch_size = 0
+        self.last_handoff_latency = 0.0
+        self.max_handoff_latency = 0.0
+        self.messages_per_second = 0.0
+        self._window_start = time.monotonic()
+        self._window_messages = 0
+
+    @callback
+    def async_record_batch(self, received: List[float], now: float) -> None:
+        """Record a batch of messages handed off from the paho thread."""
+        self.messages_received += len(received)
+        self.batches += 1
+        self.max_batch_size = max(self.max_batch_size, len(received))
+
+        # The first message of a batch waited the longest
+        self.last_handoff_latency = now - received[0]
+        self.max_handoff_latency = max(
+            self.max_handoff_latency, self.last_handoff_latency
+        )
+
+        self._window_messages += len(received)
+        elapsed = now - self._window_start
+        if elapsed >= STATS_RATE_WINDOW:
+            self.messages_per_second = self._window_messages / elapsed
+            self._window_start = now
+            self._window_messages = 0
+
+    def as_dict(self, queue_depth: int) -> Dict[str, Any]:
+        """Return the counters as a dictionary."""
+        return {
+            "messages_received": self.messages_received,
+            "messages_published": self.messages_published,
+            "messages_per_second": round(self.messages_per_second, 2),
+            "queue_depth": queue_depth,
+            "batches": self.batches,
+            "max_batch_size": self.max_batch_size,
+            "last_handoff_latency": self.last_handoff_latency,
+            "max_handoff_latency": self.max_handoff_latency,
+        }
+
+
 class MQTT:
     """Home Assistant MQTT client."""
 
@@ -742,10 +796,21 @@ class MQTT:
         self.port = port
         self.keepalive = keepalive
         self.subscriptions = []  # type: List[Subscription]
+        self._subscription_trie = SubscriptionTrie()
         self.birth_message = birth_message
         self.connected = False
         self._mqttc = None  # type: mqtt.Client
         self._paho_lock = asyncio.Lock()
+        self.stats = MqttStats()
+
+        # Messages received on the paho thread waiting for the event loop
+        self._pending_messages = []  # type: List[Tuple[Any, float]]
+        self._pending_messages_lock = threading.Lock()
+        self._handle_pending_scheduled = False
+
+        # Publishes waiting for the running publish job
+        self._pending_publishes = []  # type: List[Tuple[Message, asyncio.Future]]
+        self._publishing = False
 
         if protocol == PROTOCOL_31:
             proto = mqtt.MQTTv31  # type: int
@@ -785,11 +850,46 @@ class MQTT:
 
         This method must be run in the event loop and returns a coroutine.
         """
-        async with self._paho_lock:
-            _LOGGER.debug("Transmitting message on %s: %s", topic, payload)
-            await self.hass.async_add_job(
-                self._mqttc.publish, topic, payload, qos, retain
-            )
+        future = self.hass.loop.create_future()
+        self._pending_publishes.append((Message(topic, payload, qos, retain), future))
+
+        if not self._publishing:
+            self._publishing = True
+            self.hass.async_create_task(self._async_publish_pending())
+
+        await future
+
+    async def _async_publish_pending(self) -> None:
+        """Publish the pending messages in as few executor jobs as possible."""
+        try:
+            while self._pending_publishes:
+                pending = self._pending_publishes
+                self._pending_publishes = []
+
+                try:
+                    async with self._paho_lock:
+                        await self.hass.async_add_executor_job(
+                            self._publish, [msg for msg, _ in pending]
+                        )
+                except Exception as err:  # pylint: disable=broad-except
+                    for _, future in pending:
+                        # The publisher may have been cancelled meanwhile
+                        if not future.done():
+                            future.set_exception(err)
+                    continue
+
+                self.stats.messages_published += len(pending)
+                for _, future in pending:
+                    if not future.done():
+                        future.set_result(None)
+        finally:
+            self._publishing = False
+
+    def _publish(self, messages: List[Message]) -> None:
+        """Publish messages with paho."""
+        for msg in messages:
+            _LOGGER.debug("Transmitting message on %s: %s", msg.topic, msg.payload)
+            self._mqttc.publish(msg.topic, msg.payload, msg.qos, msg.retain)
 
     async def async_connect(self) -> str:
         """Connect to the host. Does process messages yet.
@@ -844,6 +944,7 @@ class MQTT:
 
         subscription = Subscription(topic, msg_callback, qos, encoding)
         self.subscriptions.append(subscription)
+        self._subscription_trie.add(subscription)
 
         await self._async_perform_subscription(topic, qos)
 
@@ -853,6 +954,7 @@ class MQTT:
             if subscription not in self.subscriptions:
                 raise HomeAssistantError("Can't remove subscription twice")
             self.subscriptions.remove(subscription)
+            self._subscription_trie.remove(subscription)
 
             if any(other.topic == topic for other in self.subscriptions):
                 # Other subscriptions on topic remaining - don't unsubscribe.
@@ -912,8 +1014,43 @@ class MQTT:
             self.hass.add_job(self.async_publish(*attr.astuple(self.birth_message)))
 
     def _mqtt_on_message(self, _mqttc, _userdata, msg) -> None:
-        """Message received callback."""
-        self.hass.add_job(self._mqtt_handle_message, msg)
+        """Message received callback.
+
+        Messages are queued, and the event loop is only woken up for the
+        first message of every batch.
+        """
+        with self._pending_messages_lock:
+            self._pending_messages.append((msg, time.monotonic()))
+            if self._handle_pending_scheduled:
+                return
+            self._handle_pending_scheduled = True
+
+        self.hass.loop.call_soon_threadsafe(self._mqtt_handle_pending_messages)
+
+    @callback
+    def _mqtt_handle_pending_messages(self) -> None:
+        """Handle all messages queued by the paho thread."""
+        with self._pending_messages_lock:
+            pending = self._pending_messages
+            self._pending_messages = []
+            self._handle_pending_scheduled = False
+
+        self.stats.async_record_batch(
+            [received for _, received in pending], time.monotonic()
+        )
+
+        for msg, _ in pending:
+            try:
+                self._mqtt_handle_message(msg)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error handling message on %s", msg.topic)
+
+    @callback
+    def async_stats(self) -> Dict[str, Any]:
+        """Return the message counters."""
+        with self._pending_messages_lock:
+            queue_depth = len(self._pending_messages)
+        return self.stats.as_dict(queue_depth)
 
     @callback
     def _mqtt_handle_message(self, msg) -> None:
@@ -924,21 +1061,27 @@ class MQTT:
             msg.payload,
         )
 
-        for subscription in self.subscriptions:
-            if not _match_topic(subscription.topic, msg.topic):
-                continue
+        # Payloads are decoded once for each encoding
+        payloads = {}  # type: Dict[str, Optional[str]]
 
+        for subscription in self._subscription_trie.match(msg.topic):
             payload = msg.payload  # type: SubscribePayloadType
-            if subscription.encoding is not None:
-                try:
-                    payload = msg.payload.decode(subscription.encoding)
-                except (AttributeError, UnicodeDecodeError):
-                    _LOGGER.warning(
-                        "Can't decode payload %s on %s with encoding %s",
-                        msg.payload,
-                        msg.topic,
-                        subscription.encoding,
-                    )
+            encoding = subscription.encoding
+            if encoding is not None:
+                if encoding not in payloads:
+                    try:
+                        payloads[encoding] = msg.payload.decode(encoding)
+                    except (AttributeError, UnicodeDecodeError):
+                        payloads[encoding] = None
+                        _LOGGER.warning(
+                            "Can't decode payload %s on %s with encoding %s",
+                            msg.payload,
+                            msg.topic,
+                            encoding,
+                        )
+
+                payload = payloads[encoding]
+                if payload is None:
                     continue
 
             self.hass.async_run_job(
@@ -985,17 +1128,95 @@ def _raise_on_error(result_code: int) -> None:
         )
 
 
-def _match_topic(subscription: str, topic: str) -> bool:
-    """Test if topic matches subscription."""
-    from paho.mqtt.matcher import MQTTMatcher
+class _TopicNode:
+    """Level of a topic in the subscription trie."""
 
-    matcher = MQTTMatcher()
-    matcher[subscription] = True
-    try:
-        next(matcher.iter_match(topic))
-        return True
-    except StopIteration:
-        return False
+    __slots__ = ("children", "subscriptions")
+
+    def __init__(self) -> None:
+        """Initialize the node."""
+        self.children = {}  # type: Dict[str, _TopicNode]
+        self.subscriptions = []  # type: List[Tuple[int, Subscription]]
+
+
+class SubscriptionTrie:
+    """Find the subscriptions matching a topic.
+
+    Subscriptions are stored by topic level, so a topic only visits the
+    levels it can match, including the + and # wildcard levels. Topics
+    starting with $ are not matched by wildcards on their first level.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the trie."""
+        self._root = _TopicNode()
+        self._counter = count()
+
+    def add(self, subscription: Subscription) -> None:
+        """Add a subscription."""
+        node = self._root
+        for level in subscription.topic.split("/"):
+            child = node.children.get(level)
+            if child is None:
+                child = node.children[level] = _TopicNode()
+            node = child
+
+        node.subscriptions.append((next(self._counter), subscription))
+
+    def remove(self, subscription: Subscription) -> None:
+        """Remove a subscription."""
+        path = [self._root]
+        levels = subscription.topic.split("/")
+        for level in levels:
+            path.append(path[-1].children[level])
+
+        node = path[-1]
+        node.subscriptions = [
+            item for item in node.subscriptions if item[1] is not subscription
+        ]
+
+        # Prune the levels that no longer lead to any subscription
+        for level, parent, child in zip(
+            reversed(levels), reversed(path[:-1]), reversed(path[1:])
+        ):
+            if child.subscriptions or child.children:
+                break
+            del parent.children[level]
+
+    def match(self, topic: str) -> List[Subscription]:
+        """Return the subscriptions matching topic in subscription order."""
+        levels = topic.split("/")
+        matches = []  # type: List[Tuple[int, Subscription]]
+        nodes = [self._root]
+        wildcards = not topic.startswith("$")
+
+        for index, level in enumerate(levels):
+            next_nodes = []
+            for node in nodes:
+                children = node.children
+                if wildcards or index > 0:
+                    subtree = children.get("#")
+                    if subtree is not None:
+                        matches.extend(subtree.subscriptions)
+                    single = children.get("+")
+                    if single is not None:
+                        next_nodes.append(single)
+                child = children.get(level)
+                if child is not None:
+                    next_nodes.append(child)
+            if not next_nodes:
+                break
+            nodes = next_nodes
+        else:
+            for node in nodes:
+                matches.extend(node.subscriptions)
+                # A # level also matches its parent level
+                subtree = node.children.get("#")
+                if subtree is not None:
+                    matches.extend(subtree.subscriptions)
+
+        matches.sort(key=itemgetter(0))
+        return [subscription for _, subscription in matches]
 
 
 class MqttAttributes(Entity):
@@ -1260,3 +1481,23 @@ async def websocket_subscribe(hass, connection, msg):
     )
 
     connection.send_message(websocket_api.result_message(msg["id"]))
+
+
+@callback
+@websocket_api.websocket_command({vol.Required("type"): "mqtt/stats"})
+def websocket_stats(hass, connection, msg):
+    """Return the message counters of the MQTT client."""
+    if not connection.user.is_admin:
+        raise Unauthorized
+
+    if DATA_MQTT not in hass.data:
+        connection.send_message(
+            websocket_api.error_message(
+                msg["id"], websocket_api.const.ERR_NOT_FOUND, "MQTT is not set up"
+            )
+        )
+        return
+
+    connection.send_message(
+        websocket_api.result_message(msg["id"], hass.data[DATA_MQTT].async_stats())
+    )
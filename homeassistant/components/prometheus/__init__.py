@@ -1,4 +1,6 @@
 """Support for Prometheus metrics export."""
+from datetime import timedelta
+from functools import partial
 import logging
 
 from aiohttp import web
@@ -33,6 +35,14 @@ CONF_COMPONENT_CONFIG_GLOB = "component_config_glob"
 CONF_COMPONENT_CONFIG_DOMAIN = "component_config_domain"
 CONF_DEFAULT_METRIC = "default_metric"
 CONF_OVERRIDE_METRIC = "override_metric"
+CONF_MODE = "mode"
+CONF_CACHE_TIME = "cache_time"
+
+MODE_EVENTS = "events"
+MODE_SCRAPE = "scrape"
+
+DEFAULT_CACHE_TIME = timedelta(seconds=5)
+
 COMPONENT_CONFIG_SCHEMA_ENTRY = vol.Schema(
     {vol.Optional(CONF_OVERRIDE_METRIC): cv.string}
 )
@@ -54,6 +64,12 @@ CONFIG_SCHEMA = vol.Schema(
                 vol.Optional(CONF_COMPONENT_CONFIG_DOMAIN, default={}): vol.Schema(
                     {cv.string: COMPONENT_CONFIG_SCHEMA_ENTRY}
                 ),
+                vol.Optional(CONF_MODE, default=MODE_EVENTS): vol.In(
+                    [MODE_EVENTS, MODE_SCRAPE]
+                ),
+                vol.Optional(
+                    CONF_CACHE_TIME, default=DEFAULT_CACHE_TIME
+                ): cv.time_period,
             }
         )
     },
@@ -65,8 +81,6 @@ def setup(hass, config):
     """Activate Prometheus component."""
     import prometheus_client
 
-    hass.http.register_view(PrometheusView(prometheus_client))
-
     conf = config[DOMAIN]
     entity_filter = conf[CONF_FILTER]
     namespace = conf.get(CONF_PROM_NAMESPACE)
@@ -79,7 +93,8 @@ def setup(hass, config):
         conf[CONF_COMPONENT_CONFIG_GLOB],
     )
 
-    metrics = PrometheusMetrics(
+    metrics_factory = partial(
+        PrometheusMetrics,
         prometheus_client,
         entity_filter,
         namespace,
@@ -89,6 +104,21 @@ def setup(hass, config):
         default_metric,
     )
 
+    if conf[CONF_MODE] == MODE_SCRAPE:
+        collector = PrometheusScrapeCollector(
+            hass,
+            prometheus_client,
+            metrics_factory,
+            entity_filter,
+            conf[CONF_CACHE_TIME],
+        )
+        hass.http.register_view(PrometheusView(prometheus_client, collector))
+        hass.bus.listen(EVENT_STATE_CHANGED, collector.async_handle_event)
+        return True
+
+    hass.http.register_view(PrometheusView(prometheus_client))
+
+    metrics = metrics_factory()
     hass.bus.listen(EVENT_STATE_CHANGED, metrics.handle_event)
     return True
 
@@ -105,9 +135,13 @@ class PrometheusMetrics:
         component_config,
         override_metric,
         default_metric,
+        registry=None,
     ):
         """Initialize Prometheus Metrics."""
         self.prometheus_client = prometheus_client
+        if registry is None:
+            registry = prometheus_client.REGISTRY
+        self._registry = registry
         self._component_config = component_config
         self._override_metric = override_metric
         self._default_metric = default_metric
@@ -135,22 +169,39 @@ class PrometheusMetrics:
 
         entity_id = state.entity_id
         _LOGGER.debug("Handling state update for %s", entity_id)
-        domain, _ = hacore.split_entity_id(entity_id)
 
         if not self._filter(state.entity_id):
             return
 
+        self.handle_state(state)
+        self.count_state_changes(state)
+
+    def handle_state(self, state):
+        """Set the metrics of the current state of an entity."""
+        domain, _ = hacore.split_entity_id(state.entity_id)
         handler = f"_handle_{domain}"
 
         if hasattr(self, handler):
             getattr(self, handler)(state)
 
+    def count_state_changes(self, state, count=1):
+        """Count state changes of the entity of state."""
+        labels = self._labels(state)
+
+        if state.domain == "automation":
+            metric = self._metric(
+                "automation_triggered_count",
+                self.prometheus_client.Counter,
+                "Count of times an automation has been triggered",
+            )
+            metric.labels(**labels).inc(count)
+
         metric = self._metric(
             "state_change",
             self.prometheus_client.Counter,
             "The number of state changes",
         )
-        metric.labels(**self._labels(state)).inc()
+        metric.labels(**labels).inc(count)
 
     def _metric(self, metric, factory, documentation, labels=None):
         if labels is None:
@@ -160,7 +211,9 @@ class PrometheusMetrics:
             return self._metrics[metric]
         except KeyError:
             full_metric_name = f"{self.metrics_prefix}{metric}"
-            self._metrics[metric] = factory(full_metric_name, documentation, labels)
+            self._metrics[metric] = factory(
+                full_metric_name, documentation, labels, registry=self._registry
+            )
             return self._metrics[metric]
 
     @staticmethod
@@ -366,14 +419,99 @@ class PrometheusMetrics:
     def _handle_zwave(self, state):
         self._battery(state)
 
-    def _handle_automation(self, state):
-        metric = self._metric(
-            "automation_triggered_count",
-            self.prometheus_client.Counter,
-            "Count of times an automation has been triggered",
-        )
 
-        metric.labels(**self._labels(state)).inc()
+class PrometheusScrapeCollector:
+    """Collect the metrics of the current states when they are scraped.
+
+    State changes are only counted as they happen, and the counts of
+    removed entities are dropped. The other metrics are set from all states
+    when the metrics are requested, rendered in the executor and cached for
+    cache_time, so fast changing states cost nothing between scrapes.
+    Unlike metrics set on every state change, metrics of removed entities
+    are not exported anymore.
+    """
+
+    def __init__(
+        self, hass, prometheus_client, metrics_factory, entity_filter, cache_time
+    ):
+        """Initialize the collector."""
+        self.hass = hass
+        self.prometheus_client = prometheus_client
+        self._metrics_factory = metrics_factory
+        self._filter = entity_filter
+        self._cache_time = cache_time.total_seconds()
+        # Whether each entity is exported
+        self._included = {}
+        # Latest state and number of state changes of each entity
+        self._state_changes = {}
+        self._body = None
+        self._rendered_at = None
+        self._render_task = None
+
+    def _is_included(self, entity_id):
+        """Return if an entity is exported."""
+        included = self._included.get(entity_id)
+        if included is None:
+            included = self._included[entity_id] = self._filter(entity_id)
+        return included
+
+    @hacore.callback
+    def async_handle_event(self, event):
+        """Count a state change."""
+        state = event.data.get("new_state")
+        if state is None:
+            entity_id = event.data.get("entity_id")
+            self._state_changes.pop(entity_id, None)
+            self._included.pop(entity_id, None)
+            return
+
+        if not self._is_included(state.entity_id):
+            return
+
+        changes = self._state_changes.get(state.entity_id)
+        count = changes[1] + 1 if changes is not None else 1
+        self._state_changes[state.entity_id] = (state, count)
+
+    async def async_render(self):
+        """Return the exposition of the metrics of the current states."""
+        now = self.hass.loop.time()
+        if self._body is not None and now - self._rendered_at < self._cache_time:
+            return self._body
+
+        if self._render_task is None:
+            states = [
+                state
+                for state in self.hass.states.async_all()
+                if self._is_included(state.entity_id)
+            ]
+            self._render_task = self.hass.async_add_executor_job(
+                self._render, states, list(self._state_changes.values())
+            )
+
+        render_task = self._render_task
+        try:
+            body = await render_task
+        finally:
+            if self._render_task is render_task:
+                self._render_task = None
+
+        self._body = body
+        self._rendered_at = now
+        return body
+
+    def _render(self, states, state_changes):
+        """Render the metrics of states with the default metrics."""
+        registry = self.prometheus_client.CollectorRegistry(auto_describe=False)
+        metrics = self._metrics_factory(registry=registry)
+
+        for state in states:
+            metrics.handle_state(state)
+        for state, count in state_changes:
+            metrics.count_state_changes(state, count)
+
+        return self.prometheus_client.generate_latest() + (
+            self.prometheus_client.generate_latest(registry)
+        )
 
 
 class PrometheusView(HomeAssistantView):
@@ -382,15 +520,20 @@ class PrometheusView(HomeAssistantView):
     url = API_ENDPOINT
     name = "api:prometheus"
 
-    def __init__(self, prometheus_client):
+    def __init__(self, prometheus_client, collector=None):
         """Initialize Prometheus view."""
         self.prometheus_client = prometheus_client
+        self.collector = collector
 
     async def get(self, request):
         """Handle request for Prometheus metrics."""
         _LOGGER.debug("Received Prometheus metrics request")
 
-        return web.Response(
-            body=self.prometheus_client.generate_latest(),
-            content_type=CONTENT_TYPE_TEXT_PLAIN,
-        )
+        if self.collector is not None:
+            body = await self.collector.async_render()
+        else:
+            body = await request.app["hass"].async_add_executor_job(
+                self.prometheus_client.generate_latest
+            )
+
+        return web.Response(body=body, content_type=CONTENT_TYPE_TEXT_PLAIN)
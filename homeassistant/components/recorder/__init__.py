@@ -1,6 +1,6 @@
 """Support for recording details."""
 import asyncio
-from collections import namedtuple
+from collections import OrderedDict, namedtuple
 import concurrent.futures
 from datetime import datetime, timedelta
 import logging
@@ -23,13 +23,15 @@ from homeassistant.const import (
     EVENT_TIME_CHANGED,
     MATCH_ALL,
 )
+from homeassistant.components import websocket_api
 from homeassistant.core import CoreState, HomeAssistant, callback
+from homeassistant.exceptions import Unauthorized
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.entityfilter import generate_filter
 from homeassistant.helpers.typing import ConfigType
 import homeassistant.util.dt as dt_util
 
-from . import migration, purge
+from . import migration, purge, snapshot, statistics
 from .const import DATA_INSTANCE
 from .util import session_scope
 
@@ -38,6 +40,7 @@ _LOGGER = logging.getLogger(__name__)
 DOMAIN = "recorder"
 
 SERVICE_PURGE = "purge"
+SERVICE_REPACK = "repack"
 
 ATTR_KEEP_DAYS = "keep_days"
 ATTR_REPACK = "repack"
@@ -56,9 +59,17 @@ CONF_DB_URL = "db_url"
 CONF_PURGE_KEEP_DAYS = "purge_keep_days"
 CONF_PURGE_INTERVAL = "purge_interval"
 CONF_EVENT_TYPES = "event_types"
+CONF_COMMIT_INTERVAL = "commit_interval"
+CONF_COMMIT_MAX_EVENTS = "commit_max_events"
 
 CONNECT_RETRY_WAIT = 3
 
+DEFAULT_COMMIT_INTERVAL = 0
+DEFAULT_COMMIT_MAX_EVENTS = 1000
+
+# Distinct attribute sets whose id is kept in memory by the recorder
+ATTRIBUTES_CACHE_SIZE = 2048
+
 FILTER_SCHEMA = vol.Schema(
     {
         vol.Optional(CONF_EXCLUDE, default={}): vol.Schema(
@@ -88,6 +99,12 @@ CONFIG_SCHEMA = vol.Schema(
                     vol.Coerce(int), vol.Range(min=0)
                 ),
                 vol.Optional(CONF_DB_URL): cv.string,
+                vol.Optional(
+                    CONF_COMMIT_INTERVAL, default=DEFAULT_COMMIT_INTERVAL
+                ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_COMMIT_MAX_EVENTS, default=DEFAULT_COMMIT_MAX_EVENTS
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
             }
         )
     },
@@ -127,6 +144,8 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     conf = config[DOMAIN]
     keep_days = conf.get(CONF_PURGE_KEEP_DAYS)
     purge_interval = conf.get(CONF_PURGE_INTERVAL)
+    commit_interval = conf.get(CONF_COMMIT_INTERVAL, DEFAULT_COMMIT_INTERVAL)
+    commit_max_events = conf.get(CONF_COMMIT_MAX_EVENTS, DEFAULT_COMMIT_MAX_EVENTS)
 
     db_url = conf.get(CONF_DB_URL, None)
     if not db_url:
@@ -141,6 +160,8 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
         uri=db_url,
         include=include,
         exclude=exclude,
+        commit_interval=commit_interval,
+        commit_max_events=commit_max_events,
     )
     instance.async_initialize()
     instance.start()
@@ -153,10 +174,38 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
         DOMAIN, SERVICE_PURGE, async_handle_purge_service, schema=SERVICE_PURGE_SCHEMA
     )
 
+    async def async_handle_repack_service(service):
+        """Handle calls to the repack service."""
+        instance.do_adhoc_repack()
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_REPACK, async_handle_repack_service, schema=vol.Schema({})
+    )
+
+    websocket_api.async_register_command(hass, websocket_stats)
+
     return await instance.async_db_ready
 
 
+@callback
+@websocket_api.websocket_command({vol.Required("type"): "recorder/stats"})
+def websocket_stats(hass, connection, msg):
+    """Return the commit and purge metrics of the recorder."""
+    if not connection.user.is_admin:
+        raise Unauthorized
+
+    connection.send_message(
+        websocket_api.result_message(msg["id"], hass.data[DATA_INSTANCE].async_stats())
+    )
+
+
 PurgeTask = namedtuple("PurgeTask", ["keep_days", "repack"])
+RepackTask = namedtuple("RepackTask", [])
+StatisticsTask = namedtuple("StatisticsTask", ["end"])
+SnapshotTask = namedtuple("SnapshotTask", ["point_in_time"])
+
+# Returned by Recorder._collect_batch when the batch was not ended by a task
+_NO_TASK = object()
 
 
 class Recorder(threading.Thread):
@@ -170,6 +219,8 @@ class Recorder(threading.Thread):
         uri: str,
         include: Dict,
         exclude: Dict,
+        commit_interval: float = DEFAULT_COMMIT_INTERVAL,
+        commit_max_events: int = DEFAULT_COMMIT_MAX_EVENTS,
     ) -> None:
         """Initialize the recorder."""
         threading.Thread.__init__(self, name="Recorder")
@@ -177,6 +228,8 @@ class Recorder(threading.Thread):
         self.hass = hass
         self.keep_days = keep_days
         self.purge_interval = purge_interval
+        self.commit_interval = commit_interval
+        self.commit_max_events = commit_max_events
         self.queue = queue.Queue()  # type: Any
         self.recording_start = dt_util.utcnow()
         self.db_url = uri
@@ -194,11 +247,35 @@ class Recorder(threading.Thread):
 
         self.get_session = None
 
+        # Most recently used attribute JSON mapped to its attributes_id,
+        # only touched from the recorder thread.
+        self._attributes_ids = OrderedDict()  # type: OrderedDict
+
+        # Metrics about the commit pipeline, useful to tune the batching
+        self.stats = {
+            "commits": 0,
+            "events_committed": 0,
+            "last_batch_size": 0,
+            "last_commit_duration": 0.0,
+            "max_commit_duration": 0.0,
+            "queue_depth": 0,
+            "max_queue_depth": 0,
+            "rows_purged": 0,
+            "purge_rate": 0.0,
+        }  # type: Dict[str, Any]
+
     @callback
     def async_initialize(self):
         """Initialize the recorder."""
         self.hass.bus.async_listen(MATCH_ALL, self.event_listener)
 
+    @callback
+    def async_stats(self) -> Dict[str, Any]:
+        """Return the metrics, with the current depth of the queue."""
+        stats = dict(self.stats)
+        stats["current_queue_depth"] = self.queue.qsize()
+        return stats
+
     def do_adhoc_purge(self, **kwargs):
         """Trigger an adhoc purge retaining keep_days worth of data."""
         keep_days = kwargs.get(ATTR_KEEP_DAYS, self.keep_days)
@@ -206,11 +283,14 @@ class Recorder(threading.Thread):
 
         self.queue.put(PurgeTask(keep_days, repack))
 
+    def do_adhoc_repack(self):
+        """Trigger an adhoc repack of the database."""
+        self.queue.put(RepackTask())
+
     def run(self):
         """Start processing events to save."""
-        from .models import States, Events
+        from .models import Events
         from homeassistant.components import persistent_notification
-        from sqlalchemy import exc
 
         tries = 1
         connected = False
@@ -308,79 +388,301 @@ class Recorder(threading.Thread):
 
             self.hass.helpers.event.track_point_in_time(async_purge, run)
 
-        while True:
-            event = self.queue.get()
+        @callback
+        def async_compile_statistics(now):
+            """Compile the statistics of the hours that ended."""
+            self.queue.put(StatisticsTask(now))
+
+        # Catch up with the hours missed while not running, then compile
+        # every hour shortly after it ended.
+        self.queue.put(StatisticsTask(dt_util.utcnow()))
+        self.hass.helpers.event.track_utc_time_change(
+            async_compile_statistics, minute=0, second=10
+        )
 
-            if event is None:
+        @callback
+        def async_snapshot(now):
+            """Store the latest state of every entity."""
+            self.queue.put(SnapshotTask(now))
+
+        # Keeps the range history has to scan for the states at a point in
+        # time to at most an hour.
+        self.hass.helpers.event.track_utc_time_change(
+            async_snapshot, minute=30, second=0
+        )
+
+        task = self.queue.get()
+        while True:
+            if task is None:
                 self._close_run()
                 self._close_connection()
                 self.queue.task_done()
                 return
-            if isinstance(event, PurgeTask):
-                purge.purge_old_data(self, event.keep_days, event.repack)
+            if isinstance(task, PurgeTask):
+                if not purge.purge_old_data(self, task.keep_days, task.repack):
+                    # Purge the next batch after the events queued meanwhile
+                    self.queue.put(task)
+                self.queue.task_done()
+                task = self.queue.get()
+                continue
+            if isinstance(task, RepackTask):
+                purge.repack_database(self)
                 self.queue.task_done()
+                task = self.queue.get()
                 continue
-            elif event.event_type == EVENT_TIME_CHANGED:
+            if isinstance(task, SnapshotTask):
+                self._create_snapshot(task.point_in_time)
                 self.queue.task_done()
+                task = self.queue.get()
                 continue
-            elif event.event_type in self.exclude_t:
+            if isinstance(task, StatisticsTask):
+                if not statistics.compile_statistics(self, task.end):
+                    # Compile the next hour after the events queued meanwhile
+                    self.queue.put(task)
                 self.queue.task_done()
+                task = self.queue.get()
+                continue
+            if not self._should_record(task):
+                self.queue.task_done()
+                task = self.queue.get()
                 continue
 
-            entity_id = event.data.get(ATTR_ENTITY_ID)
-            if entity_id is not None:
-                if not self.entity_filter(entity_id):
-                    self.queue.task_done()
-                    continue
-
-            tries = 1
-            updated = False
-            while not updated and tries <= 10:
-                if tries != 1:
-                    time.sleep(CONNECT_RETRY_WAIT)
-                try:
-                    with session_scope(session=self.get_session()) as session:
-                        try:
-                            dbevent = Events.from_event(event)
-                            session.add(dbevent)
-                            session.flush()
-                        except (TypeError, ValueError):
-                            _LOGGER.warning("Event is not JSON serializable: %s", event)
-
-                        if event.event_type == EVENT_STATE_CHANGED:
-                            try:
-                                dbstate = States.from_event(event)
-                                dbstate.event_id = dbevent.event_id
-                                session.add(dbstate)
-                            except (TypeError, ValueError):
-                                _LOGGER.warning(
-                                    "State is not JSON serializable: %s",
-                                    event.data.get("new_state"),
-                                )
-
-                    updated = True
-
-                except exc.OperationalError as err:
-                    _LOGGER.error(
-                        "Error in database connectivity: %s. "
-                        "(retrying in %s seconds)",
-                        err,
-                        CONNECT_RETRY_WAIT,
-                    )
-                    tries += 1
+            batch, task = self._collect_batch(task)
+            self._commit_batch(batch)
+
+            for _ in batch:
+                self.queue.task_done()
+
+            if task is _NO_TASK:
+                task = self.queue.get()
+
+    def _should_record(self, event):
+        """Return if an event should be written to the database."""
+        if event.event_type == EVENT_TIME_CHANGED:
+            return False
+        if event.event_type in self.exclude_t:
+            return False
+
+        entity_id = event.data.get(ATTR_ENTITY_ID)
+        if entity_id is not None and not self.entity_filter(entity_id):
+            return False
+
+        return True
+
+    def _collect_batch(self, first_event):
+        """Drain the queue into a batch of events to commit together.
+
+        Events are collected until commit_interval seconds have passed since
+        the first event, commit_max_events is reached or, with a zero commit
+        interval, the queue is empty. Returns the batch and the maintenance or
+        shutdown task that ended it, or _NO_TASK.
+        """
+        batch = [first_event]
+        deadline = time.monotonic() + self.commit_interval
+
+        while len(batch) < self.commit_max_events:
+            try:
+                if self.commit_interval:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    task = self.queue.get(timeout=timeout)
+                else:
+                    task = self.queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if task is None or isinstance(
+                task, (PurgeTask, RepackTask, SnapshotTask, StatisticsTask)
+            ):
+                return batch, task
+
+            if not self._should_record(task):
+                self.queue.task_done()
+                continue
+
+            batch.append(task)
+
+        return batch, _NO_TASK
 
-                except exc.SQLAlchemyError:
-                    updated = True
-                    _LOGGER.exception("Error saving event: %s", event)
+    def _commit_batch(self, batch):
+        """Write a batch of events and their states in a single transaction."""
+        from sqlalchemy import exc
+
+        queue_depth = self.queue.qsize()
+        self.stats["queue_depth"] = queue_depth
+        self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], queue_depth)
 
-            if not updated:
+        timer_start = time.perf_counter()
+        tries = 1
+        updated = False
+        while not updated and tries <= 10:
+            if tries != 1:
+                time.sleep(CONNECT_RETRY_WAIT)
+            try:
+                with session_scope(session=self.get_session()) as session:
+                    new_attributes = self._save_batch(session, batch)
+                # Only cache ids once the transaction that created them is in
+                self._cache_attributes_ids(new_attributes)
+                updated = True
+
+            except exc.OperationalError as err:
                 _LOGGER.error(
-                    "Error in database update. Could not save "
-                    "after %d tries. Giving up",
-                    tries,
+                    "Error in database connectivity: %s. (retrying in %s seconds)",
+                    err,
+                    CONNECT_RETRY_WAIT,
                 )
+                tries += 1
+
+            except exc.SQLAlchemyError:
+                updated = True
+                _LOGGER.exception(
+                    "Error saving %d events, saving them one by one", len(batch)
+                )
+                self._commit_one_by_one(batch)
+
+        if not updated:
+            _LOGGER.error(
+                "Error in database update. Could not save after %d tries. Giving up",
+                tries,
+            )
+            return
+
+        elapsed = time.perf_counter() - timer_start
+        self.stats["commits"] += 1
+        self.stats["events_committed"] += len(batch)
+        self.stats["last_batch_size"] = len(batch)
+        self.stats["last_commit_duration"] = elapsed
+        self.stats["max_commit_duration"] = max(
+            self.stats["max_commit_duration"], elapsed
+        )
+
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug(
+                "Committed %d events in %fs, %d events queued",
+                len(batch),
+                elapsed,
+                queue_depth,
+            )
+
+    def _commit_one_by_one(self, batch):
+        """Write the events of a failed batch in a transaction each.
+
+        Only the events that fail on their own are lost.
+        """
+        from sqlalchemy import exc
+
+        for event in batch:
+            try:
+                with session_scope(session=self.get_session()) as session:
+                    new_attributes = self._save_batch(session, [event])
+                self._cache_attributes_ids(new_attributes)
+            except exc.SQLAlchemyError:
+                _LOGGER.exception("Error saving event: %s", event)
 
-            self.queue.task_done()
+    def _save_batch(self, session, batch):
+        """Insert the events of a batch, then the states linked to them.
+
+        The events and new attributes are inserted one row at a time, as
+        SQLAlchemy only returns their ids that way. The states, whose ids
+        are not needed, are inserted with a single executemany.
+
+        Returns the attributes that were inserted, mapped to their id.
+        """
+        from .models import States, Events
+
+        dbevents = []
+        pending_states = []
+        for event in batch:
+            dbevent = None
+            try:
+                dbevent = Events.from_event(event)
+                dbevents.append(dbevent)
+            except (TypeError, ValueError):
+                _LOGGER.warning("Event is not JSON serializable: %s", event)
+
+            if event.event_type == EVENT_STATE_CHANGED:
+                try:
+                    pending_states.append((States.from_event(event), dbevent))
+                except (TypeError, ValueError):
+                    _LOGGER.warning(
+                        "State is not JSON serializable: %s",
+                        event.data.get("new_state"),
+                    )
+
+        # Events need their primary key returned to link the states to them,
+        # which makes SQLAlchemy insert them one by one
+        session.bulk_save_objects(dbevents, return_defaults=True)
+
+        dbstates = []
+        new_attributes = {}
+        for dbstate, dbevent in pending_states:
+            if dbevent is not None:
+                dbstate.event_id = dbevent.event_id
+            dbstates.append(dbstate)
+
+            shared_attrs = dbstate.state_attributes.shared_attrs
+            if shared_attrs in new_attributes:
+                continue
+            attributes_id = self._attributes_ids.get(shared_attrs)
+            if attributes_id is None:
+                attributes_id = self._find_attributes_id(session, shared_attrs)
+            if attributes_id is None:
+                new_attributes[shared_attrs] = dbstate.state_attributes
+            else:
+                self._attributes_ids.move_to_end(shared_attrs)
+                dbstate.attributes_id = attributes_id
+
+        if new_attributes:
+            session.bulk_save_objects(new_attributes.values(), return_defaults=True)
+            for dbstate in dbstates:
+                if dbstate.attributes_id is None:
+                    dbstate.attributes_id = new_attributes[
+                        dbstate.state_attributes.shared_attrs
+                    ].attributes_id
+
+        session.bulk_save_objects(dbstates)
+
+        return {
+            shared_attrs: dbattributes.attributes_id
+            for shared_attrs, dbattributes in new_attributes.items()
+        }
+
+    def _find_attributes_id(self, session, shared_attrs):
+        """Return the id of attributes stored by an earlier run, caching it."""
+        from .models import StateAttributes
+
+        query = session.query(
+            StateAttributes.attributes_id, StateAttributes.shared_attrs
+        ).filter(
+            StateAttributes.hash == StateAttributes.hash_shared_attrs(shared_attrs)
+        )
+        for attributes_id, stored_attrs in query:
+            # Hashes can collide, the JSON can not
+            if stored_attrs == shared_attrs:
+                self._cache_attributes_ids({shared_attrs: attributes_id})
+                return attributes_id
+        return None
+
+    def _cache_attributes_ids(self, attributes_ids):
+        """Add attributes ids to the cache, evicting the least recently used."""
+        self._attributes_ids.update(attributes_ids)
+        while len(self._attributes_ids) > ATTRIBUTES_CACHE_SIZE:
+            self._attributes_ids.popitem(last=False)
+
+    def clear_attributes_cache(self):
+        """Forget the cached attributes ids, for when rows were deleted."""
+        self._attributes_ids.clear()
+
+    def _create_snapshot(self, point_in_time):
+        """Store the latest state of every entity of this run."""
+        from sqlalchemy.exc import SQLAlchemyError
+
+        try:
+            with session_scope(session=self.get_session()) as session:
+                snapshot.create_snapshot(session, self.run_info.start, point_in_time)
+        except SQLAlchemyError as err:
+            _LOGGER.warning("Error storing state snapshot: %s.", err)
 
     @callback
     def event_listener(self, event):
@@ -2,11 +2,14 @@
 import json
 from datetime import datetime
 import logging
+import zlib
 
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     Column,
     DateTime,
+    Float,
     ForeignKey,
     Index,
     Integer,
@@ -15,6 +18,7 @@ from sqlalchemy import (
     distinct,
 )
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship
 
 import homeassistant.util.dt as dt_util
 from homeassistant.core import Context, Event, EventOrigin, State, split_entity_id
@@ -24,7 +28,7 @@ from homeassistant.helpers.json import JSONEncoder
 # pylint: disable=invalid-name
 Base = declarative_base()
 
-SCHEMA_VERSION = 7
+SCHEMA_VERSION = 10
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -64,7 +68,7 @@ class Events(Base):  # type: ignore
                 self.event_type,
                 json.loads(self.event_data),
                 EventOrigin(self.origin),
-                _process_timestamp(self.time_fired),
+                process_timestamp(self.time_fired),
                 context=context,
             )
         except ValueError:
@@ -81,7 +85,11 @@ class States(Base):  # type: ignore
     domain = Column(String(64))
     entity_id = Column(String(255), index=True)
     state = Column(String(255))
+    # Only set on rows written before schema version 8
     attributes = Column(Text)
+    attributes_id = Column(
+        Integer, ForeignKey("state_attributes.attributes_id"), index=True
+    )
     event_id = Column(Integer, ForeignKey("events.event_id"), index=True)
     last_changed = Column(DateTime(timezone=True), default=datetime.utcnow)
     last_updated = Column(DateTime(timezone=True), default=datetime.utcnow, index=True)
@@ -96,6 +104,8 @@ class States(Base):  # type: ignore
         Index("ix_states_entity_id_last_updated", "entity_id", "last_updated"),
     )
 
+    state_attributes = relationship("StateAttributes", lazy="joined")
+
     @staticmethod
     def from_event(event):
         """Create object from a state_changed event."""
@@ -113,37 +123,101 @@ class States(Base):  # type: ignore
         if state is None:
             dbstate.state = ""
             dbstate.domain = split_entity_id(entity_id)[0]
-            dbstate.attributes = "{}"
             dbstate.last_changed = event.time_fired
             dbstate.last_updated = event.time_fired
         else:
             dbstate.domain = state.domain
             dbstate.state = state.state
-            dbstate.attributes = json.dumps(dict(state.attributes), cls=JSONEncoder)
             dbstate.last_changed = state.last_changed
             dbstate.last_updated = state.last_updated
 
+        dbstate.state_attributes = StateAttributes.from_event(event)
+
         return dbstate
 
     def to_native(self):
         """Convert to an HA state object."""
-        context = Context(id=self.context_id, user_id=self.context_user_id)
-        try:
-            return State(
-                self.entity_id,
-                self.state,
-                json.loads(self.attributes),
-                _process_timestamp(self.last_changed),
-                _process_timestamp(self.last_updated),
-                context=context,
-                # Temp, because database can still store invalid entity IDs
-                # Remove with 1.0 or in 2020.
-                temp_invalid_id_bypass=True,
-            )
-        except ValueError:
-            # When json.loads fails
-            _LOGGER.exception("Error converting row to state: %s", self)
-            return None
+        if self.state_attributes is not None:
+            return row_to_state(self, self.state_attributes.shared_attrs)
+        return row_to_state(self, self.attributes)
+
+
+class StateAttributes(Base):  # type: ignore
+    """Attributes shared by state rows, stored once per distinct value."""
+
+    __tablename__ = "state_attributes"
+    attributes_id = Column(Integer, primary_key=True)
+    hash = Column(BigInteger, index=True)
+    shared_attrs = Column(Text)
+
+    @staticmethod
+    def from_event(event):
+        """Create object from a state_changed event."""
+        state = event.data.get("new_state")
+        if state is None:
+            shared_attrs = "{}"
+        else:
+            shared_attrs = json.dumps(dict(state.attributes), cls=JSONEncoder)
+
+        return StateAttributes(
+            hash=StateAttributes.hash_shared_attrs(shared_attrs),
+            shared_attrs=shared_attrs,
+        )
+
+    @staticmethod
+    def hash_shared_attrs(shared_attrs):
+        """Return the hash the attributes are looked up by."""
+        return zlib.crc32(shared_attrs.encode("utf-8"))
+
+
+class StateSnapshots(Base):  # type: ignore
+    """Points in time the latest state of every entity was stored at."""
+
+    __tablename__ = "state_snapshots"
+    snapshot_id = Column(Integer, primary_key=True)
+    point_in_time = Column(DateTime(timezone=True), index=True)
+    created = Column(DateTime(timezone=True), default=datetime.utcnow)
+
+
+class SnapshotStates(Base):  # type: ignore
+    """The latest state of an entity at the point in time of a snapshot."""
+
+    __tablename__ = "snapshot_states"
+    snapshot_id = Column(
+        Integer, ForeignKey("state_snapshots.snapshot_id"), primary_key=True
+    )
+    state_id = Column(Integer, primary_key=True)
+
+
+class Statistics(Base):  # type: ignore
+    """Numeric sensor values rolled up per hour or per day."""
+
+    __tablename__ = "statistics"
+    id = Column(Integer, primary_key=True)
+    entity_id = Column(String(255))
+    period = Column(String(8))
+    start = Column(DateTime(timezone=True))
+    unit_of_measurement = Column(String(255))
+    mean = Column(Float)
+    min = Column(Float)
+    max = Column(Float)
+    last = Column(Float)
+    count = Column(Integer)
+    created = Column(DateTime(timezone=True), default=datetime.utcnow)
+
+    __table_args__ = (
+        # Used for fetching the statistics of a period (history)
+        Index("ix_statistics_period_start_entity_id", "period", "start", "entity_id"),
+    )
+
+
+class StatisticsRuns(Base):  # type: ignore
+    """Hours the statistics have been compiled for."""
+
+    __tablename__ = "statistics_runs"
+    run_id = Column(Integer, primary_key=True)
+    start = Column(DateTime(timezone=True), index=True)
+    created = Column(DateTime(timezone=True), default=datetime.utcnow)
 
 
 class RecorderRuns(Base):  # type: ignore
@@ -195,7 +269,32 @@ class SchemaChanges(Base):  # type: ignore
     changed = Column(DateTime(timezone=True), default=datetime.utcnow)
 
 
-def _process_timestamp(ts):
+def row_to_state(row, attributes):
+    """Convert a states row and its attributes JSON to an HA state object.
+
+    The row can be a States object or a row of a query selecting the
+    columns of the states table.
+    """
+    context = Context(id=row.context_id, user_id=row.context_user_id)
+    try:
+        return State(
+            row.entity_id,
+            row.state,
+            json.loads(attributes),
+            process_timestamp(row.last_changed),
+            process_timestamp(row.last_updated),
+            context=context,
+            # Temp, because database can still store invalid entity IDs
+            # Remove with 1.0 or in 2020.
+            temp_invalid_id_bypass=True,
+        )
+    except ValueError:
+        # When json.loads fails
+        _LOGGER.exception("Error converting row to state: %s", row)
+        return None
+
+
+def process_timestamp(ts):
     """Process a timestamp into datetime object."""
     if ts is None:
         return None
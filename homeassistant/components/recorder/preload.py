@@ -0,0 +1,138 @@
+"""Batched loading of the recent states of entities."""
+import logging
+
+from homeassistant.core import callback
+
+from .util import execute, session_scope
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_PRELOADER = "recorder_preloader"
+
+# Seconds to collect requests for before they are queried together and the
+# most requests queried with one statement.
+PRELOAD_DELAY = 0.1
+PRELOAD_MAX_REQUESTS = 100
+
+
+async def async_preload_states(
+    hass, entity_id, number_of_states=None, start_time=None, changes_only=True
+):
+    """Return the recorded states of an entity, oldest first.
+
+    Returns the last number_of_states states and/or the states updated at or
+    after start_time. With changes_only, updates of only the attributes are
+    left out. Requests made within PRELOAD_DELAY of each other, like the ones
+    of sensors loading their history at startup, are queried together.
+    """
+    preloader = hass.data.get(DATA_PRELOADER)
+    if preloader is None:
+        preloader = hass.data[DATA_PRELOADER] = StatesPreloader(hass)
+
+    return await preloader.async_request(
+        (entity_id.lower(), number_of_states, start_time, changes_only)
+    )
+
+
+def get_preload_states(hass, requests):
+    """Return the states of each request, oldest first.
+
+    A request is a tuple of entity_id, number_of_states, start_time and
+    changes_only as passed to async_preload_states.
+    """
+    results = [[] for _ in requests]
+
+    with session_scope(hass=hass) as session:
+        for offset in range(0, len(requests), PRELOAD_MAX_REQUESTS):
+            query = _preload_query(
+                session, requests[offset : offset + PRELOAD_MAX_REQUESTS], offset
+            )
+            for row, request in execute(query, to_native=False):
+                state = row.to_native()
+                if state is not None:
+                    results[request].append(state)
+
+    return results
+
+
+def _preload_query(session, requests, offset):
+    """Return the query of the states and request indexes of requests.
+
+    Each request is a subquery that is limited on its own, so the query
+    reads the same rows as querying the requests one by one.
+    """
+    from sqlalchemy import literal, union_all
+    from .models import States
+
+    subqueries = []
+    for index, (entity_id, number_of_states, start_time, changes_only) in enumerate(
+        requests, offset
+    ):
+        query = session.query(
+            States.state_id.label("state_id"), literal(index).label("request")
+        ).filter(States.entity_id == entity_id)
+
+        if changes_only:
+            query = query.filter(States.last_changed == States.last_updated)
+
+        if start_time is not None:
+            query = query.filter(States.last_updated >= start_time)
+
+        if number_of_states is not None:
+            query = query.order_by(States.last_updated.desc()).limit(number_of_states)
+
+        subqueries.append(query.subquery().select())
+
+    preload = union_all(*subqueries).alias("preload")
+
+    return (
+        session.query(States, preload.c.request)
+        .join(preload, States.state_id == preload.c.state_id)
+        .order_by(preload.c.request, States.last_updated)
+    )
+
+
+class StatesPreloader:
+    """Collect preload requests and query them together."""
+
+    def __init__(self, hass):
+        """Initialize the preloader."""
+        self.hass = hass
+        self._requests = []
+        self._futures = []
+
+    @callback
+    def async_request(self, request):
+        """Add a request and return the future of its states."""
+        if not self._requests:
+            self.hass.loop.call_later(PRELOAD_DELAY, self._async_flush)
+
+        future = self.hass.loop.create_future()
+        self._requests.append(request)
+        self._futures.append(future)
+        return future
+
+    @callback
+    def _async_flush(self):
+        """Query the collected requests."""
+        requests, self._requests = self._requests, []
+        futures, self._futures = self._futures, []
+        self.hass.async_create_task(self._async_load(requests, futures))
+
+    async def _async_load(self, requests, futures):
+        """Load the states of the requests and hand them out."""
+        _LOGGER.debug("Preloading the states of %d requests", len(requests))
+
+        try:
+            results = await self.hass.async_add_executor_job(
+                get_preload_states, self.hass, requests
+            )
+        except Exception as err:  # pylint: disable=broad-except
+            for future in futures:
+                if not future.done():
+                    future.set_exception(err)
+            return
+
+        for future, states in zip(futures, results):
+            if not future.done():
+                future.set_result(states)
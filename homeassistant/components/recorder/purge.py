@@ -1,6 +1,7 @@
 """Purge old data helper."""
 from datetime import timedelta
 import logging
+import time
 
 import homeassistant.util.dt as dt_util
 
@@ -8,35 +9,132 @@ from .util import session_scope
 
 _LOGGER = logging.getLogger(__name__)
 
+# Maximum number of states and of events deleted per purge step
+PURGE_BATCH_SIZE = 1000
+
 
 def purge_old_data(instance, purge_days, repack):
-    """Purge events and states older than purge_days ago."""
-    from .models import States, Events
+    """Purge events and states older than purge_days ago.
+
+    Every call deletes at most PURGE_BATCH_SIZE states and events, so the
+    recorder can write the events queued in the meantime before purging
+    more. Returns True when the purge is done and False when it has to be
+    called again.
+    """
+    from .models import Events, SnapshotStates, StateAttributes, States, StateSnapshots
+    from sqlalchemy import exists, func
     from sqlalchemy.exc import SQLAlchemyError
 
     purge_before = dt_util.utcnow() - timedelta(days=purge_days)
     _LOGGER.debug("Purging events before %s", purge_before)
 
+    timer_start = time.perf_counter()
     try:
         with session_scope(session=instance.get_session()) as session:
-            deleted_rows = (
-                session.query(States)
-                .filter((States.last_updated < purge_before))
-                .delete(synchronize_session=False)
+            deleted_states = _delete_batch(
+                session, States, States.state_id, States.last_updated, purge_before
+            )
+            _LOGGER.debug("Deleted %s states", deleted_states)
+
+            # Events still referred to by states are deleted with the states
+            deleted_events = _delete_batch(
+                session,
+                Events,
+                Events.event_id,
+                Events.time_fired,
+                purge_before,
+                ~exists().where(States.event_id == Events.event_id),
             )
-            _LOGGER.debug("Deleted %s states", deleted_rows)
+            _LOGGER.debug("Deleted %s events", deleted_events)
 
-            deleted_rows = (
-                session.query(Events)
-                .filter((Events.time_fired < purge_before))
-                .delete(synchronize_session=False)
+            done = (
+                deleted_states < PURGE_BATCH_SIZE and deleted_events < PURGE_BATCH_SIZE
             )
-            _LOGGER.debug("Deleted %s events", deleted_rows)
 
+            if done:
+                deleted_rows = (
+                    session.query(StateAttributes)
+                    .filter(
+                        ~exists().where(
+                            States.attributes_id == StateAttributes.attributes_id
+                        )
+                    )
+                    .delete(synchronize_session=False)
+                )
+                _LOGGER.debug("Deleted %s state attributes", deleted_rows)
+
+                last_snapshot_id = (
+                    session.query(func.max(StateSnapshots.snapshot_id))
+                    .filter(StateSnapshots.point_in_time < purge_before)
+                    .scalar()
+                )
+                if last_snapshot_id is not None:
+                    session.query(SnapshotStates).filter(
+                        SnapshotStates.snapshot_id <= last_snapshot_id
+                    ).delete(synchronize_session=False)
+                    session.query(StateSnapshots).filter(
+                        StateSnapshots.snapshot_id <= last_snapshot_id
+                    ).delete(synchronize_session=False)
+
+        elapsed = time.perf_counter() - timer_start
+        deleted_rows = deleted_states + deleted_events
+        instance.stats["rows_purged"] += deleted_rows
+        instance.stats["purge_rate"] = deleted_rows / elapsed if elapsed else 0.0
+        _LOGGER.debug(
+            "Purged %d rows in %fs, %d purged in total",
+            deleted_rows,
+            elapsed,
+            instance.stats["rows_purged"],
+        )
+
+        if not done:
+            return False
+
+        # Cached ids may point at attributes that were just deleted
+        instance.clear_attributes_cache()
+
+        if repack:
+            repack_database(instance)
+
+    except SQLAlchemyError as err:
+        _LOGGER.warning("Error purging history: %s.", err)
+
+    return True
+
+
+def repack_database(instance):
+    """Rewrite the database file to free the space of deleted rows."""
+    from sqlalchemy.exc import SQLAlchemyError
+
+    try:
         # Execute sqlite vacuum command to free up space on disk
-        if repack and instance.engine.driver == "pysqlite":
+        if instance.engine.driver == "pysqlite":
             _LOGGER.debug("Vacuuming SQLite to free space")
             instance.engine.execute("VACUUM")
-
     except SQLAlchemyError as err:
-        _LOGGER.warning("Error purging history: %s.", err)
+        _LOGGER.warning("Error repacking database: %s.", err)
+
+
+def _delete_batch(session, model, id_column, time_column, purge_before, *criteria):
+    """Delete the oldest rows before purge_before, one batch at a time.
+
+    The ids of the next batch are looked up through the time index and the
+    rows are deleted by id range, so neither statement touches more than
+    about a batch of rows. Only rows matching the extra criteria are
+    deleted.
+    """
+    query = (
+        session.query(id_column)
+        .filter(time_column < purge_before, *criteria)
+        .order_by(time_column)
+        .limit(PURGE_BATCH_SIZE)
+    )
+    ids = [row[0] for row in query]
+    if not ids:
+        return 0
+
+    return (
+        session.query(model)
+        .filter((id_column <= max(ids)) & (time_column < purge_before), *criteria)
+        .delete(synchronize_session=False)
+    )
@@ -0,0 +1,102 @@
+"""Snapshots of the latest state of every entity at a point in time."""
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def states_at(session, run_start, point_in_time):
+    """Return queries for the latest state of every entity at point_in_time.
+
+    Returns the query of the latest states since the last snapshot before
+    point_in_time, or since run_start when there is none, and the query of
+    the states of that snapshot or None. States of the first query replace
+    those of the same entity in the second one.
+    """
+    from .models import States, SnapshotStates, StateSnapshots
+
+    snapshot = (
+        session.query(StateSnapshots)
+        .filter(
+            (StateSnapshots.point_in_time >= run_start)
+            & (StateSnapshots.point_in_time <= point_in_time)
+        )
+        .order_by(StateSnapshots.point_in_time.desc())
+        .first()
+    )
+
+    if snapshot is None:
+        return _latest_states_query(session, run_start, point_in_time), None
+
+    snapshot_query = session.query(States).join(
+        SnapshotStates,
+        (SnapshotStates.state_id == States.state_id)
+        & (SnapshotStates.snapshot_id == snapshot.snapshot_id),
+    )
+    return (
+        _latest_states_query(session, snapshot.point_in_time, point_in_time),
+        snapshot_query,
+    )
+
+
+def create_snapshot(session, run_start, point_in_time):
+    """Store the latest state of every entity at point_in_time."""
+    from .models import States, SnapshotStates, StateSnapshots
+
+    recent_query, snapshot_query = states_at(session, run_start, point_in_time)
+
+    state_ids = {}
+    for query in (snapshot_query, recent_query):
+        if query is None:
+            continue
+        for entity_id, state_id in query.with_entities(
+            States.entity_id, States.state_id
+        ):
+            state_ids[entity_id] = state_id
+
+    snapshot = StateSnapshots(point_in_time=point_in_time)
+    session.add(snapshot)
+    session.flush()
+    session.bulk_save_objects(
+        [
+            SnapshotStates(snapshot_id=snapshot.snapshot_id, state_id=state_id)
+            for state_id in state_ids.values()
+        ]
+    )
+    _LOGGER.debug("Stored snapshot of %d states at %s", len(state_ids), point_in_time)
+
+
+def _latest_states_query(session, since, point_in_time):
+    """Return the query of the latest state of the entities updated in a range.
+
+    Only states with a last_updated from since up to point_in_time are
+    looked at.
+    """
+    from .models import States
+    from sqlalchemy import and_, func
+
+    most_recent_states_by_date = (
+        session.query(
+            States.entity_id.label("max_entity_id"),
+            func.max(States.last_updated).label("max_last_updated"),
+        )
+        .filter((States.last_updated >= since) & (States.last_updated < point_in_time))
+        .group_by(States.entity_id)
+        .subquery()
+    )
+
+    most_recent_state_ids = (
+        session.query(func.max(States.state_id).label("max_state_id"))
+        .join(
+            most_recent_states_by_date,
+            and_(
+                States.entity_id == most_recent_states_by_date.c.max_entity_id,
+                States.last_updated == most_recent_states_by_date.c.max_last_updated,
+            ),
+        )
+        .group_by(States.entity_id)
+        .subquery()
+    )
+
+    return session.query(States).join(
+        most_recent_state_ids, States.state_id == most_recent_state_ids.c.max_state_id
+    )
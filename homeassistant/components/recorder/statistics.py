@@ -0,0 +1,303 @@
+"""Long term statistics of numeric sensors."""
+from datetime import timedelta
+import json
+import logging
+import math
+
+import homeassistant.util.dt as dt_util
+from homeassistant.const import ATTR_UNIT_OF_MEASUREMENT
+
+from .util import session_scope
+
+_LOGGER = logging.getLogger(__name__)
+
+PERIOD_HOUR = "hour"
+PERIOD_DAY = "day"
+
+PERIODS = {PERIOD_HOUR: timedelta(hours=1), PERIOD_DAY: timedelta(days=1)}
+
+STATISTICS_DOMAIN = "sensor"
+
+
+def compile_statistics(instance, end):
+    """Compile the hourly statistics of the next hour that ended before end.
+
+    UTC days are rolled up from their hours when their last hour is
+    compiled. Returns True when every hour before end is compiled and False
+    when it has to be called again.
+    """
+    from .models import States, StatisticsRuns
+    from sqlalchemy import func
+    from sqlalchemy.exc import SQLAlchemyError
+
+    try:
+        with session_scope(session=instance.get_session()) as session:
+            last_start = session.query(func.max(StatisticsRuns.start)).scalar()
+            if last_start is not None:
+                start = dt_util.as_utc(last_start) + PERIODS[PERIOD_HOUR]
+            else:
+                first_state = session.query(func.min(States.last_updated)).scalar()
+                if first_state is None:
+                    return True
+                start = _start_of_period(PERIOD_HOUR, dt_util.as_utc(first_state))
+
+            end_of_hour = start + PERIODS[PERIOD_HOUR]
+            if end_of_hour > end:
+                return True
+
+            _LOGGER.debug("Compiling statistics for %s", start)
+            session.add_all(_compile_hour(session, start))
+            session.add(StatisticsRuns(start=start))
+
+            if end_of_hour == _start_of_period(PERIOD_DAY, end_of_hour):
+                session.flush()
+                session.add_all(
+                    _compile_day(session, end_of_hour - PERIODS[PERIOD_DAY])
+                )
+    except SQLAlchemyError as err:
+        _LOGGER.warning("Error compiling statistics: %s.", err)
+        return True
+
+    return end_of_hour + PERIODS[PERIOD_HOUR] > end
+
+
+def compiled_until(hass, period):
+    """Return the end of the last compiled period, None before the first."""
+    from .models import StatisticsRuns
+    from sqlalchemy import func
+
+    with session_scope(hass=hass) as session:
+        last_start = session.query(func.max(StatisticsRuns.start)).scalar()
+
+    if last_start is None:
+        return None
+    return _start_of_period(period, dt_util.as_utc(last_start) + PERIODS[PERIOD_HOUR])
+
+
+def statistics_during_period(hass, start_time, end_time, period, entity_ids=None):
+    """Return the statistics of a period, grouped by entity_id.
+
+    Only statistics that start inside the period are returned. Every entity
+    maps to its Statistics rows ordered by start.
+    """
+    from .models import Statistics
+
+    with session_scope(hass=hass) as session:
+        query = session.query(Statistics).filter(
+            (Statistics.period == period) & (Statistics.start >= start_time)
+        )
+        if end_time is not None:
+            query = query.filter(Statistics.start < end_time)
+        if entity_ids is not None:
+            query = query.filter(Statistics.entity_id.in_(entity_ids))
+
+        result = {}
+        for row in query.order_by(Statistics.start):
+            session.expunge(row)
+            result.setdefault(row.entity_id, []).append(row)
+
+    return result
+
+
+def _start_of_period(period, point_in_time):
+    """Return the start of the period point_in_time is in."""
+    if period == PERIOD_DAY:
+        return point_in_time.replace(hour=0, minute=0, second=0, microsecond=0)
+    return point_in_time.replace(minute=0, second=0, microsecond=0)
+
+
+def _carried_values(session, start):
+    """Return the values and units held at start, mapped to their entity.
+
+    Entities holding a value have statistics for every hour, so the last
+    hour before start with statistics has the values of all of them.
+    """
+    from .models import Statistics
+    from sqlalchemy import func
+
+    last_start = (
+        session.query(func.max(Statistics.start))
+        .filter((Statistics.period == PERIOD_HOUR) & (Statistics.start < start))
+        .scalar()
+    )
+    if last_start is None:
+        return {}
+
+    query = session.query(
+        Statistics.entity_id, Statistics.last, Statistics.unit_of_measurement
+    ).filter(
+        (Statistics.period == PERIOD_HOUR)
+        & (Statistics.start == last_start)
+        & Statistics.last.isnot(None)
+    )
+    return {entity_id: (last, unit) for entity_id, last, unit in query}
+
+
+def _compile_hour(session, start):
+    """Return the statistics of the numeric sensors during an hour.
+
+    Every sensor holding a numeric value during the hour gets statistics,
+    also when its value did not change. The mean is weighted by how long
+    each value was held, a state that is not numeric ends the value before
+    it. The last value is the one held at the end of the hour, None when
+    the sensor did not hold a numeric value then.
+    """
+    from .models import States, StateAttributes, Statistics
+    from sqlalchemy import func
+
+    end = start + PERIODS[PERIOD_HOUR]
+    query = (
+        session.query(
+            States.entity_id,
+            States.state,
+            func.coalesce(StateAttributes.shared_attrs, States.attributes),
+            States.last_updated,
+        )
+        .outerjoin(
+            StateAttributes, States.attributes_id == StateAttributes.attributes_id
+        )
+        .filter(
+            (States.domain == STATISTICS_DOMAIN)
+            & (States.last_updated >= start)
+            & (States.last_updated < end)
+        )
+        .order_by(States.last_updated)
+    )
+
+    units = {}
+    statistics = {}
+    # Value held by each entity, since when, and the weighted sum and
+    # seconds of the values held before it
+    held = {}
+    for entity_id, (value, unit) in _carried_values(session, start).items():
+        held[entity_id] = [value, start, 0.0, 0.0]
+        statistics[entity_id] = Statistics(
+            entity_id=entity_id,
+            period=PERIOD_HOUR,
+            start=start,
+            unit_of_measurement=unit,
+            min=value,
+            max=value,
+            count=0,
+        )
+
+    for entity_id, state, attributes, last_updated in query:
+        try:
+            value = float(state)
+        except ValueError:
+            value = None
+        if value is not None and not math.isfinite(value):
+            value = None
+
+        unit = None
+        if value is not None:
+            # Attributes are shared by most states, only decode each once
+            if attributes not in units:
+                try:
+                    units[attributes] = json.loads(attributes).get(
+                        ATTR_UNIT_OF_MEASUREMENT
+                    )
+                except ValueError:
+                    units[attributes] = None
+            unit = units[attributes]
+        if unit is None:
+            value = None
+
+        entity_held = held.get(entity_id)
+        if entity_held is None:
+            entity_held = held[entity_id] = [None, start, 0.0, 0.0]
+        _hold(entity_held, value, dt_util.as_utc(last_updated))
+
+        if value is None:
+            continue
+
+        stat = statistics.get(entity_id)
+        if stat is None:
+            statistics[entity_id] = Statistics(
+                entity_id=entity_id,
+                period=PERIOD_HOUR,
+                start=start,
+                unit_of_measurement=unit,
+                min=value,
+                max=value,
+                count=1,
+            )
+            continue
+
+        stat.unit_of_measurement = unit
+        stat.min = min(stat.min, value)
+        stat.max = max(stat.max, value)
+        stat.count += 1
+
+    result = []
+    for entity_id, stat in statistics.items():
+        entity_held = held[entity_id]
+        stat.last = entity_held[0]
+        _hold(entity_held, None, end)
+        _, _, weighted, seconds = entity_held
+        # Values replaced at the moment they were set were never held
+        if seconds:
+            stat.mean = weighted / seconds
+            result.append(stat)
+
+    return result
+
+
+def _hold(held, value, point_in_time):
+    """Add the value held until point_in_time to the weighted sum."""
+    if held[0] is not None:
+        seconds = (point_in_time - held[1]).total_seconds()
+        held[2] += held[0] * seconds
+        held[3] += seconds
+    held[0] = value
+    held[1] = point_in_time
+
+
+def _compile_day(session, start):
+    """Return the statistics of a day rolled up from its hours.
+
+    Every hour with a value weighs the same in the mean. The last value is
+    the one held at the end of the day.
+    """
+    from .models import Statistics
+
+    last_hour = start + PERIODS[PERIOD_DAY] - PERIODS[PERIOD_HOUR]
+    query = (
+        session.query(Statistics)
+        .filter(
+            (Statistics.period == PERIOD_HOUR)
+            & (Statistics.start >= start)
+            & (Statistics.start <= last_hour)
+        )
+        .order_by(Statistics.start)
+    )
+
+    statistics = {}
+    # Sum of the hourly means and number of hours of each entity
+    means = {}
+    for hour in query:
+        stat = statistics.get(hour.entity_id)
+        if stat is None:
+            stat = statistics[hour.entity_id] = Statistics(
+                entity_id=hour.entity_id,
+                period=PERIOD_DAY,
+                start=start,
+                min=hour.min,
+                max=hour.max,
+                count=0,
+            )
+            means[hour.entity_id] = [0.0, 0]
+
+        stat.unit_of_measurement = hour.unit_of_measurement
+        stat.min = min(stat.min, hour.min)
+        stat.max = max(stat.max, hour.max)
+        stat.last = hour.last if dt_util.as_utc(hour.start) == last_hour else None
+        stat.count += hour.count
+        means[hour.entity_id][0] += hour.mean
+        means[hour.entity_id][1] += 1
+
+    for entity_id, stat in statistics.items():
+        total, hours = means[entity_id]
+        stat.mean = total / hours
+
+    return list(statistics.values())
@@ -1,7 +1,8 @@
 """Support for statistics for sensor values."""
+from collections import Counter, deque
+from heapq import heappop, heappush
 import logging
-import statistics
-from collections import deque
+import math
 
 import voluptuous as vol
 
@@ -19,7 +20,7 @@ from homeassistant.core import callback
 from homeassistant.helpers.entity import Entity
 from homeassistant.helpers.event import async_track_state_change
 from homeassistant.util import dt as dt_util
-from homeassistant.components.recorder.util import session_scope, execute
+from homeassistant.components.recorder.preload import async_preload_states
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -47,6 +48,9 @@ DEFAULT_SIZE = 20
 DEFAULT_PRECISION = 2
 ICON = "mdi:calculator"
 
+# Minimum number of removed values before the running sums are recomputed
+RECOMPUTE_MIN_REMOVED = 100
+
 PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend(
     {
         vol.Required(CONF_ENTITY_ID): cv.entity_id,
@@ -75,6 +79,162 @@ async def async_setup_platform(hass, config, async_add_entities, discovery_info=
     return True
 
 
+class RollingStatistics:
+    """Statistics of a window of values, updated as values come and go.
+
+    Values leave the window in the order they were added. The median is
+    kept with two heaps, the lower half as a max heap and the upper half as
+    a min heap. Removed values are only dropped once they reach the top of
+    a heap, and the heaps are rebuilt when removed values make up most of
+    them. The min and max are the heads of monotonic deques. The total,
+    mean and variance are running sums (Welford's algorithm for the
+    variance), which are recomputed from the values once as many values
+    have been removed as there are in the window, so rounding errors of
+    removals do not pile up.
+    """
+
+    def __init__(self):
+        """Initialize the statistics of an empty window."""
+        self.values = deque()
+        self.total = 0.0
+        self.mean = 0.0
+        self._sum_squares = 0.0
+        self._removed = 0
+        self._lower = []
+        self._upper = []
+        self._lower_count = 0
+        self._upper_count = 0
+        self._delayed = Counter()
+        self._minimums = deque()
+        self._maximums = deque()
+
+    def __len__(self):
+        """Return the number of values."""
+        return len(self.values)
+
+    def add(self, value):
+        """Add a value to the window."""
+        self.values.append(value)
+
+        if not self._lower or value <= -self._lower[0]:
+            heappush(self._lower, -value)
+            self._lower_count += 1
+        else:
+            heappush(self._upper, value)
+            self._upper_count += 1
+        self._balance()
+
+        while self._minimums and self._minimums[-1] > value:
+            self._minimums.pop()
+        self._minimums.append(value)
+        while self._maximums and self._maximums[-1] < value:
+            self._maximums.pop()
+        self._maximums.append(value)
+
+        self.total += value
+        delta = value - self.mean
+        self.mean += delta / len(self.values)
+        self._sum_squares += delta * (value - self.mean)
+
+    def remove(self):
+        """Remove the oldest value from the window."""
+        value = self.values.popleft()
+        count = len(self.values)
+        self._removed += 1
+
+        if self._minimums[0] == value:
+            self._minimums.popleft()
+        if self._maximums[0] == value:
+            self._maximums.popleft()
+
+        self._delayed[value] += 1
+        if value <= -self._lower[0]:
+            self._lower_count -= 1
+            if value == -self._lower[0]:
+                self._prune(self._lower, -1)
+        else:
+            self._upper_count -= 1
+            if value == self._upper[0]:
+                self._prune(self._upper, 1)
+
+        if len(self._lower) + len(self._upper) > 2 * count + RECOMPUTE_MIN_REMOVED:
+            self._rebuild_heaps()
+        else:
+            self._balance()
+
+        if not count:
+            self.total = self.mean = self._sum_squares = 0.0
+            self._removed = 0
+            return
+
+        if self._removed >= max(count, RECOMPUTE_MIN_REMOVED):
+            self._recompute()
+            return
+
+        self.total -= value
+        delta = value - self.mean
+        self.mean -= delta / count
+        self._sum_squares -= delta * (value - self.mean)
+
+    def _prune(self, heap, sign):
+        """Drop removed values from the top of a heap."""
+        delayed = self._delayed
+        while heap and delayed[sign * heap[0]]:
+            delayed[sign * heappop(heap)] -= 1
+
+    def _balance(self):
+        """Keep the lower half as big as the upper half or one value bigger."""
+        if self._lower_count > self._upper_count + 1:
+            heappush(self._upper, -heappop(self._lower))
+            self._lower_count -= 1
+            self._upper_count += 1
+            self._prune(self._lower, -1)
+        elif self._lower_count < self._upper_count:
+            heappush(self._lower, -heappop(self._upper))
+            self._lower_count += 1
+            self._upper_count -= 1
+            self._prune(self._upper, 1)
+
+    def _rebuild_heaps(self):
+        """Rebuild the heaps from the values, dropping all removed values."""
+        values = sorted(self.values)
+        middle = (len(values) + 1) // 2
+        self._lower = [-value for value in reversed(values[:middle])]
+        self._upper = values[middle:]
+        self._lower_count = len(self._lower)
+        self._upper_count = len(self._upper)
+        self._delayed.clear()
+
+    def _recompute(self):
+        """Recompute the running sums from the values."""
+        self.total = math.fsum(self.values)
+        self.mean = self.total / len(self.values)
+        self._sum_squares = math.fsum((value - self.mean) ** 2 for value in self.values)
+        self._removed = 0
+
+    @property
+    def median(self):
+        """Return the median of the values."""
+        if self._lower_count > self._upper_count:
+            return -self._lower[0]
+        return (self._upper[0] - self._lower[0]) / 2
+
+    @property
+    def minimum(self):
+        """Return the smallest value."""
+        return self._minimums[0]
+
+    @property
+    def maximum(self):
+        """Return the largest value."""
+        return self._maximums[0]
+
+    @property
+    def variance(self):
+        """Return the sample variance of the values."""
+        return max(self._sum_squares, 0.0) / (len(self.values) - 1)
+
+
 class StatisticsSensor(Entity):
     """Representation of a Statistics sensor."""
 
@@ -89,6 +249,7 @@ class StatisticsSensor(Entity):
         self._unit_of_measurement = None
         self.states = deque(maxlen=self._sampling_size)
         self.ages = deque(maxlen=self._sampling_size)
+        self._statistics = RollingStatistics()
 
         self.count = 0
         self.mean = self.median = self.stdev = self.variance = None
@@ -136,7 +297,15 @@ class StatisticsSensor(Entity):
             if self.is_binary:
                 self.states.append(new_state.state)
             else:
-                self.states.append(float(new_state.state))
+                value = float(new_state.state)
+                if not math.isfinite(value):
+                    # nan and inf would spoil the running sums for good
+                    raise ValueError
+                if len(self.states) == self._sampling_size:
+                    # The oldest state drops out of the queue
+                    self._statistics.remove()
+                self.states.append(value)
+                self._statistics.add(value)
 
             self.ages.append(new_state.last_updated)
         except ValueError:
@@ -212,6 +381,8 @@ class StatisticsSensor(Entity):
             )
             self.ages.popleft()
             self.states.popleft()
+            if not self.is_binary:
+                self._statistics.remove()
 
     async def async_update(self):
         """Get the latest data and updates the states."""
@@ -222,24 +393,27 @@ class StatisticsSensor(Entity):
         self.count = len(self.states)
 
         if not self.is_binary:
-            try:  # require only one data point
-                self.mean = round(statistics.mean(self.states), self._precision)
-                self.median = round(statistics.median(self.states), self._precision)
-            except statistics.StatisticsError as err:
-                _LOGGER.debug("%s: %s", self.entity_id, err)
+            stats = self._statistics
+
+            if stats:  # require only one data point
+                self.mean = round(stats.mean, self._precision)
+                self.median = round(stats.median, self._precision)
+            else:
+                _LOGGER.debug("%s: no data points", self.entity_id)
                 self.mean = self.median = STATE_UNKNOWN
 
-            try:  # require at least two data points
-                self.stdev = round(statistics.stdev(self.states), self._precision)
-                self.variance = round(statistics.variance(self.states), self._precision)
-            except statistics.StatisticsError as err:
-                _LOGGER.debug("%s: %s", self.entity_id, err)
+            if len(stats) > 1:  # require at least two data points
+                variance = stats.variance
+                self.stdev = round(math.sqrt(variance), self._precision)
+                self.variance = round(variance, self._precision)
+            else:
+                _LOGGER.debug("%s: less than two data points", self.entity_id)
                 self.stdev = self.variance = STATE_UNKNOWN
 
             if self.states:
-                self.total = round(sum(self.states), self._precision)
-                self.min = round(min(self.states), self._precision)
-                self.max = round(max(self.states), self._precision)
+                self.total = round(stats.total, self._precision)
+                self.min = round(stats.minimum, self._precision)
+                self.max = round(stats.maximum, self._precision)
 
                 self.min_age = self.ages[0]
                 self.max_age = self.ages[-1]
@@ -268,39 +442,32 @@ class StatisticsSensor(Entity):
     async def _async_initialize_from_database(self):
         """Initialize the list of states from the database.
 
-        The query will get the list of states in DESCENDING order so that we
-        can limit the result to self._sample_size. Afterwards reverse the
-        list so that we get it in the right order again.
-
-        If MaxAge is provided then query will restrict to entries younger then
-        current datetime - MaxAge.
+        Loads the last self._sampling_size states, restricted to the ones
+        younger than current datetime - MaxAge if MaxAge is provided. The
+        states of all statistics sensors are loaded together at startup.
         """
-        from homeassistant.components.recorder.models import States
-
         _LOGGER.debug("%s: initializing values from the database", self.entity_id)
 
-        with session_scope(hass=self.hass) as session:
-            query = session.query(States).filter(
-                States.entity_id == self._entity_id.lower()
-            )
-
-            if self._max_age is not None:
-                records_older_then = dt_util.utcnow() - self._max_age
-                _LOGGER.debug(
-                    "%s: retrieve records not older then %s",
-                    self.entity_id,
-                    records_older_then,
-                )
-                query = query.filter(States.last_updated >= records_older_then)
-            else:
-                _LOGGER.debug("%s: retrieving all records.", self.entity_id)
-
-            query = query.order_by(States.last_updated.desc()).limit(
-                self._sampling_size
+        records_older_then = None
+        if self._max_age is not None:
+            records_older_then = dt_util.utcnow() - self._max_age
+            _LOGGER.debug(
+                "%s: retrieve records not older then %s",
+                self.entity_id,
+                records_older_then,
             )
-            states = execute(query)
+        else:
+            _LOGGER.debug("%s: retrieving all records.", self.entity_id)
+
+        states = await async_preload_states(
+            self.hass,
+            self._entity_id,
+            number_of_states=self._sampling_size,
+            start_time=records_older_then,
+            changes_only=False,
+        )
 
-        for state in reversed(states):
+        for state in states:
             self._add_state_to_queue(state)
 
         self.async_schedule_update_ha_state(True)
@@ -1,4 +1,5 @@
 """Support for exposing a templated binary sensor."""
+from functools import partial
 import logging
 from itertools import chain
 
@@ -20,12 +21,17 @@ from homeassistant.const import (
     CONF_SENSORS,
     CONF_DEVICE_CLASS,
     EVENT_HOMEASSISTANT_START,
-    MATCH_ALL,
 )
 from homeassistant.exceptions import TemplateError
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.entity import async_generate_entity_id
-from homeassistant.helpers.event import async_track_state_change, async_track_same_state
+from homeassistant.helpers.event import (
+    async_track_point_in_utc_time,
+    async_track_state_change,
+    async_track_template_result,
+)
+from homeassistant.helpers.template import is_template_string
+import homeassistant.util.dt as dt_util
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -60,48 +66,15 @@ async def async_setup_platform(hass, config, async_add_entities, discovery_info=
         value_template = device_config[CONF_VALUE_TEMPLATE]
         icon_template = device_config.get(CONF_ICON_TEMPLATE)
         entity_picture_template = device_config.get(CONF_ENTITY_PICTURE_TEMPLATE)
-        entity_ids = set()
-        manual_entity_ids = device_config.get(ATTR_ENTITY_ID)
+        entity_ids = device_config.get(ATTR_ENTITY_ID)
         attribute_templates = device_config.get(CONF_ATTRIBUTE_TEMPLATES, {})
 
-        invalid_templates = []
-
-        templates = {
-            CONF_VALUE_TEMPLATE: value_template,
-            CONF_ICON_TEMPLATE: icon_template,
-            CONF_ENTITY_PICTURE_TEMPLATE: entity_picture_template,
-        }
-
-        for tpl_name, template in chain(templates.items(), attribute_templates.items()):
-            if template is None:
-                continue
-            template.hass = hass
-
-            if manual_entity_ids is not None:
-                continue
-
-            template_entity_ids = template.extract_entities()
-            if template_entity_ids == MATCH_ALL:
-                entity_ids = MATCH_ALL
-                # Cut off _template from name
-                invalid_templates.append(tpl_name.replace("_template", ""))
-            elif entity_ids != MATCH_ALL:
-                entity_ids |= set(template_entity_ids)
-
-        if manual_entity_ids is not None:
-            entity_ids = manual_entity_ids
-        elif entity_ids != MATCH_ALL:
-            entity_ids = list(entity_ids)
-
-        if invalid_templates:
-            _LOGGER.warning(
-                "Template binary sensor %s has no entity ids configured to"
-                " track nor were we able to extract the entities to track"
-                " from the %s template(s). This entity will only be able"
-                " to be updated manually.",
-                device,
-                ", ".join(invalid_templates),
-            )
+        for template in chain(
+            (value_template, icon_template, entity_picture_template),
+            attribute_templates.values(),
+        ):
+            if template is not None:
+                template.hass = hass
 
         friendly_name = device_config.get(ATTR_FRIENDLY_NAME, device)
         device_class = device_config.get(CONF_DEVICE_CLASS)
@@ -164,6 +137,8 @@ class BinarySensorTemplate(BinarySensorDevice):
         self._delay_off = delay_off
         self._attribute_templates = attribute_templates
         self._attributes = {}
+        self._pending_state = None
+        self._async_cancel_delay = None
 
     async def async_added_to_hass(self):
         """Register callbacks."""
@@ -173,16 +148,62 @@ class BinarySensorTemplate(BinarySensorDevice):
             """Handle the target device state changes."""
             self.async_check_state()
 
+        def template_bsensor_result_listener(update):
+            """Return a listener for the results of one of the templates."""
+
+            @callback
+            def listener(event, result):
+                """Handle a new result after a state the template uses changed."""
+                update(result)
+                self.async_write_ha_state()
+
+            return listener
+
         @callback
         def template_bsensor_startup(event):
             """Update template on startup."""
-            if self._entities != MATCH_ALL:
-                # Track state change only for valid templates
+            if self._entities is not None:
                 async_track_state_change(
                     self.hass, self._entities, template_bsensor_state_listener
                 )
+                self.async_check_state()
+                return
 
-            self.async_check_state()
+            # Track the states the templates access while rendering
+            invalid_templates = []
+            for name, update, template in chain(
+                (("value", self._async_update_value, self._template),),
+                self._async_property_templates(),
+            ):
+                info = template.async_render_to_info()
+                try:
+                    result = info.result
+                except TemplateError as ex:
+                    result = ex
+                update(result)
+
+                if not (
+                    info.entities or info.domains or info.all_states
+                ) and is_template_string(template.template):
+                    invalid_templates.append(name)
+
+                async_track_template_result(
+                    self.hass,
+                    template,
+                    template_bsensor_result_listener(update),
+                    info=info,
+                )
+
+            if invalid_templates:
+                _LOGGER.warning(
+                    "Template binary sensor %s has no entity ids configured to"
+                    " track nor do its %s template(s) use any states. This"
+                    " entity will only be able to be updated manually.",
+                    self.entity_id,
+                    ", ".join(invalid_templates),
+                )
+
+            self.async_write_ha_state()
 
         self.hass.bus.async_listen_once(
             EVENT_HOMEASSISTANT_START, template_bsensor_startup
@@ -224,76 +245,112 @@ class BinarySensorTemplate(BinarySensorDevice):
         return False
 
     @callback
-    def _async_render(self):
-        """Get the state of template."""
-        state = None
-        try:
-            state = self._template.async_render().lower() == "true"
-        except TemplateError as ex:
-            if ex.args and ex.args[0].startswith(
-                "UndefinedError: 'None' has no attribute"
-            ):
-                # Common during HA startup - so just a warning
-                _LOGGER.warning(
-                    "Could not render template %s, " "the state is unknown", self._name
-                )
-                return
-            _LOGGER.error("Could not render template %s: %s", self._name, ex)
+    def _async_property_templates(self):
+        """Return the icon, picture and attribute templates with their updates."""
+        templates = [
+            ("icon", partial(self._async_set_property, "_icon"), self._icon_template),
+            (
+                "entity_picture",
+                partial(self._async_set_property, "_entity_picture"),
+                self._entity_picture_template,
+            ),
+        ]
+        for key, template in (self._attribute_templates or {}).items():
+            templates.append((key, partial(self._async_set_attribute, key), template))
+        return [entry for entry in templates if entry[2] is not None]
 
-        templates = {
-            "_icon": self._icon_template,
-            "_entity_picture": self._entity_picture_template,
-        }
+    @callback
+    def _async_value_state(self, result):
+        """Return the state for a value template result or TemplateError."""
+        if not isinstance(result, TemplateError):
+            return result.lower() == "true"
+
+        if result.args and result.args[0].startswith(
+            "UndefinedError: 'None' has no attribute"
+        ):
+            # Common during HA startup - so just a warning
+            _LOGGER.warning(
+                "Could not render template %s, " "the state is unknown", self._name
+            )
+        else:
+            _LOGGER.error("Could not render template %s: %s", self._name, result)
+        return None
 
-        attrs = {}
-        if self._attribute_templates is not None:
-            for key, value in self._attribute_templates.items():
-                try:
-                    attrs[key] = value.async_render()
-                except TemplateError as err:
-                    _LOGGER.error("Error rendering attribute %s: %s", key, err)
-            self._attributes = attrs
-
-        for property_name, template in templates.items():
-            if template is None:
-                continue
-
-            try:
-                setattr(self, property_name, template.async_render())
-            except TemplateError as ex:
-                friendly_property_name = property_name[1:].replace("_", " ")
-                if ex.args and ex.args[0].startswith(
-                    "UndefinedError: 'None' has no attribute"
-                ):
-                    # Common during HA startup - so just a warning
-                    _LOGGER.warning(
-                        "Could not render %s template %s," " the state is unknown.",
-                        friendly_property_name,
-                        self._name,
-                    )
-                else:
-                    _LOGGER.error(
-                        "Could not render %s template %s: %s",
-                        friendly_property_name,
-                        self._name,
-                        ex,
-                    )
-                return state
-
-        return state
+    @callback
+    def _async_set_property(self, property_name, result):
+        """Update the icon or picture from a template result or TemplateError."""
+        if not isinstance(result, TemplateError):
+            setattr(self, property_name, result)
+            return
+
+        friendly_property_name = property_name[1:].replace("_", " ")
+        if result.args and result.args[0].startswith(
+            "UndefinedError: 'None' has no attribute"
+        ):
+            # Common during HA startup - so just a warning
+            _LOGGER.warning(
+                "Could not render %s template %s," " the state is unknown.",
+                friendly_property_name,
+                self._name,
+            )
+        else:
+            _LOGGER.error(
+                "Could not render %s template %s: %s",
+                friendly_property_name,
+                self._name,
+                result,
+            )
+
+    @callback
+    def _async_set_attribute(self, key, result):
+        """Update an attribute from a template result or TemplateError."""
+        # Replace the dict, the current state holds a view of it
+        attrs = dict(self._attributes)
+        if isinstance(result, TemplateError):
+            _LOGGER.error("Error rendering attribute %s: %s", key, result)
+            attrs.pop(key, None)
+        else:
+            attrs[key] = result
+        self._attributes = attrs
+
+    @callback
+    def _async_update_value(self, result):
+        """Update the state from a value template result or TemplateError."""
+        self._async_set_state(self._async_value_state(result))
+
+    @callback
+    def _async_render(self):
+        """Render all templates and return the state of the value template."""
+        for _, update, template in self._async_property_templates():
+            update(_async_render_result(template))
+
+        return self._async_value_state(_async_render_result(self._template))
 
     @callback
     def async_check_state(self):
         """Update the state from the template."""
-        state = self._async_render()
+        self._async_set_state(self._async_render())
+
+    @callback
+    def _async_set_state(self, state):
+        """Set the state, after the configured delay if there is one."""
+        if state is not None and state == self._pending_state:
+            return
+
+        if self._async_cancel_delay is not None:
+            self._async_cancel_delay()
+            self._async_cancel_delay = None
+        self._pending_state = None
 
         # return if the state don't change or is invalid
         if state is None or state == self.state:
             return
 
         @callback
-        def set_state():
+        def set_state(now=None):
             """Set state of template binary sensor."""
+            self._async_cancel_delay = None
+            self._pending_state = None
             self._state = state
             self.async_schedule_update_ha_state()
 
@@ -303,14 +360,20 @@ class BinarySensorTemplate(BinarySensorDevice):
             return
 
         period = self._delay_on if state else self._delay_off
-        async_track_same_state(
-            self.hass,
-            period,
-            set_state,
-            entity_ids=self._entities,
-            async_check_same_func=lambda *args: self._async_render() == state,
+        self._pending_state = state
+        self._async_cancel_delay = async_track_point_in_utc_time(
+            self.hass, set_state, dt_util.utcnow() + period
         )
 
     async def async_update(self):
         """Force update of the state from the template."""
         self.async_check_state()
+
+
+@callback
+def _async_render_result(template):
+    """Render a template, returning the TemplateError if it raises one."""
+    try:
+        return template.async_render()
+    except TemplateError as ex:
+        return ex
@@ -20,13 +20,16 @@ from homeassistant.const import (
     CONF_SENSORS,
     EVENT_HOMEASSISTANT_START,
     CONF_FRIENDLY_NAME_TEMPLATE,
-    MATCH_ALL,
     CONF_DEVICE_CLASS,
 )
 from homeassistant.exceptions import TemplateError
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.entity import Entity, async_generate_entity_id
-from homeassistant.helpers.event import async_track_state_change
+from homeassistant.helpers.event import (
+    async_track_state_change,
+    async_track_template_result,
+)
+from homeassistant.helpers.template import is_template_string
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -61,45 +64,16 @@ async def async_setup_platform(hass, config, async_add_entities, discovery_info=
         unit_of_measurement = device_config.get(ATTR_UNIT_OF_MEASUREMENT)
         device_class = device_config.get(CONF_DEVICE_CLASS)
 
-        entity_ids = set()
-        manual_entity_ids = device_config.get(ATTR_ENTITY_ID)
-        invalid_templates = []
+        entity_ids = device_config.get(ATTR_ENTITY_ID)
 
-        for tpl_name, template in (
-            (CONF_VALUE_TEMPLATE, state_template),
-            (CONF_ICON_TEMPLATE, icon_template),
-            (CONF_ENTITY_PICTURE_TEMPLATE, entity_picture_template),
-            (CONF_FRIENDLY_NAME_TEMPLATE, friendly_name_template),
+        for template in (
+            state_template,
+            icon_template,
+            entity_picture_template,
+            friendly_name_template,
         ):
-            if template is None:
-                continue
-            template.hass = hass
-
-            if manual_entity_ids is not None:
-                continue
-
-            template_entity_ids = template.extract_entities()
-            if template_entity_ids == MATCH_ALL:
-                entity_ids = MATCH_ALL
-                # Cut off _template from name
-                invalid_templates.append(tpl_name[:-9])
-            elif entity_ids != MATCH_ALL:
-                entity_ids |= set(template_entity_ids)
-
-        if invalid_templates:
-            _LOGGER.warning(
-                "Template sensor %s has no entity ids configured to track nor"
-                " were we able to extract the entities to track from the %s "
-                "template(s). This entity will only be able to be updated "
-                "manually.",
-                device,
-                ", ".join(invalid_templates),
-            )
-
-        if manual_entity_ids is not None:
-            entity_ids = manual_entity_ids
-        elif entity_ids != MATCH_ALL:
-            entity_ids = list(entity_ids)
+            if template is not None:
+                template.hass = hass
 
         sensors.append(
             SensorTemplate(
@@ -164,16 +138,59 @@ class SensorTemplate(Entity):
             """Handle device state changes."""
             self.async_schedule_update_ha_state(True)
 
+        def template_sensor_result_listener(property_name):
+            """Return a listener for the results of one of the templates."""
+
+            @callback
+            def listener(event, result):
+                """Handle a new result after a state the template uses changed."""
+                self._async_set_result(property_name, result)
+                self.async_write_ha_state()
+
+            return listener
+
         @callback
         def template_sensor_startup(event):
             """Update template on startup."""
-            if self._entities != MATCH_ALL:
-                # Track state change only for valid templates
+            if self._entities is not None:
                 async_track_state_change(
                     self.hass, self._entities, template_sensor_state_listener
                 )
+                self.async_schedule_update_ha_state(True)
+                return
 
-            self.async_schedule_update_ha_state(True)
+            # Track the states the templates access while rendering
+            invalid_templates = []
+            for name, property_name, template in self._async_templates():
+                info = template.async_render_to_info()
+                try:
+                    result = info.result
+                except TemplateError as ex:
+                    result = ex
+                self._async_set_result(property_name, result)
+
+                if not (
+                    info.entities or info.domains or info.all_states
+                ) and is_template_string(template.template):
+                    invalid_templates.append(name)
+
+                async_track_template_result(
+                    self.hass,
+                    template,
+                    template_sensor_result_listener(property_name),
+                    info=info,
+                )
+
+            if invalid_templates:
+                _LOGGER.warning(
+                    "Template sensor %s has no entity ids configured to track nor"
+                    " do its %s template(s) use any states. This entity will"
+                    " only be able to be updated manually.",
+                    self.entity_id,
+                    ", ".join(invalid_templates),
+                )
+
+            self.async_write_ha_state()
 
         self.hass.bus.async_listen_once(
             EVENT_HOMEASSISTANT_START, template_sensor_startup
@@ -214,50 +231,63 @@ class SensorTemplate(Entity):
         """No polling needed."""
         return False
 
-    async def async_update(self):
-        """Update the state from the template."""
-        try:
-            self._state = self._template.async_render()
-        except TemplateError as ex:
-            if ex.args and ex.args[0].startswith(
-                "UndefinedError: 'None' has no attribute"
-            ):
-                # Common during HA startup - so just a warning
+    @callback
+    def _async_templates(self):
+        """Return the configured templates with the property they update."""
+        return [
+            (name, property_name, template)
+            for name, property_name, template in (
+                ("value", "_state", self._template),
+                ("icon", "_icon", self._icon_template),
+                ("entity_picture", "_entity_picture", self._entity_picture_template),
+                ("friendly_name", "_name", self._friendly_name_template),
+            )
+            if template is not None
+        ]
+
+    @callback
+    def _async_set_result(self, property_name, result):
+        """Update a property from a template result or TemplateError."""
+        if not isinstance(result, TemplateError):
+            setattr(self, property_name, result)
+            return
+
+        if result.args and result.args[0].startswith(
+            "UndefinedError: 'None' has no attribute"
+        ):
+            # Common during HA startup - so just a warning
+            if property_name == "_state":
                 _LOGGER.warning(
                     "Could not render template %s," " the state is unknown.", self._name
                 )
             else:
-                self._state = None
-                _LOGGER.error("Could not render template %s: %s", self._name, ex)
-        for property_name, template in (
-            ("_icon", self._icon_template),
-            ("_entity_picture", self._entity_picture_template),
-            ("_name", self._friendly_name_template),
-        ):
-            if template is None:
-                continue
+                _LOGGER.warning(
+                    "Could not render %s template %s," " the state is unknown.",
+                    property_name[1:].replace("_", " "),
+                    self._name,
+                )
+            return
+
+        if property_name == "_state":
+            self._state = None
+            _LOGGER.error("Could not render template %s: %s", self._name, result)
+            return
 
+        try:
+            setattr(self, property_name, getattr(super(), property_name))
+        except AttributeError:
+            _LOGGER.error(
+                "Could not render %s template %s: %s",
+                property_name[1:].replace("_", " "),
+                self._name,
+                result,
+            )
+
+    async def async_update(self):
+        """Update the state from the template."""
+        for _, property_name, template in self._async_templates():
             try:
-                setattr(self, property_name, template.async_render())
+                result = template.async_render()
             except TemplateError as ex:
-                friendly_property_name = property_name[1:].replace("_", " ")
-                if ex.args and ex.args[0].startswith(
-                    "UndefinedError: 'None' has no attribute"
-                ):
-                    # Common during HA startup - so just a warning
-                    _LOGGER.warning(
-                        "Could not render %s template %s," " the state is unknown.",
-                        friendly_property_name,
-                        self._name,
-                    )
-                    continue
-
-                try:
-                    setattr(self, property_name, getattr(super(), property_name))
-                except AttributeError:
-                    _LOGGER.error(
-                        "Could not render %s template %s: %s",
-                        friendly_property_name,
-                        self._name,
-                        ex,
-                    )
+                result = ex
+            self._async_set_result(property_name, result)
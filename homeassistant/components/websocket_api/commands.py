@@ -1,16 +1,28 @@
 """Commands part of Websocket API."""
+import logging
+
 import voluptuous as vol
 
 from homeassistant.auth.permissions.const import POLICY_READ
 from homeassistant.const import MATCH_ALL, EVENT_TIME_CHANGED, EVENT_STATE_CHANGED
 from homeassistant.core import callback, DOMAIN as HASS_DOMAIN
-from homeassistant.exceptions import Unauthorized, ServiceNotFound, HomeAssistantError
+from homeassistant.exceptions import (
+    HomeAssistantError,
+    ServiceNotFound,
+    TemplateError,
+    Unauthorized,
+)
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.service import async_get_all_descriptions
-from homeassistant.helpers.event import async_track_state_change
+from homeassistant.helpers.event import (
+    async_track_state_change,
+    async_track_template_result,
+)
 
 from . import const, decorators, messages
 
+_LOGGER = logging.getLogger(__name__)
+
 
 @callback
 def async_register_commands(hass, async_reg):
@@ -50,16 +62,28 @@ def handle_subscribe_events(hass, connection, msg):
         raise Unauthorized
 
     if event_type == EVENT_STATE_CHANGED:
+        # Permissions object of the user and whether it can read all entities
+        checked_permissions = None
+        read_all = False
 
         @callback
         def forward_events(event):
             """Forward state changed events to websocket."""
-            if not connection.user.permissions.check_entity(
+            nonlocal checked_permissions, read_all
+
+            permissions = connection.user.permissions
+            if checked_permissions is not permissions:
+                checked_permissions = permissions
+                read_all = permissions.access_all_entities(POLICY_READ)
+
+            if not read_all and not permissions.check_entity(
                 event.data["entity_id"], POLICY_READ
             ):
                 return
 
-            connection.send_message(messages.event_message(msg["id"], event))
+            connection.send_message(
+                messages.cached_event_message(hass, msg["id"], event)
+            )
 
     else:
 
@@ -69,7 +93,9 @@ def handle_subscribe_events(hass, connection, msg):
             if event.event_type == EVENT_TIME_CHANGED:
                 return
 
-            connection.send_message(messages.event_message(msg["id"], event.as_dict()))
+            connection.send_message(
+                messages.cached_event_message(hass, msg["id"], event)
+            )
 
     connection.subscriptions[msg["id"]] = hass.bus.async_listen(
         event_type, forward_events
@@ -226,8 +252,6 @@ def handle_render_template(hass, connection, msg):
     variables = msg.get("variables")
 
     entity_ids = msg.get("entity_ids")
-    if entity_ids is None:
-        entity_ids = template.extract_entities(variables)
 
     @callback
     def state_listener(*_):
@@ -237,7 +261,20 @@ def handle_render_template(hass, connection, msg):
             )
         )
 
-    if entity_ids and entity_ids != MATCH_ALL:
+    @callback
+    def template_listener(event, result):
+        if isinstance(result, TemplateError):
+            _LOGGER.error("Error rendering template: %s", result)
+            return
+
+        connection.send_message(messages.event_message(msg["id"], {"result": result}))
+
+    if entity_ids is None:
+        # Follow the states the template accesses while rendering
+        connection.subscriptions[msg["id"]] = async_track_template_result(
+            hass, template, template_listener, variables
+        )
+    elif entity_ids:
         connection.subscriptions[msg["id"]] = async_track_state_change(
             hass, entity_ids, state_listener
         )
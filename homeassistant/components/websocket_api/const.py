@@ -32,4 +32,7 @@ SIGNAL_WEBSOCKET_DISCONNECTED = "websocket_disconnected"
 # Data used to store the current connection list
 DATA_CONNECTIONS = DOMAIN + ".connections"
 
+# Data used to store the last event serialized for the subscriptions
+DATA_EVENT_CACHE = DOMAIN + ".event_cache"
+
 JSON_DUMP = partial(json.dumps, cls=JSONEncoder, allow_nan=False)
@@ -35,3 +35,32 @@ def error_message(iden, code, message):
 def event_message(iden, event):
     """Return an event message."""
     return {"id": iden, "type": "event", "event": event}
+
+
+# Id put in the cached event messages, replaced by the id of each subscription
+IDEN_TEMPLATE = "__IDEN__"
+IDEN_JSON_TEMPLATE = '"__IDEN__"'
+
+
+def cached_event_message(hass, iden, event):
+    """Return an event message as JSON, serializing the event only once.
+
+    The subscriptions of an event receive it right after each other, so the
+    JSON of the last event is kept and only the id is put in for each
+    subscription. Returns the message unserialized if the event can not be
+    serialized, so the error is reported like for other messages.
+    """
+    # The last serialized event and its message with IDEN_TEMPLATE as id
+    cache = hass.data.get(const.DATA_EVENT_CACHE)
+    if cache is None:
+        cache = hass.data[const.DATA_EVENT_CACHE] = [None, None]
+
+    if cache[0] is not event:
+        try:
+            payload = const.JSON_DUMP(event_message(IDEN_TEMPLATE, event))
+        except (ValueError, TypeError):
+            return event_message(iden, event)
+        cache[:] = [event, payload]
+
+    # The id is the first item of the message
+    return cache[1].replace(IDEN_JSON_TEMPLATE, str(iden), 1)
@@ -28,6 +28,7 @@ from typing import (  # noqa: F401 pylint: disable=unused-import
     Set,
     TYPE_CHECKING,
     Awaitable,
+    Iterable,
     Iterator,
 )
 
@@ -522,6 +523,9 @@ class EventBus:
     def __init__(self, hass: HomeAssistant) -> None:
         """Initialize a new event bus."""
         self._listeners: Dict[str, List[Callable]] = {}
+        # event_type -> event data key -> event data value -> listeners
+        self._keyed_listeners: Dict[str, Dict[str, Dict[Any, List[Callable]]]] = {}
+        self._keyed_listener_count: Dict[str, int] = {}
         self._hass = hass
 
     @callback
@@ -530,7 +534,10 @@ class EventBus:
 
         This method must be run in the event loop.
         """
-        return {key: len(self._listeners[key]) for key in self._listeners}
+        listeners = {key: len(self._listeners[key]) for key in self._listeners}
+        for key, count in self._keyed_listener_count.items():
+            listeners[key] = listeners.get(key, 0) + count
+        return listeners
 
     @property
     def listeners(self) -> Dict[str, int]:
@@ -563,23 +570,40 @@ class EventBus:
 
         This method must be run in the event loop.
         """
-        listeners = self._listeners.get(event_type, [])
+        listeners = self._listeners.get(event_type)
+        keyed_listeners = self._keyed_listeners.get(event_type)
 
         # EVENT_HOMEASSISTANT_CLOSE should go only to his listeners
         match_all_listeners = self._listeners.get(MATCH_ALL)
-        if match_all_listeners is not None and event_type != EVENT_HOMEASSISTANT_CLOSE:
-            listeners = match_all_listeners + listeners
+        if event_type == EVENT_HOMEASSISTANT_CLOSE:
+            match_all_listeners = None
 
         event = Event(event_type, event_data, origin, None, context)
 
         if event_type != EVENT_TIME_CHANGED:
             _LOGGER.debug("Bus:Handling %s", event)
 
-        if not listeners:
+        if match_all_listeners is not None:
+            for func in match_all_listeners:
+                self._hass.async_add_job(func, event)
+
+        if listeners is not None:
+            for func in listeners:
+                self._hass.async_add_job(func, event)
+
+        if keyed_listeners is None:
             return
 
-        for func in listeners:
-            self._hass.async_add_job(func, event)
+        for data_key, index in keyed_listeners.items():
+            try:
+                matching = index.get(event.data.get(data_key))
+            except TypeError:
+                # Unhashable event data value, can't match any key
+                continue
+
+            if matching is not None:
+                for func in matching:
+                    self._hass.async_add_job(func, event)
 
     def listen(self, event_type: str, listener: Callable) -> CALLBACK_TYPE:
         """Listen for all events or events of a specific type.
@@ -617,6 +641,37 @@ class EventBus:
 
         return remove_listener
 
+    @callback
+    def async_listen_keyed(
+        self, event_type: str, data_key: str, keys: Iterable[Any], listener: Callable
+    ) -> CALLBACK_TYPE:
+        """Listen for events of a specific type matching specific event data.
+
+        The listener is only called for events of event_type where
+        ``event.data[data_key]`` is one of keys. Listeners are indexed by key,
+        so firing an event only costs a lookup for the listeners of other
+        keys, instead of calling each of them to filter the event.
+
+        This method must be run in the event loop.
+        """
+        keys = tuple(dict.fromkeys(keys))
+        index = self._keyed_listeners.setdefault(event_type, {}).setdefault(
+            data_key, {}
+        )
+
+        for key in keys:
+            index.setdefault(key, []).append(listener)
+
+        self._keyed_listener_count[event_type] = (
+            self._keyed_listener_count.get(event_type, 0) + 1
+        )
+
+        def remove_listener() -> None:
+            """Remove the listener."""
+            self._async_remove_keyed_listener(event_type, data_key, keys, listener)
+
+        return remove_listener
+
     def listen_once(self, event_type: str, listener: Callable) -> CALLBACK_TYPE:
         """Listen once for event of a specific type.
 
@@ -680,6 +735,36 @@ class EventBus:
             # ValueError if listener did not exist within event_type
             _LOGGER.warning("Unable to remove unknown listener %s", listener)
 
+    @callback
+    def _async_remove_keyed_listener(
+        self, event_type: str, data_key: str, keys: Iterable[Any], listener: Callable
+    ) -> None:
+        """Remove a keyed listener of a specific event_type.
+
+        This method must be run in the event loop.
+        """
+        try:
+            event_index = self._keyed_listeners[event_type]
+            index = event_index[data_key]
+
+            for key in keys:
+                index[key].remove(listener)
+
+                if not index[key]:
+                    index.pop(key)
+        except (KeyError, ValueError):
+            _LOGGER.warning("Unable to remove unknown listener %s", listener)
+            return
+
+        if not index:
+            event_index.pop(data_key)
+        if not event_index:
+            self._keyed_listeners.pop(event_type)
+
+        self._keyed_listener_count[event_type] -= 1
+        if not self._keyed_listener_count[event_type]:
+            self._keyed_listener_count.pop(event_type)
+
 
 class State:
     """Object to represent a state within the state machine.
@@ -25,6 +25,9 @@ STORAGE_KEY = "core.device_registry"
 STORAGE_VERSION = 1
 SAVE_DELAY = 10
 
+# Changes to these attributes of an entry update the indexes
+INDEXED_ATTRIBUTES = {"identifiers", "connections", "area_id"}
+
 CONNECTION_NETWORK_MAC = "mac"
 CONNECTION_UPNP = "upnp"
 CONNECTION_ZIGBEE = "zigbee"
@@ -70,7 +73,11 @@ def format_mac(mac):
 
 
 class DeviceRegistry:
-    """Class to hold a registry of devices."""
+    """Class to hold a registry of devices.
+
+    The entries are indexed by their identifiers, connections and area, the
+    indexes are rebuilt when the devices are replaced.
+    """
 
     def __init__(self, hass):
         """Initialize the device registry."""
@@ -78,6 +85,48 @@ class DeviceRegistry:
         self.devices = None
         self._store = hass.helpers.storage.Store(STORAGE_VERSION, STORAGE_KEY)
 
+    @property
+    def devices(self):
+        """Return the entries by device id."""
+        return self._devices
+
+    @devices.setter
+    def devices(self, devices):
+        """Replace the entries and index them."""
+        self._devices = devices
+        # Device ids by identifier, by connection and by area id
+        self._identifier_index = {}
+        self._connection_index = {}
+        self._area_index = {}
+
+        for device in (devices or {}).values():
+            self._index_device(device)
+
+    def _index_device(self, device):
+        """Add a device to the indexes."""
+        for index, keys in (
+            (self._identifier_index, device.identifiers),
+            (self._connection_index, device.connections),
+            (self._area_index, () if device.area_id is None else (device.area_id,)),
+        ):
+            for key in keys:
+                index.setdefault(key, {})[device.id] = None
+
+    def _unindex_device(self, device):
+        """Remove a device from the indexes."""
+        for index, keys in (
+            (self._identifier_index, device.identifiers),
+            (self._connection_index, device.connections),
+            (self._area_index, () if device.area_id is None else (device.area_id,)),
+        ):
+            for key in keys:
+                device_ids = index.get(key)
+                if device_ids is None:
+                    continue
+                device_ids.pop(device.id, None)
+                if not device_ids:
+                    del index[key]
+
     @callback
     def async_get(self, device_id: str) -> Optional[DeviceEntry]:
         """Get device."""
@@ -88,12 +137,31 @@ class DeviceRegistry:
         self, identifiers: set, connections: set
     ) -> Optional[DeviceEntry]:
         """Check if device is registered."""
-        for device in self.devices.values():
-            if any(iden in device.identifiers for iden in identifiers) or any(
-                conn in device.connections for conn in connections
-            ):
-                return device
-        return None
+        matches = set()
+        for index, keys in (
+            (self._identifier_index, identifiers),
+            (self._connection_index, connections),
+        ):
+            for key in keys:
+                matches.update(index.get(key, ()))
+
+        if not matches:
+            return None
+
+        if len(matches) == 1:
+            return self.devices[matches.pop()]
+
+        # Return the first of the matching devices
+        return next(
+            device for device_id, device in self.devices.items() if device_id in matches
+        )
+
+    @callback
+    def async_entries_for_area(self, area_id: str) -> List[DeviceEntry]:
+        """Return entries that match an area."""
+        return [
+            self.devices[device_id] for device_id in self._area_index.get(area_id, ())
+        ]
 
     @callback
     def async_get_or_create(
@@ -128,6 +196,7 @@ class DeviceRegistry:
         if device is None:
             device = DeviceEntry(is_new=True)
             self.devices[device.id] = device
+            self._index_device(device)
 
         if via_device is not None:
             via = self.async_get_device({via_device}, set())
@@ -243,21 +312,25 @@ class DeviceRegistry:
             return old
 
         new = self.devices[device_id] = attr.evolve(old, **changes)
+
+        if changes.keys() & INDEXED_ATTRIBUTES:
+            self._unindex_device(old)
+            self._index_device(new)
+
         self.async_schedule_save()
 
-        self.hass.bus.async_fire(
-            EVENT_DEVICE_REGISTRY_UPDATED,
-            {
-                "action": "create" if "is_new" in changes else "update",
-                "device_id": new.id,
-            },
-        )
+        if "is_new" in changes:
+            data = {"action": "create", "device_id": new.id}
+        else:
+            data = {"action": "update", "device_id": new.id, "changes": list(changes)}
+
+        self.hass.bus.async_fire(EVENT_DEVICE_REGISTRY_UPDATED, data)
 
         return new
 
     def async_remove_device(self, device_id):
         """Remove a device from the device registry."""
-        del self.devices[device_id]
+        self._unindex_device(self.devices.pop(device_id))
         self.hass.bus.async_fire(
             EVENT_DEVICE_REGISTRY_UPDATED, {"action": "remove", "device_id": device_id}
         )
@@ -338,9 +411,8 @@ class DeviceRegistry:
     @callback
     def async_clear_area_id(self, area_id: str) -> None:
         """Clear area id from registry entries."""
-        for dev_id, device in self.devices.items():
-            if area_id == device.area_id:
-                self._async_update_device(dev_id, area_id=None)
+        for device in self.async_entries_for_area(area_id):
+            self._async_update_device(device.id, area_id=None)
 
 
 @bind_hass
@@ -369,4 +441,4 @@ async def async_get_registry(hass: HomeAssistantType) -> DeviceRegistry:
 @callback
 def async_entries_for_area(registry: DeviceRegistry, area_id: str) -> List[DeviceEntry]:
     """Return entries that match an area."""
-    return [device for device in registry.devices.values() if device.area_id == area_id]
+    return registry.async_entries_for_area(area_id)
@@ -9,7 +9,6 @@ timer.
 """
 from asyncio import Event
 from collections import OrderedDict
-from itertools import chain
 import logging
 from typing import List, Optional, cast
 
@@ -18,7 +17,7 @@ import attr
 from homeassistant.core import callback, split_entity_id, valid_entity_id
 from homeassistant.helpers.device_registry import EVENT_DEVICE_REGISTRY_UPDATED
 from homeassistant.loader import bind_hass
-from homeassistant.util import ensure_unique_string, slugify
+from homeassistant.util import slugify
 from homeassistant.util.yaml import load_yaml
 
 from .typing import HomeAssistantType
@@ -41,6 +40,9 @@ DISABLED_INTEGRATION = "integration"
 STORAGE_VERSION = 1
 STORAGE_KEY = "core.entity_registry"
 
+# Changes to these attributes of an entry update the indexes
+INDEXED_ATTRIBUTES = {"entity_id", "unique_id", "device_id"}
+
 
 @attr.s(slots=True, frozen=True)
 class RegistryEntry:
@@ -79,7 +81,11 @@ class RegistryEntry:
 
 
 class EntityRegistry:
-    """Class to hold a registry of entities."""
+    """Class to hold a registry of entities.
+
+    The entries are indexed by their unique id and by their device, the
+    indexes are rebuilt when the entities are replaced.
+    """
 
     def __init__(self, hass):
         """Initialize the registry."""
@@ -90,6 +96,42 @@ class EntityRegistry:
             EVENT_DEVICE_REGISTRY_UPDATED, self.async_device_removed
         )
 
+    @property
+    def entities(self):
+        """Return the entries by entity_id."""
+        return self._entities
+
+    @entities.setter
+    def entities(self, entities):
+        """Replace the entries and index them."""
+        self._entities = entities
+        # Entity ids by (domain, platform, unique_id) and by device id
+        self._unique_id_index = {}
+        self._device_index = {}
+
+        for entry in (entities or {}).values():
+            self._index_entry(entry)
+
+    def _index_entry(self, entry):
+        """Add an entry to the indexes."""
+        self._unique_id_index.setdefault(
+            (entry.domain, entry.platform, entry.unique_id), entry.entity_id
+        )
+        if entry.device_id is not None:
+            self._device_index.setdefault(entry.device_id, {})[entry.entity_id] = None
+
+    def _unindex_entry(self, entry):
+        """Remove an entry from the indexes."""
+        key = (entry.domain, entry.platform, entry.unique_id)
+        if self._unique_id_index.get(key) == entry.entity_id:
+            del self._unique_id_index[key]
+
+        device_entities = self._device_index.get(entry.device_id)
+        if device_entities is not None:
+            device_entities.pop(entry.entity_id, None)
+            if not device_entities:
+                del self._device_index[entry.device_id]
+
     @callback
     def async_is_registered(self, entity_id):
         """Check if an entity_id is currently registered."""
@@ -105,14 +147,15 @@ class EntityRegistry:
         self, domain: str, platform: str, unique_id: str
     ) -> Optional[str]:
         """Check if an entity_id is currently registered."""
-        for entity in self.entities.values():
-            if (
-                entity.domain == domain
-                and entity.platform == platform
-                and entity.unique_id == unique_id
-            ):
-                return entity.entity_id
-        return None
+        return self._unique_id_index.get((domain, platform, unique_id))
+
+    @callback
+    def async_entries_for_device(self, device_id: str) -> List[RegistryEntry]:
+        """Return entries that match a device."""
+        return [
+            self.entities[entity_id]
+            for entity_id in self._device_index.get(device_id, ())
+        ]
 
     @callback
     def async_generate_entity_id(
@@ -122,14 +165,21 @@ class EntityRegistry:
 
         Conflicts checked against registered and currently existing entities.
         """
-        return ensure_unique_string(
-            "{}.{}".format(domain, slugify(suggested_object_id)),
-            chain(
-                self.entities.keys(),
-                self.hass.states.async_entity_ids(domain),
-                known_object_ids if known_object_ids else [],
-            ),
-        )
+        preferred_string = "{}.{}".format(domain, slugify(suggested_object_id))
+        known_object_ids = set(known_object_ids) if known_object_ids else ()
+        test_string = preferred_string
+        tries = 1
+
+        # Look up the candidates instead of collecting all the entity ids
+        while (
+            test_string in self.entities
+            or test_string in known_object_ids
+            or self.hass.states.get(test_string) is not None
+        ):
+            tries += 1
+            test_string = "{}_{}".format(preferred_string, tries)
+
+        return test_string
 
     @callback
     def async_get_or_create(
@@ -187,6 +237,7 @@ class EntityRegistry:
             disabled_by=disabled_by,
         )
         self.entities[entity_id] = entity
+        self._index_entry(entity)
         _LOGGER.info("Registered new %s.%s entity: %s", domain, platform, entity_id)
         self.async_schedule_save()
 
@@ -199,7 +250,7 @@ class EntityRegistry:
     @callback
     def async_remove(self, entity_id):
         """Remove an entity from registry."""
-        self.entities.pop(entity_id)
+        self._unindex_entry(self.entities.pop(entity_id))
         self.hass.bus.async_fire(
             EVENT_ENTITY_REGISTRY_UPDATED, {"action": "remove", "entity_id": entity_id}
         )
@@ -277,20 +328,13 @@ class EntityRegistry:
             entity_id = changes["entity_id"] = new_entity_id
 
         if new_unique_id is not _UNDEF:
-            conflict = next(
-                (
-                    entity
-                    for entity in self.entities.values()
-                    if entity.unique_id == new_unique_id
-                    and entity.domain == old.domain
-                    and entity.platform == old.platform
-                ),
-                None,
+            conflict_entity_id = self.async_get_entity_id(
+                old.domain, old.platform, new_unique_id
             )
-            if conflict:
+            if conflict_entity_id:
                 raise ValueError(
                     "Unique id '{}' is already in use by '{}'".format(
-                        new_unique_id, conflict.entity_id
+                        new_unique_id, conflict_entity_id
                     )
                 )
             changes["unique_id"] = new_unique_id
@@ -300,6 +344,10 @@ class EntityRegistry:
 
         new = self.entities[entity_id] = attr.evolve(old, **changes)
 
+        if changes.keys() & INDEXED_ATTRIBUTES:
+            self._unindex_entry(old)
+            self._index_entry(new)
+
         self.async_schedule_save()
 
         data = {"action": "update", "entity_id": entity_id, "changes": list(changes)}
@@ -399,9 +447,7 @@ def async_entries_for_device(
     registry: EntityRegistry, device_id: str
 ) -> List[RegistryEntry]:
     """Return entries that match a device."""
-    return [
-        entry for entry in registry.entities.values() if entry.device_id == device_id
-    ]
+    return registry.async_entries_for_device(device_id)
 
 
 async def _async_migrate(entities):
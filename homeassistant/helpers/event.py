@@ -1,14 +1,20 @@
 """Helpers for listening to events."""
 from datetime import timedelta
 import functools as ft
+import heapq
+import itertools
+import logging
+from operator import itemgetter
 from typing import Callable
 
 import attr
 
 from homeassistant.loader import bind_hass
+from homeassistant.helpers import template as template_helper
 from homeassistant.helpers.sun import get_astral_event_next
 from homeassistant.core import HomeAssistant, callback, CALLBACK_TYPE
 from homeassistant.const import (
+    ATTR_ENTITY_ID,
     ATTR_NOW,
     EVENT_STATE_CHANGED,
     EVENT_TIME_CHANGED,
@@ -17,6 +23,7 @@ from homeassistant.const import (
     SUN_EVENT_SUNSET,
     EVENT_CORE_CONFIG_UPDATE,
 )
+from homeassistant.exceptions import TemplateError
 from homeassistant.util import dt as dt_util
 from homeassistant.util.async_ import run_callback_threadsafe
 
@@ -26,6 +33,14 @@ from homeassistant.util.async_ import run_callback_threadsafe
 # PyLint does not like the use of threaded_listener_factory
 # pylint: disable=invalid-name
 
+_LOGGER = logging.getLogger(__name__)
+
+DATA_POINT_IN_TIME_SCHEDULER = "event_point_in_time_scheduler"
+DATA_TIME_PATTERN_SCHEDULERS = "event_time_pattern_schedulers"
+
+# Minimum number of cancelled actions before the heap is compacted
+COMPACT_MIN_CANCELLED = 100
+
 
 def threaded_listener_factory(async_factory):
     """Convert an async event helper to a threaded one."""
@@ -51,6 +66,279 @@ def threaded_listener_factory(async_factory):
     return factory
 
 
+@callback
+def _async_run_scheduled(hass, action, now):
+    """Run a scheduled action, logging its errors so the other actions run."""
+    try:
+        hass.async_run_job(action, now)
+    except Exception:  # pylint: disable=broad-except
+        _LOGGER.exception("Error running scheduled action %s", action)
+
+
+class PointInTimeScheduler:
+    """Run actions once the time passes their point in time.
+
+    Actions are kept in a heap ordered by their point in time, and a single
+    loop timer is armed at the earliest one, so pending actions cost
+    nothing until they are due. When the timer runs, the due actions are
+    looked up with the current time, so a clock that rolled back does not
+    run actions early.
+    """
+
+    def __init__(self, hass):
+        """Initialize the scheduler."""
+        self.hass = hass
+        self._heap = []
+        self._counter = itertools.count()
+        self._cancelled = 0
+        self._timer = None
+        self._timer_time = None
+
+    @callback
+    def async_schedule(self, action, point_in_time) -> CALLBACK_TYPE:
+        """Run action once with the now of the first run at point_in_time."""
+        # The counter keeps actions at the same point in time in order
+        entry = [point_in_time, next(self._counter), action]
+        heapq.heappush(self._heap, entry)
+        self._async_arm_timer(dt_util.utcnow())
+
+        @callback
+        def async_cancel():
+            """Cancel the action if it did not run yet."""
+            if entry[2] is None:
+                return
+            entry[2] = None
+            self._cancelled += 1
+            self._async_compact()
+
+        return async_cancel
+
+    @callback
+    def _async_compact(self):
+        """Drop cancelled actions once they take up most of the heap."""
+        if self._cancelled == len(self._heap):
+            # Only cancelled actions are left, so nothing has to run
+            self._heap.clear()
+            self._cancelled = 0
+            self._async_cancel_timer()
+            return
+
+        if self._cancelled < COMPACT_MIN_CANCELLED or (
+            self._cancelled * 2 < len(self._heap)
+        ):
+            return
+
+        self._heap = [entry for entry in self._heap if entry[2] is not None]
+        heapq.heapify(self._heap)
+        self._cancelled = 0
+
+    @callback
+    def _async_cancel_timer(self):
+        """Cancel the loop timer."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+            self._timer_time = None
+
+    @callback
+    def _async_arm_timer(self, now):
+        """Arm the loop timer at the earliest point in time."""
+        if not self._heap:
+            self._async_cancel_timer()
+            return
+
+        point_in_time = self._heap[0][0]
+        if point_in_time == self._timer_time:
+            return
+
+        self._async_cancel_timer()
+        loop = self.hass.loop
+        delay = max((point_in_time - now).total_seconds(), 0)
+        self._timer = loop.call_at(loop.time() + delay, self._async_timer_fired)
+        self._timer_time = point_in_time
+
+    @callback
+    def _async_timer_fired(self):
+        """Run the actions that are due when the loop timer fires."""
+        self._timer = None
+        self._timer_time = None
+        self.async_run_due(dt_util.utcnow())
+
+    @callback
+    def async_run_due(self, now):
+        """Run the actions that are due at now."""
+        heap = self._heap
+        due = []
+
+        # Actions scheduled while running these are left for the next run
+        while heap and heap[0][0] <= now:
+            entry = heapq.heappop(heap)
+            action = entry[2]
+            if action is None:
+                self._cancelled -= 1
+                continue
+            entry[2] = None
+            due.append(action)
+
+        if self._cancelled == len(heap):
+            heap.clear()
+            self._cancelled = 0
+
+        self._async_arm_timer(now)
+
+        for action in due:
+            _async_run_scheduled(self.hass, action, now)
+
+
+class TimePatternScheduler:
+    """Run actions each time the time matches their pattern.
+
+    Every action is armed at the next time its pattern matches. Actions
+    armed at the same time share a slot, and a single loop timer is armed
+    at the earliest slot. Due actions run in the order they were scheduled.
+    If the time rolls back, all actions are re-armed from the new time.
+    """
+
+    def __init__(self, hass, local):
+        """Initialize the scheduler."""
+        self.hass = hass
+        self.local = local
+        self._heap = []
+        self._slots = {}
+        self._counter = itertools.count()
+        self._count = 0
+        self._last_now = None
+        self._timer = None
+        self._timer_time = None
+
+    @callback
+    def async_schedule(self, action, seconds, minutes, hours) -> CALLBACK_TYPE:
+        """Run action each time the time matches the pattern."""
+        # The counter keeps due actions in the order they were scheduled
+        entry = [None, (seconds, minutes, hours), action, next(self._counter)]
+        self._count += 1
+
+        # Like after a run, the current second is not matched again
+        now = dt_util.utcnow()
+        localized_now = self._async_follow_clock(now)
+        self._async_arm(entry, localized_now + timedelta(seconds=1))
+        self._async_arm_timer(now)
+
+        @callback
+        def async_cancel():
+            """Stop running the action."""
+            if entry[2] is None:
+                return
+            entry[2] = None
+            self._count -= 1
+            self._async_remove_from_slot(entry)
+
+            if not self._count:
+                self._async_cancel_timer()
+                self._heap.clear()
+                self._slots.clear()
+                self._last_now = None
+
+        return async_cancel
+
+    @callback
+    def _async_arm(self, entry, now):
+        """Put the entry in the slot of the next time its pattern matches."""
+        next_time = dt_util.find_next_time_expression_time(now, *entry[1])
+        entry[0] = next_time
+
+        slot = self._slots.get(next_time)
+        if slot is None:
+            slot = self._slots[next_time] = []
+            heapq.heappush(self._heap, next_time)
+        slot.append(entry)
+
+    @callback
+    def _async_remove_from_slot(self, entry):
+        """Remove an armed entry from its slot."""
+        slot = self._slots[entry[0]]
+        slot.remove(entry)
+        if not slot:
+            # The time stays in the heap and is skipped once it is popped
+            del self._slots[entry[0]]
+
+    @callback
+    def _async_follow_clock(self, now):
+        """Return now localized, re-arming all actions if the time rolled back."""
+        localized_now = dt_util.as_local(now) if self.local else now
+
+        if self._last_now is not None and now < self._last_now:
+            # Time rolled back, so the armed times might be too far ahead
+            entries = [entry for slot in self._slots.values() for entry in slot]
+            self._heap.clear()
+            self._slots.clear()
+            for entry in entries:
+                self._async_arm(entry, localized_now)
+
+        self._last_now = now
+        return localized_now
+
+    @callback
+    def _async_cancel_timer(self):
+        """Cancel the loop timer."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+            self._timer_time = None
+
+    @callback
+    def _async_arm_timer(self, now):
+        """Arm the loop timer at the earliest slot."""
+        heap = self._heap
+        while heap and heap[0] not in self._slots:
+            heapq.heappop(heap)
+
+        if not heap:
+            self._async_cancel_timer()
+            return
+
+        next_time = heap[0]
+        if next_time == self._timer_time:
+            return
+
+        self._async_cancel_timer()
+        loop = self.hass.loop
+        delay = max((next_time - now).total_seconds(), 0)
+        self._timer = loop.call_at(loop.time() + delay, self._async_timer_fired)
+        self._timer_time = next_time
+
+    @callback
+    def _async_timer_fired(self):
+        """Run the actions that are due when the loop timer fires."""
+        self._timer = None
+        self._timer_time = None
+        self.async_run_due(dt_util.utcnow())
+
+    @callback
+    def async_run_due(self, now):
+        """Run the actions that are due at now and re-arm them."""
+        localized_now = self._async_follow_clock(now)
+        heap = self._heap
+        due = []
+
+        while heap and heap[0] <= now:
+            due.extend(self._slots.pop(heapq.heappop(heap), ()))
+
+        due.sort(key=itemgetter(3))
+
+        next_now = localized_now + timedelta(seconds=1)
+        for entry in due:
+            self._async_arm(entry, next_now)
+
+        self._async_arm_timer(now)
+
+        for entry in due:
+            # Skip actions cancelled by actions that ran before them
+            action = entry[2]
+            if action is not None:
+                _async_run_scheduled(self.hass, action, localized_now)
+
+
 @callback
 @bind_hass
 def async_track_state_change(hass, entity_ids, action, from_state=None, to_state=None):
@@ -77,9 +365,6 @@ def async_track_state_change(hass, entity_ids, action, from_state=None, to_state
     @callback
     def state_change_listener(event):
         """Handle specific state changes."""
-        if entity_ids != MATCH_ALL and event.data.get("entity_id") not in entity_ids:
-            return
-
         old_state = event.data.get("old_state")
         if old_state is not None:
             old_state = old_state.state
@@ -96,7 +381,13 @@ def async_track_state_change(hass, entity_ids, action, from_state=None, to_state
                 event.data.get("new_state"),
             )
 
-    return hass.bus.async_listen(EVENT_STATE_CHANGED, state_change_listener)
+    if entity_ids == MATCH_ALL:
+        return hass.bus.async_listen(EVENT_STATE_CHANGED, state_change_listener)
+
+    # Only wake up for the entities we track
+    return hass.bus.async_listen_keyed(
+        EVENT_STATE_CHANGED, ATTR_ENTITY_ID, entity_ids, state_change_listener
+    )
 
 
 track_state_change = threaded_listener_factory(async_track_state_change)
@@ -106,32 +397,171 @@ track_state_change = threaded_listener_factory(async_track_state_change)
 @bind_hass
 def async_track_template(hass, template, action, variables=None):
     """Add a listener that track state changes with template condition."""
-    from . import condition
-
     # Local variable to keep track of if the action has already been triggered
     already_triggered = False
 
     @callback
-    def template_condition_listener(entity_id, from_s, to_s):
+    def template_condition_listener(event, result):
         """Check if condition is correct and run action."""
         nonlocal already_triggered
-        template_result = condition.async_template(hass, template, variables)
+
+        if isinstance(result, TemplateError):
+            _LOGGER.error("Error during template condition: %s", result)
+            template_result = False
+        else:
+            template_result = result.lower() == "true"
 
         # Check to see if template returns true
         if template_result and not already_triggered:
             already_triggered = True
-            hass.async_run_job(action, entity_id, from_s, to_s)
+            hass.async_run_job(
+                action,
+                event.data.get("entity_id"),
+                event.data.get("old_state"),
+                event.data.get("new_state"),
+            )
         elif not template_result:
             already_triggered = False
 
-    return async_track_state_change(
-        hass, template.extract_entities(variables), template_condition_listener
+    tracker = _TrackTemplateResultInfo(
+        hass, template, template_condition_listener, variables, track_all=True
     )
+    tracker.async_setup()
+    return tracker.async_remove
 
 
 track_template = threaded_listener_factory(async_track_template)
 
 
+@callback
+@bind_hass
+def async_track_template_result(hass, template, action, variables=None, info=None):
+    """Add a listener that re-renders a template when the states it uses change.
+
+    The template is rendered right away to collect the entities it accessed
+    and the domains or states it iterated, unless the RenderInfo of a render
+    the caller already did is passed as info. After every render the
+    listeners are updated to exactly those dependencies. The action is called
+    with the state_changed event and the new result, or the TemplateError
+    raised by the render.
+
+    Returns a function that can be called to remove the listeners.
+
+    Must be run within the event loop.
+    """
+    tracker = _TrackTemplateResultInfo(hass, template, action, variables)
+    tracker.async_setup(info)
+    return tracker.async_remove
+
+
+track_template_result = threaded_listener_factory(async_track_template_result)
+
+
+class _TrackTemplateResultInfo:
+    """Keep the state listeners of a template in sync with its dependencies."""
+
+    def __init__(self, hass, template, action, variables, track_all=False):
+        """Initialize the tracker.
+
+        With track_all, templates that don't access any states are
+        re-rendered on every state change, matching the behavior of
+        extract_entities for templates it can't extract entities from.
+        """
+        self.hass = hass
+        self._template = template
+        self._action = action
+        self._variables = variables
+        self._track_all = track_all and template_helper.is_template_string(
+            template.template
+        )
+        self._info = None
+        self._entities = None
+        self._unsub_entities = None
+        self._unsub_lifecycle = None
+
+    @callback
+    def async_setup(self, info=None):
+        """Render the template and start listening for its dependencies."""
+        if info is None:
+            info = self._template.async_render_to_info(self._variables)
+        self._info = info
+        self._update_listeners()
+
+    @callback
+    def async_remove(self):
+        """Stop listening for state changes."""
+        if self._unsub_entities is not None:
+            self._unsub_entities()
+            self._unsub_entities = None
+        if self._unsub_lifecycle is not None:
+            self._unsub_lifecycle()
+            self._unsub_lifecycle = None
+        self._entities = None
+
+    @callback
+    def _update_listeners(self):
+        """Listen to the dependencies collected by the last render."""
+        info = self._info
+        lifecycle = bool(info.all_states or info.domains)
+
+        if self._track_all and not info.entities and not lifecycle:
+            entities = MATCH_ALL
+        else:
+            entities = info.entities
+
+        if entities != self._entities:
+            if self._unsub_entities is not None:
+                self._unsub_entities()
+                self._unsub_entities = None
+
+            if entities == MATCH_ALL:
+                self._unsub_entities = self.hass.bus.async_listen(
+                    EVENT_STATE_CHANGED, self._async_refresh
+                )
+            elif entities:
+                self._unsub_entities = self.hass.bus.async_listen_keyed(
+                    EVENT_STATE_CHANGED, ATTR_ENTITY_ID, entities, self._async_refresh
+                )
+
+            self._entities = entities
+
+        if lifecycle and self._unsub_lifecycle is None:
+            self._unsub_lifecycle = self.hass.bus.async_listen(
+                EVENT_STATE_CHANGED, self._async_lifecycle_listener
+            )
+        elif not lifecycle and self._unsub_lifecycle is not None:
+            self._unsub_lifecycle()
+            self._unsub_lifecycle = None
+
+    @callback
+    def _async_lifecycle_listener(self, event):
+        """Re-render when an entity is added or removed in a tracked domain."""
+        if event.data.get("old_state") is not None and (
+            event.data.get("new_state") is not None
+        ):
+            return
+
+        entity_id = event.data.get(ATTR_ENTITY_ID)
+        # Changes of accessed entities are handled by the entity listener
+        if self._info.filter(entity_id) or not self._info.filter_lifecycle(entity_id):
+            return
+
+        self._async_refresh(event)
+
+    @callback
+    def _async_refresh(self, event):
+        """Re-render the template and run the action."""
+        self._info = self._template.async_render_to_info(self._variables)
+        self._update_listeners()
+
+        try:
+            result = self._info.result
+        except TemplateError as ex:
+            result = ex
+
+        self.hass.async_run_job(self._action, event, result)
+
+
 @callback
 @bind_hass
 def async_track_same_state(
@@ -206,30 +636,12 @@ track_point_in_time = threaded_listener_factory(async_track_point_in_time)
 @bind_hass
 def async_track_point_in_utc_time(hass, action, point_in_time) -> CALLBACK_TYPE:
     """Add a listener that fires once after a specific point in UTC time."""
-    # Ensure point_in_time is UTC
-    point_in_time = dt_util.as_utc(point_in_time)
-
-    @callback
-    def point_in_time_listener(event):
-        """Listen for matching time_changed events."""
-        now = event.data[ATTR_NOW]
-
-        if now < point_in_time or hasattr(point_in_time_listener, "run"):
-            return
+    scheduler = hass.data.get(DATA_POINT_IN_TIME_SCHEDULER)
+    if scheduler is None:
+        scheduler = hass.data[DATA_POINT_IN_TIME_SCHEDULER] = PointInTimeScheduler(hass)
 
-        # Set variable so that we will never run twice.
-        # Because the event bus might have to wait till a thread comes
-        # available to execute this listener it might occur that the
-        # listener gets lined up twice to be executed. This will make
-        # sure the second time it does nothing.
-        point_in_time_listener.run = True
-        async_unsub()
-
-        hass.async_run_job(action, now)
-
-    async_unsub = hass.bus.async_listen(EVENT_TIME_CHANGED, point_in_time_listener)
-
-    return async_unsub
+    # Ensure point_in_time is UTC
+    return scheduler.async_schedule(action, dt_util.as_utc(point_in_time))
 
 
 track_point_in_utc_time = threaded_listener_factory(async_track_point_in_utc_time)
@@ -381,42 +793,14 @@ def async_track_utc_time_change(
     matching_minutes = dt_util.parse_time_expression(minute, 0, 59)
     matching_hours = dt_util.parse_time_expression(hour, 0, 23)
 
-    next_time = None
-
-    def calculate_next(now):
-        """Calculate and set the next time the trigger should fire."""
-        nonlocal next_time
-
-        localized_now = dt_util.as_local(now) if local else now
-        next_time = dt_util.find_next_time_expression_time(
-            localized_now, matching_seconds, matching_minutes, matching_hours
-        )
-
-    # Make sure rolling back the clock doesn't prevent the timer from
-    # triggering.
-    last_now = None
-
-    @callback
-    def pattern_time_change_listener(event):
-        """Listen for matching time_changed events."""
-        nonlocal next_time, last_now
-
-        now = event.data[ATTR_NOW]
+    schedulers = hass.data.setdefault(DATA_TIME_PATTERN_SCHEDULERS, {})
+    scheduler = schedulers.get(local)
+    if scheduler is None:
+        scheduler = schedulers[local] = TimePatternScheduler(hass, local)
 
-        if last_now is None or now < last_now:
-            # Time rolled back or next time not yet calculated
-            calculate_next(now)
-
-        last_now = now
-
-        if next_time <= now:
-            hass.async_run_job(action, dt_util.as_local(now) if local else now)
-            calculate_next(now + timedelta(seconds=1))
-
-    # We can't use async_track_point_in_utc_time here because it would
-    # break in the case that the system time abruptly jumps backwards.
-    # Our custom last_now logic takes care of resolving that scenario.
-    return hass.bus.async_listen(EVENT_TIME_CHANGED, pattern_time_change_listener)
+    return scheduler.async_schedule(
+        action, matching_seconds, matching_minutes, matching_hours
+    )
 
 
 track_utc_time_change = threaded_listener_factory(async_track_utc_time_change)
@@ -1,13 +1,16 @@
 """Template helper methods for rendering strings with Home Assistant data."""
 import base64
+from collections import OrderedDict
 import json
 import logging
 import math
 import random
 import re
+import threading
+import time
 from datetime import datetime
 from functools import wraps
-from typing import Iterable
+from typing import Any, Dict, Iterable
 
 import jinja2
 from jinja2 import contextfilter, contextfunction
@@ -49,6 +52,8 @@ _RE_GET_ENTITIES = re.compile(
 )
 _RE_JINJA_DELIMITERS = re.compile(r"\{%|\{\{")
 
+COMPILE_CACHE_SIZE = 2048
+
 
 @bind_hass
 def attach(hass, obj):
@@ -72,6 +77,11 @@ def render_complex(value, variables=None):
     return value.async_render(variables)
 
 
+def is_template_string(maybe_template: str) -> bool:
+    """Check if the input is a Jinja2 template."""
+    return _RE_JINJA_DELIMITERS.search(maybe_template) is not None
+
+
 def extract_entities(template, variables=None):
     """Extract all entities for state_changed listener from template string."""
     if template is None or _RE_JINJA_DELIMITERS.search(template) is None:
@@ -106,6 +116,78 @@ def extract_entities(template, variables=None):
     return MATCH_ALL
 
 
+class CompileCache:
+    """Size bounded LRU cache of compiled template code.
+
+    The code depends on the filters of the environment that compiled it.
+    Environments with hass add the hass filters, so code is keyed on the
+    source and on whether the environment has hass. It is shared by all
+    templates and hass instances of the process.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        """Initialize the cache."""
+        self.maxsize = maxsize
+        self._cache = OrderedDict()  # type: OrderedDict
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.compile_time = 0.0
+
+    def get(self, env, source: str):
+        """Return the compiled code for source, compiling it on a miss.
+
+        Raises jinja2.TemplateSyntaxError for invalid templates, which are
+        not cached.
+        """
+        key = (env.hass is None, source)
+        with self._lock:
+            code = self._cache.get(key)
+            if code is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return code
+
+        start = time.perf_counter()
+        code = env.compile(source)
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self.misses += 1
+            self.compile_time += elapsed
+            self._cache[key] = code
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+                self.evictions += 1
+
+        return code
+
+    def clear(self) -> None:
+        """Remove all compiled templates from the cache."""
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return statistics about the cache."""
+        return {
+            "size": len(self._cache),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "compile_time": self.compile_time,
+        }
+
+
+_COMPILE_CACHE = CompileCache(COMPILE_CACHE_SIZE)
+
+
+def compile_cache_stats() -> Dict[str, Any]:
+    """Return statistics about the compiled template cache."""
+    return _COMPILE_CACHE.stats()
+
+
 def _true(arg) -> bool:
     return True
 
@@ -124,6 +206,21 @@ class RenderInfo:
         self._domains = []
         self._entities = []
 
+    @property
+    def entities(self) -> Iterable[str]:
+        """Entities whose state was accessed during the render."""
+        return self._entities
+
+    @property
+    def domains(self) -> Iterable[str]:
+        """Domains whose states were iterated during the render."""
+        return getattr(self, "_domains", frozenset())
+
+    @property
+    def all_states(self) -> bool:
+        """Return if all states were iterated during the render."""
+        return self._all_states
+
     def filter(self, entity_id: str) -> bool:
         """Template should re-render if the state changes."""
         return entity_id in self._entities
@@ -183,7 +280,7 @@ class Template:
             return
 
         try:
-            self._compiled_code = self._env.compile(self.template)
+            self._compiled_code = _COMPILE_CACHE.get(self._env, self.template)
         except jinja2.exceptions.TemplateSyntaxError as err:
             raise TemplateError(err)
 
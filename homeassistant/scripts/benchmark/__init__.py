@@ -2,13 +2,14 @@
 import argparse
 import asyncio
 from contextlib import suppress
-from datetime import datetime
+from datetime import datetime, timedelta
 import logging
 from timeit import default_timer as timer
 from typing import Callable, Dict
 
 from homeassistant import core
 from homeassistant.const import ATTR_NOW, EVENT_STATE_CHANGED, EVENT_TIME_CHANGED
+from homeassistant.helpers.event import DATA_TIME_PATTERN_SCHEDULERS
 from homeassistant.util import dt as dt_util
 
 
@@ -94,13 +95,14 @@ async def async_million_time_changed_helper(hass):
             event.set()
 
     hass.helpers.event.async_track_time_change(listener, minute=0, second=0)
-    event_data = {ATTR_NOW: datetime(2017, 10, 10, 15, 0, 0, tzinfo=dt_util.UTC)}
-
-    for _ in range(10 ** 6):
-        hass.bus.async_fire(EVENT_TIME_CHANGED, event_data)
+    scheduler = hass.data[DATA_TIME_PATTERN_SCHEDULERS][True]
+    start_time = datetime(2017, 10, 10, 15, 0, 0, tzinfo=dt_util.UTC)
 
     start = timer()
 
+    for hour in range(10 ** 6):
+        scheduler.async_run_due(start_time + timedelta(hours=hour))
+
     await event.wait()
 
     return timer() - start
@@ -139,6 +141,507 @@ async def async_million_state_changed_helper(hass):
     return timer() - start
 
 
+@benchmark
+async def async_state_changed_tracked_entities(hass):
+    """Fire state changes with a growing number of tracked entities."""
+    events_per_run = 10 ** 4
+    total = 0
+    tracked = 0
+    count = 0
+    event = asyncio.Event()
+
+    @core.callback
+    def listener(*args):
+        """Handle event."""
+        nonlocal count
+        count += 1
+
+        if count == events_per_run:
+            event.set()
+
+    @core.callback
+    def other_listener(*args):
+        """Handle events of the other tracked entities."""
+
+    hass.helpers.event.async_track_state_change("light.kitchen", listener)
+    event_data = {
+        "entity_id": "light.kitchen",
+        "old_state": core.State("light.kitchen", "off"),
+        "new_state": core.State("light.kitchen", "on"),
+    }
+
+    for entities in (10, 100, 1000, 10000):
+        for idx in range(tracked, entities):
+            hass.helpers.event.async_track_state_change(
+                "light.light_{}".format(idx), other_listener
+            )
+        tracked = entities
+        count = 0
+        event.clear()
+
+        start = timer()
+
+        for _ in range(events_per_run):
+            hass.bus.async_fire(EVENT_STATE_CHANGED, event_data)
+
+        await event.wait()
+
+        runtime = timer() - start
+        total += runtime
+        print(
+            "{} tracked entities: {:.2f}us per state change".format(
+                entities, runtime / events_per_run * 10 ** 6
+            )
+        )
+
+    return total
+
+
+@benchmark
+async def async_idle_hour_pending_timers(hass):
+    """Run an idle hour of time changed events with 10k pending timers."""
+    seconds = 3600
+    start_time = dt_util.utcnow()
+    count = 0
+    event = asyncio.Event()
+
+    @core.callback
+    def action(_):
+        """Handle a timer that should not be due."""
+
+    @core.callback
+    def listener(_):
+        """Handle event."""
+        nonlocal count
+        count += 1
+
+        if count == seconds:
+            event.set()
+
+    for idx in range(10 ** 4):
+        hass.helpers.event.async_track_point_in_utc_time(
+            action, start_time + timedelta(hours=2, seconds=idx)
+        )
+
+    hass.bus.async_listen(EVENT_TIME_CHANGED, listener)
+
+    start = timer()
+
+    for second in range(seconds):
+        hass.bus.async_fire(
+            EVENT_TIME_CHANGED, {ATTR_NOW: start_time + timedelta(seconds=second)}
+        )
+
+    await event.wait()
+
+    return timer() - start
+
+
+@benchmark
+async def recorder_states_at_point_in_time(hass):
+    """Compare the point in time state queries with and without snapshots."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from homeassistant.components.recorder import models
+    from homeassistant.components.recorder.snapshot import (
+        _latest_states_query,
+        create_snapshot,
+        states_at,
+    )
+
+    entities = 1000
+    updates = 2000
+    run_start = datetime(2019, 8, 1, tzinfo=dt_util.UTC)
+    run_end = run_start + timedelta(days=7)
+    interval = (run_end - run_start) / updates
+
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+
+    print("Inserting {} states".format(entities * updates))
+    for update in range(updates):
+        last_updated = run_start + interval * update
+        engine.execute(
+            models.States.__table__.insert(),
+            [
+                {
+                    "domain": "sensor",
+                    "entity_id": "sensor.sensor_{}".format(idx),
+                    "state": str(update),
+                    "attributes": "{}",
+                    "last_changed": last_updated,
+                    "last_updated": last_updated,
+                }
+                for idx in range(entities)
+            ],
+        )
+
+    snapshot_time = run_start + timedelta(hours=1)
+    while snapshot_time < run_end:
+        create_snapshot(session, run_start, snapshot_time)
+        snapshot_time += timedelta(hours=1)
+    session.commit()
+
+    point_in_time = run_end - timedelta(minutes=10)
+
+    start = timer()
+    query = _latest_states_query(session, run_start, point_in_time)
+    count = len(
+        {state.entity_id for state in query.with_entities(models.States.entity_id)}
+    )
+    print("Scan since run start: {} states in {:.3f}s".format(count, timer() - start))
+
+    start = timer()
+    recent_query, snapshot_query = states_at(session, run_start, point_in_time)
+    count = len(
+        {
+            state.entity_id
+            for query in (snapshot_query, recent_query)
+            for state in query.with_entities(models.States.entity_id)
+        }
+    )
+    runtime = timer() - start
+    print("Snapshot and recent states: {} states in {:.3f}s".format(count, runtime))
+
+    session.close()
+    return runtime
+
+
+@benchmark
+async def mqtt_topic_dispatch(hass):
+    """Match MQTT topics against the subscriptions of 1000 devices."""
+    from paho.mqtt.matcher import MQTTMatcher
+
+    from homeassistant.components.mqtt import Subscription, SubscriptionTrie
+
+    devices = 1000
+    messages = 10 ** 4
+
+    topics = ["homeassistant/+/+/config", "homeassistant/+/+/+/config"]
+    for idx in range(devices):
+        topics.extend(
+            [
+                "zigbee2mqtt/device_{}".format(idx),
+                "zigbee2mqtt/device_{}/availability".format(idx),
+                "tasmota/device_{}/tele/+".format(idx),
+                "tasmota/device_{}/stat/#".format(idx),
+            ]
+        )
+    subscriptions = [Subscription(topic, None) for topic in topics]
+
+    trie = SubscriptionTrie()
+    for subscription in subscriptions:
+        trie.add(subscription)
+
+    message_topics = [
+        "zigbee2mqtt/device_{}".format(idx % devices)
+        if idx % 2
+        else "tasmota/device_{}/tele/SENSOR".format(idx % devices)
+        for idx in range(messages)
+    ]
+
+    def match_each(topic):
+        """Match the topic against each subscription."""
+        matches = []
+        for subscription in subscriptions:
+            matcher = MQTTMatcher()
+            matcher[subscription.topic] = True
+            if next(matcher.iter_match(topic), None) is not None:
+                matches.append(subscription)
+        return matches
+
+    start = timer()
+    for topic in message_topics[:100]:
+        match_each(topic)
+    runtime = (timer() - start) / 100
+    print("Matching each subscription: {:.2f}us per message".format(runtime * 10 ** 6))
+
+    start = timer()
+    for topic in message_topics:
+        trie.match(topic)
+    runtime = timer() - start
+    print(
+        "Subscription trie: {:.2f}us per message".format(runtime / messages * 10 ** 6)
+    )
+
+    return runtime
+
+
+@benchmark
+async def statistics_sensor_window(hass):
+    """Compare rolling statistics with recomputing a 10k sample window."""
+    from collections import deque
+    import statistics
+
+    from homeassistant.components.statistics.sensor import RollingStatistics
+
+    sampling_size = 10 ** 4
+    updates = 1000
+    values = [(idx * 7919 % 1009) / 7 for idx in range(sampling_size + updates)]
+
+    window = deque(values[:sampling_size], maxlen=sampling_size)
+    start = timer()
+    for value in values[sampling_size:]:
+        window.append(value)
+        statistics.mean(window)
+        statistics.median(window)
+        statistics.stdev(window)
+        statistics.variance(window)
+        sum(window)
+        min(window)
+        max(window)
+    runtime = (timer() - start) / updates
+    print("Recomputing the window: {:.2f}us per update".format(runtime * 10 ** 6))
+
+    window = deque(values[:sampling_size])
+    rolling = RollingStatistics()
+    for value in window:
+        rolling.add(value)
+
+    start = timer()
+    for value in values[sampling_size:]:
+        rolling.remove()
+        window.popleft()
+        window.append(value)
+        rolling.add(value)
+        # pylint: disable=pointless-statement
+        rolling.mean, rolling.median, rolling.variance, rolling.total
+        rolling.minimum, rolling.maximum
+    runtime = timer() - start
+    print("Rolling statistics: {:.2f}us per update".format(runtime / updates * 10 ** 6))
+
+    return runtime
+
+
+@benchmark
+async def filter_sensor_history(hass):
+    """Replay 100k historical states through filter chains."""
+    from homeassistant.components.filter import sensor as filter_sensor
+
+    samples = 10 ** 5
+    start_time = datetime(2019, 8, 1, tzinfo=dt_util.UTC)
+    states = [
+        core.State(
+            "sensor.temperature",
+            str(20 + (idx * 7919 % 1009) / 100),
+            last_updated=start_time + timedelta(seconds=10 * idx),
+        )
+        for idx in range(samples)
+    ]
+
+    chains = {
+        "outlier, lowpass": lambda: [
+            filter_sensor.OutlierFilter(10, 2, None, 4.0),
+            filter_sensor.LowPassFilter(1, 2, None, 10),
+        ],
+        "range, time_simple_moving_average, throttle": lambda: [
+            filter_sensor.RangeFilter(None, 15.0, 25.0),
+            filter_sensor.TimeSMAFilter(timedelta(minutes=5), 2, None, "last"),
+            filter_sensor.ThrottleFilter(6, 2, None),
+        ],
+    }
+
+    total = 0
+    for name, filters in chains.items():
+        chain = filter_sensor.FilterChain(filters(), None)
+        start = timer()
+        for state in states:
+            chain.filter_state(state)
+        runtime = timer() - start
+        print("{}: {:.0f} states/s one state at a time".format(name, samples / runtime))
+
+        chain = filter_sensor.FilterChain(filters(), None)
+        start = timer()
+        chain.filter_history(states)
+        runtime = timer() - start
+        total += runtime
+        print("{}: {:.0f} states/s as a batch".format(name, samples / runtime))
+
+    return total
+
+
+@benchmark
+async def websocket_state_changed_fanout(hass):
+    """Fire state changes with a growing number of websocket subscribers."""
+    from homeassistant.auth.models import Group, User
+    from homeassistant.auth.permissions.system_policies import ADMIN_POLICY
+    from homeassistant.components.websocket_api import commands
+    from homeassistant.components.websocket_api.connection import ActiveConnection
+    from homeassistant.components.websocket_api.const import JSON_DUMP
+
+    changes_per_run = 1000
+    total = 0
+    clients = 0
+    count = 0
+    event = asyncio.Event()
+
+    @core.callback
+    def listener(*args):
+        """Handle event."""
+        nonlocal count
+        count += 1
+
+        if count == changes_per_run:
+            event.set()
+
+    def send_message(message):
+        """Serialize messages like the websocket writer."""
+        if not isinstance(message, str):
+            JSON_DUMP(message)
+
+    user = User("Dashboard", None, groups=[Group("Admin", ADMIN_POLICY)])
+    attributes = {
+        "friendly_name": "Living room temperature",
+        "unit_of_measurement": "°C",
+        "device_class": "temperature",
+        "battery_level": 87,
+        "icon": "mdi:thermometer",
+    }
+
+    for connected in (1, 10, 20, 50):
+        # Subscribe before the listener counting the state changes
+        for iden in range(clients, connected):
+            connection = ActiveConnection(None, hass, send_message, user, None)
+            commands.handle_subscribe_events(
+                hass,
+                connection,
+                {"id": iden, "type": "subscribe_events", "event_type": "state_changed"},
+            )
+        clients = connected
+        unsub = hass.bus.async_listen(EVENT_STATE_CHANGED, listener)
+        count = 0
+        event.clear()
+
+        start = timer()
+
+        for idx in range(changes_per_run):
+            hass.states.async_set("sensor.living_room", str(idx), attributes)
+
+        await event.wait()
+
+        runtime = timer() - start
+        total += runtime
+        unsub()
+        print(
+            "{} clients: {:.2f}us per state change".format(
+                connected, runtime / changes_per_run * 10 ** 6
+            )
+        )
+
+    return total
+
+
+@benchmark
+async def registry_startup(hass):
+    """Register devices and their entities like integrations at startup."""
+    from collections import OrderedDict
+    from homeassistant.helpers.device_registry import DeviceRegistry
+    from homeassistant.helpers.entity_registry import (
+        EntityRegistry,
+        async_entries_for_device,
+    )
+
+    devices = 2000
+    entities_per_device = 3
+    total = 0
+
+    device_registry = DeviceRegistry(hass)
+    device_registry.devices = OrderedDict()
+    entity_registry = EntityRegistry(hass)
+    entity_registry.entities = OrderedDict()
+
+    # The first start registers everything, the second finds it registered
+    for run in ("first", "second"):
+        start = timer()
+
+        for idx in range(devices):
+            device = device_registry.async_get_or_create(
+                config_entry_id="bench",
+                identifiers={("bench", "device-{}".format(idx))},
+                connections={("mac", "02:00:00:{:06x}".format(idx))},
+                manufacturer="Bench",
+                name="Device {}".format(idx),
+            )
+            for sub in range(entities_per_device):
+                entity_registry.async_get_or_create(
+                    "sensor", "bench", "{}-{}".format(idx, sub), device_id=device.id
+                )
+            async_entries_for_device(entity_registry, device.id)
+
+        runtime = timer() - start
+        total += runtime
+        print("{} start: {:.3f}s".format(run, runtime))
+
+    return total
+
+
+@benchmark
+async def group_expand_entity_ids(hass):
+    """Expand a large group of nested groups like service calls do."""
+    from homeassistant.components.group import expand_entity_ids
+
+    rooms = 50
+    lights_per_room = 40
+    expands = 1000
+    room_ids = []
+
+    for room in range(rooms):
+        lights = [
+            "light.room_{}_{}".format(room, light) for light in range(lights_per_room)
+        ]
+        room_ids.append("group.room_{}".format(room))
+        hass.states.async_set(room_ids[-1], "on", {"entity_id": lights})
+
+    hass.states.async_set("group.all_lights", "on", {"entity_id": room_ids})
+
+    start = timer()
+
+    for _ in range(expands):
+        assert len(expand_entity_ids(hass, ["group.all_lights"])) == 2000
+
+    return timer() - start
+
+
+@benchmark
+async def group_member_changes(hass):
+    """Change the members of a large group one at a time and in bursts."""
+    from homeassistant.components.group import Group
+
+    members = 1000
+    total = 0
+    entity_ids = ["light.light_{}".format(idx) for idx in range(members)]
+
+    for entity_id in entity_ids:
+        hass.states.async_set(entity_id, "off")
+
+    group = Group(hass, "All lights", user_defined=False, entity_ids=entity_ids)
+    group.entity_id = "group.all_lights"
+    await group.async_update_ha_state(True)
+    group.async_start()
+    await hass.async_block_till_done()
+
+    # Bursts of 1 change are written one by one, larger ones are coalesced
+    for burst in (1, 10, 100):
+        start = timer()
+
+        for offset in range(0, members, burst):
+            for entity_id in entity_ids[offset : offset + burst]:
+                hass.states.async_set(entity_id, "on")
+            await hass.async_block_till_done()
+
+        for entity_id in entity_ids:
+            hass.states.async_set(entity_id, "off")
+        await hass.async_block_till_done()
+
+        runtime = timer() - start
+        total += runtime
+        print("bursts of {}: {:.3f}s".format(burst, runtime))
+
+    return total
+
+
 @benchmark
 @asyncio.coroutine
 def logbook_filtering_state(hass):
@@ -3,7 +3,8 @@ import asyncio
 
 import asynctest
 
-from homeassistant.auth import auth_store
+from homeassistant.auth import auth_store, models
+from tests.common import mock_device_registry, mock_registry
 
 
 async def test_loading_no_group_data_format(hass, hass_storage):
@@ -242,3 +243,75 @@ async def test_loading_race_condition(hass):
         mock_dev_registry.assert_called_once_with(hass)
         mock_load.assert_called_once_with()
         assert results[0] == results[1]
+
+
+async def test_registry_update_invalidates_permissions(hass):
+    """Test area and device permissions follow registry updates."""
+    entity_registry = mock_registry(hass)
+    device_registry = mock_device_registry(hass)
+    store = auth_store.AuthStore(hass)
+    user = await store.async_create_user("Test User")
+    user.groups = [
+        models.Group(
+            name="Kitchen",
+            policy={"entities": {"area_ids": {"kitchen": {"read": True}}}},
+        )
+    ]
+    user.invalidate_permission_cache()
+
+    device = device_registry.async_get_or_create(
+        config_entry_id="1234", identifiers={("test", "1234")}
+    )
+    entry = entity_registry.async_get_or_create(
+        "light", "test", "1234", device_id=device.id
+    )
+    await hass.async_block_till_done()
+    assert user.permissions.check_entity(entry.entity_id, "read") is False
+
+    device_registry.async_update_device(device.id, area_id="kitchen")
+    await hass.async_block_till_done()
+    assert user.permissions.check_entity(entry.entity_id, "read") is True
+    assert user.permissions.check_entity(entry.entity_id, "control") is False
+
+
+async def test_registry_update_invalidates_moved_entities(hass):
+    """Test registry updates only drop the access of entities that moved."""
+    entity_registry = mock_registry(hass)
+    device_registry = mock_device_registry(hass)
+    store = auth_store.AuthStore(hass)
+    user = await store.async_create_user("Test User")
+    user.groups = [
+        models.Group(
+            name="Kitchen",
+            policy={"entities": {"area_ids": {"kitchen": {"read": True}}}},
+        )
+    ]
+    user.invalidate_permission_cache()
+
+    device = device_registry.async_get_or_create(
+        config_entry_id="1234", identifiers={("test", "1234")}
+    )
+    entry = entity_registry.async_get_or_create(
+        "light", "test", "1234", device_id=device.id
+    )
+    other = entity_registry.async_get_or_create("light", "test", "5678")
+    await hass.async_block_till_done()
+
+    permissions = user.permissions
+    assert permissions.check_entity(entry.entity_id, "read") is False
+    assert permissions.check_entity(other.entity_id, "read") is False
+
+    entity_registry.async_update_entity(other.entity_id, name="Other")
+    device_registry.async_update_device(device.id, name="Device")
+    await hass.async_block_till_done()
+    assert permissions._entity_cache.keys() == {entry.entity_id, other.entity_id}
+
+    device_registry.async_update_device(device.id, area_id="kitchen")
+    await hass.async_block_till_done()
+    assert user.permissions is permissions
+    assert permissions._entity_cache.keys() == {other.entity_id}
+    assert permissions.check_entity(entry.entity_id, "read") is True
+
+    entity_registry.async_get_or_create("light", "test", "5678", device_id=device.id)
+    await hass.async_block_till_done()
+    assert permissions.check_entity(other.entity_id, "read") is True
@@ -343,6 +343,40 @@ async def test_cannot_retrieve_expired_access_token(hass):
     assert await manager.async_validate_access_token(access_token) is None
 
 
+async def test_validated_access_token_cache(hass):
+    """Test validated access tokens are remembered until no longer valid."""
+    manager = await auth.auth_manager_from_config(hass, [], [])
+    user = MockUser().add_to_auth_manager(manager)
+    refresh_token = await manager.async_create_refresh_token(user, CLIENT_ID)
+    access_token = manager.async_create_access_token(refresh_token)
+
+    assert await manager.async_validate_access_token(access_token) is refresh_token
+
+    with patch("homeassistant.auth.jwt.decode") as mock_decode:
+        assert await manager.async_validate_access_token(access_token) is refresh_token
+    assert mock_decode.call_count == 0
+
+    with patch(
+        "homeassistant.util.dt.utcnow",
+        return_value=dt_util.utcnow()
+        + auth_const.ACCESS_TOKEN_EXPIRATION
+        + timedelta(seconds=11),
+    ):
+        assert await manager.async_validate_access_token(access_token) is None
+
+    access_token = manager.async_create_access_token(refresh_token)
+    assert await manager.async_validate_access_token(access_token) is refresh_token
+    user.is_active = False
+    assert await manager.async_validate_access_token(access_token) is None
+    user.is_active = True
+
+    access_token = manager.async_create_access_token(refresh_token)
+    assert await manager.async_validate_access_token(access_token) is refresh_token
+    await manager.async_remove_user(user)
+    assert await manager.async_get_refresh_token(refresh_token.id) is None
+    assert await manager.async_validate_access_token(access_token) is None
+
+
 async def test_generating_system_user(hass):
     """Test that we can add a system user."""
     events = []
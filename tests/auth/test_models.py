@@ -1,4 +1,6 @@
 """Tests for the auth models."""
+from unittest.mock import Mock
+
 from homeassistant.auth import models, permissions
 
 
@@ -26,3 +28,23 @@ def test_permissions_merged():
     assert user.permissions.check_entity("switch.bla", "read") is True
     assert user.permissions.check_entity("light.kitchen", "read") is True
     assert user.permissions.check_entity("light.not_kitchen", "read") is False
+
+
+def test_permissions_entity_cache():
+    """Test the entity access is looked up once per entity."""
+    group = models.Group(
+        name="Test Group",
+        policy={"entities": {"device_ids": {"mock-dev-id": {"read": True}}}},
+    )
+    entity_registry = Mock()
+    entity_registry.async_get.return_value = Mock(device_id="mock-dev-id")
+    user = models.User(
+        name="Test User",
+        perm_lookup=permissions.PermissionLookup(entity_registry, Mock()),
+        groups=[group],
+    )
+
+    assert user.permissions.check_entity("light.kitchen", "read") is True
+    assert user.permissions.check_entity("light.kitchen", "control") is False
+    assert user.permissions.check_entity("light.kitchen", "read") is True
+    assert entity_registry.async_get.call_count == 2
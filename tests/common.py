@@ -50,6 +50,10 @@ from homeassistant.helpers import (
     restore_state,
     storage,
 )
+from homeassistant.helpers.event import (
+    DATA_POINT_IN_TIME_SCHEDULER,
+    DATA_TIME_PATTERN_SCHEDULERS,
+)
 from homeassistant.helpers.json import JSONEncoder
 from homeassistant.setup import async_setup_component, setup_component
 from homeassistant.util.unit_system import METRIC_SYSTEM
@@ -275,8 +279,16 @@ fire_mqtt_message = threadsafe_callback_factory(async_fire_mqtt_message)
 
 @ha.callback
 def async_fire_time_changed(hass, time):
-    """Fire a time changes event."""
-    hass.bus.async_fire(EVENT_TIME_CHANGED, {"now": date_util.as_utc(time)})
+    """Fire a time changes event and run the scheduled actions due at time."""
+    time = date_util.as_utc(time)
+    hass.bus.async_fire(EVENT_TIME_CHANGED, {"now": time})
+
+    scheduler = hass.data.get(DATA_POINT_IN_TIME_SCHEDULER)
+    if scheduler is not None:
+        scheduler.async_run_due(time)
+
+    for scheduler in hass.data.get(DATA_TIME_PATTERN_SCHEDULERS, {}).values():
+        scheduler.async_run_due(time)
 
 
 fire_time_changed = threadsafe_callback_factory(async_fire_time_changed)
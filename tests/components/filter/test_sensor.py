@@ -3,7 +3,10 @@ from datetime import timedelta
 import unittest
 from unittest.mock import patch
 
+import pytest
+
 from homeassistant.components.filter.sensor import (
+    FilterChain,
     LowPassFilter,
     OutlierFilter,
     ThrottleFilter,
@@ -104,36 +107,30 @@ class TestFilterSensor(unittest.TestCase):
         t_2 = dt_util.utcnow() - timedelta(minutes=3)
 
         if missing:
-            fake_states = {}
+            fake_states = []
         else:
-            fake_states = {
-                "sensor.test_monitored": [
-                    ha.State("sensor.test_monitored", 18.0, last_changed=t_0),
-                    ha.State("sensor.test_monitored", 19.0, last_changed=t_1),
-                    ha.State("sensor.test_monitored", 18.2, last_changed=t_2),
-                ]
-            }
+            fake_states = [
+                ha.State("sensor.test_monitored", 18.0, last_changed=t_0),
+                ha.State("sensor.test_monitored", 19.0, last_changed=t_1),
+                ha.State("sensor.test_monitored", 18.2, last_changed=t_2),
+            ]
 
         with patch(
-            "homeassistant.components.history." "state_changes_during_period",
-            return_value=fake_states,
+            "homeassistant.components.recorder.preload.get_preload_states",
+            side_effect=lambda hass, requests: [fake_states for _ in requests],
         ):
-            with patch(
-                "homeassistant.components.history." "get_last_state_changes",
-                return_value=fake_states,
-            ):
-                with assert_setup_component(1, "sensor"):
-                    assert setup_component(self.hass, "sensor", config)
-
-                for value in self.values:
-                    self.hass.states.set(config["sensor"]["entity_id"], value.state)
-                    self.hass.block_till_done()
-
-                state = self.hass.states.get("sensor.test")
-                if missing:
-                    assert "18.05" == state.state
-                else:
-                    assert "17.05" == state.state
+            with assert_setup_component(1, "sensor"):
+                assert setup_component(self.hass, "sensor", config)
+
+            for value in self.values:
+                self.hass.states.set(config["sensor"]["entity_id"], value.state)
+                self.hass.block_till_done()
+
+            state = self.hass.states.get("sensor.test")
+            if missing:
+                assert "18.05" == state.state
+            else:
+                assert "17.05" == state.state
 
     def test_chain_history_missing(self):
         """Test if filter chaining works when recorder is enabled but the source is not recorded."""
@@ -155,27 +152,137 @@ class TestFilterSensor(unittest.TestCase):
         t_1 = dt_util.utcnow() - timedelta(minutes=2)
         t_2 = dt_util.utcnow() - timedelta(minutes=3)
 
-        fake_states = {
-            "sensor.test_monitored": [
-                ha.State("sensor.test_monitored", 18.0, last_changed=t_0),
-                ha.State("sensor.test_monitored", 19.0, last_changed=t_1),
-                ha.State("sensor.test_monitored", 18.2, last_changed=t_2),
-            ]
+        fake_states = [
+            ha.State("sensor.test_monitored", 18.0, last_changed=t_0),
+            ha.State("sensor.test_monitored", 19.0, last_changed=t_1),
+            ha.State("sensor.test_monitored", 18.2, last_changed=t_2),
+        ]
+        with patch(
+            "homeassistant.components.recorder.preload.get_preload_states",
+            side_effect=lambda hass, requests: [fake_states for _ in requests],
+        ):
+            with assert_setup_component(1, "sensor"):
+                assert setup_component(self.hass, "sensor", config)
+
+            self.hass.block_till_done()
+            state = self.hass.states.get("sensor.test")
+            assert "18.0" == state.state
+
+    def test_history_same_timestamp(self):
+        """Test states recorded at the same time with other values are kept."""
+        self.init_recorder()
+        config = {
+            "history": {},
+            "sensor": {
+                "platform": "filter",
+                "name": "test",
+                "entity_id": "sensor.test_monitored",
+                "filters": [
+                    {"filter": "lowpass", "window_size": 10, "time_constant": 2}
+                ],
+            },
         }
+        t_0 = dt_util.utcnow() - timedelta(minutes=1)
+        fake_states = [
+            ha.State("sensor.test_monitored", 18.0, last_changed=t_0, last_updated=t_0),
+            ha.State("sensor.test_monitored", 20.0, last_changed=t_0, last_updated=t_0),
+        ]
         with patch(
-            "homeassistant.components.history." "state_changes_during_period",
-            return_value=fake_states,
+            "homeassistant.components.recorder.preload.get_preload_states",
+            side_effect=lambda hass, requests: [fake_states for _ in requests],
         ):
-            with patch(
-                "homeassistant.components.history." "get_last_state_changes",
-                return_value=fake_states,
-            ):
-                with assert_setup_component(1, "sensor"):
-                    assert setup_component(self.hass, "sensor", config)
+            with assert_setup_component(1, "sensor"):
+                assert setup_component(self.hass, "sensor", config)
 
-                self.hass.block_till_done()
-                state = self.hass.states.get("sensor.test")
-                assert "18.0" == state.state
+            self.hass.block_till_done()
+            state = self.hass.states.get("sensor.test")
+            assert "19.0" == state.state
+
+    def test_non_numeric_states(self):
+        """Test non-numeric states are skipped without entering the windows."""
+        timestamp = self.values[2].last_updated
+        states = [
+            ha.State(
+                "sensor.test_monitored",
+                "open",
+                last_updated=timestamp + timedelta(seconds=seconds),
+            )
+            for seconds in (10, 20)
+        ]
+
+        def filters():
+            """Return a new chain of filters."""
+            return [
+                OutlierFilter(window_size=3, precision=2, entity=None, radius=4.0),
+                LowPassFilter(window_size=3, precision=2, entity=None, time_constant=4),
+                TimeSMAFilter(
+                    window_size=timedelta(minutes=2),
+                    precision=2,
+                    entity=None,
+                    type="last",
+                ),
+                RangeFilter(entity=None, lower_bound=10, upper_bound=20),
+            ]
+
+        chain = FilterChain(filters(), None)
+        for state in self.values[:3]:
+            chain.filter_state(state)
+        for state in states:
+            with pytest.raises(ValueError):
+                chain.filter_state(state)
+        values = [chain.filter_state(state) for state in self.values[3:]]
+
+        expected_chain = FilterChain(filters(), None)
+        expected = [expected_chain.filter_state(state) for state in self.values]
+        assert values == expected[3:]
+
+        indexes, values = FilterChain(filters(), None).filter_history(
+            self.values[:3] + states + self.values[3:]
+        )
+        assert indexes == [0, 1, 2, 5, 6, 7]
+        assert values == expected
+
+    def test_filter_history(self):
+        """Test filtering history as a batch matches one state at a time."""
+
+        def filters():
+            """Return a new chain of filters."""
+            return [
+                OutlierFilter(window_size=3, precision=2, entity=None, radius=1.1),
+                TimeSMAFilter(
+                    window_size=timedelta(minutes=2),
+                    precision=2,
+                    entity=None,
+                    type="last",
+                ),
+                ThrottleFilter(window_size=2, precision=2, entity=None),
+            ]
+
+        timestamp = self.values[-1].last_updated
+        states = self.values + [
+            ha.State(
+                "sensor.test_monitored",
+                "unavailable",
+                last_updated=timestamp + timedelta(minutes=1),
+            ),
+            ha.State(
+                "sensor.test_monitored",
+                21,
+                last_updated=timestamp + timedelta(minutes=2),
+            ),
+        ]
+
+        chain = FilterChain(filters(), None)
+        expected = [
+            (index, chain.filter_state(state))
+            for index, state in enumerate(states)
+            if state.state != "unavailable"
+        ]
+        expected = [(index, value) for index, value in expected if value is not None]
+
+        indexes, values = FilterChain(filters(), None).filter_history(states)
+        assert list(zip(indexes, values)) == expected
+        assert indexes == [0, 2, 4, 7]
 
     def test_outlier(self):
         """Test if outlier filter works."""
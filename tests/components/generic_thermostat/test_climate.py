@@ -30,7 +30,11 @@ from homeassistant.core import DOMAIN as HASS_DOMAIN, CoreState, State, callback
 from homeassistant.setup import async_setup_component
 from homeassistant.util.unit_system import METRIC_SYSTEM
 
-from tests.common import assert_setup_component, mock_restore_cache
+from tests.common import (
+    assert_setup_component,
+    async_fire_time_changed,
+    mock_restore_cache,
+)
 from tests.components.climate import common
 
 ENTITY = "climate.test"
@@ -950,7 +954,7 @@ async def test_temp_change_ac_trigger_off_long_enough_3(hass, setup_comp_7):
 
 def _send_time_changed(hass, now):
     """Send a time changed event."""
-    hass.bus.async_fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: now})
+    async_fire_time_changed(hass, now)
 
 
 @pytest.fixture
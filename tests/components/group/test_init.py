@@ -16,7 +16,10 @@ from homeassistant.const import (
     ATTR_ASSUMED_STATE,
     STATE_NOT_HOME,
     ATTR_FRIENDLY_NAME,
+    ATTR_ENTITY_ID,
+    EVENT_STATE_CHANGED,
 )
+from homeassistant.core import callback
 import homeassistant.components.group as group
 
 from tests.common import get_test_home_assistant, assert_setup_component
@@ -210,6 +213,43 @@ class TestComponentsGroup(unittest.TestCase):
             group.expand_entity_ids(self.hass, [test_group.entity_id])
         )
 
+    def test_expand_entity_ids_nested_cycle(self):
+        """Test expand_entity_ids with groups that contain each other."""
+        self.hass.states.set(
+            "group.first", STATE_ON, {ATTR_ENTITY_ID: ["light.bowl", "group.second"]}
+        )
+        self.hass.states.set(
+            "group.second", STATE_ON, {ATTR_ENTITY_ID: ["group.first", "light.ceiling"]}
+        )
+
+        assert ["light.bowl", "light.ceiling"] == group.expand_entity_ids(
+            self.hass, ["group.first"]
+        )
+        assert ["light.bowl", "light.ceiling"] == group.expand_entity_ids(
+            self.hass, ["group.second"]
+        )
+
+    def test_expand_entity_ids_follows_member_changes(self):
+        """Test expansions are updated when a nested group changes."""
+        self.hass.states.set(
+            "group.lights", STATE_ON, {ATTR_ENTITY_ID: ["light.bowl", "light.ceiling"]}
+        )
+        self.hass.states.set(
+            "group.all", STATE_ON, {ATTR_ENTITY_ID: ["group.lights", "switch.ac"]}
+        )
+
+        assert ["light.bowl", "light.ceiling", "switch.ac"] == group.expand_entity_ids(
+            self.hass, ["group.all"]
+        )
+
+        self.hass.states.set(
+            "group.lights", STATE_ON, {ATTR_ENTITY_ID: ["light.bowl", "light.desk"]}
+        )
+
+        assert ["light.bowl", "light.desk", "switch.ac"] == group.expand_entity_ids(
+            self.hass, ["group.all"]
+        )
+
     def test_expand_entity_ids_ignores_non_strings(self):
         """Test that non string elements in lists are ignored."""
         assert [] == group.expand_entity_ids(self.hass, [5, True])
@@ -550,3 +590,35 @@ def test_service_group_set_group_remove_group(hass):
 
     group_state = hass.states.get("group.user_test_group")
     assert group_state is None
+
+
+async def test_member_changes_write_group_state_once(hass):
+    """Test member changes arriving together are written as one group state."""
+    hass.states.async_set("light.bowl", STATE_OFF)
+    hass.states.async_set("light.ceiling", STATE_OFF)
+    test_group = await group.Group.async_create_group(
+        hass, "init_group", ["light.Bowl", "light.Ceiling"], False, mode=True
+    )
+    await hass.async_block_till_done()
+
+    group_states = []
+
+    @callback
+    def async_capture(event):
+        if event.data["entity_id"] == test_group.entity_id:
+            group_states.append(event.data["new_state"])
+
+    hass.bus.async_listen(EVENT_STATE_CHANGED, async_capture)
+
+    hass.states.async_set("light.bowl", STATE_ON, {ATTR_ASSUMED_STATE: True})
+    hass.states.async_set("light.ceiling", STATE_ON)
+    await hass.async_block_till_done()
+
+    assert len(group_states) == 1
+    assert group_states[0].state == STATE_ON
+    assert not group_states[0].attributes.get(ATTR_ASSUMED_STATE)
+
+    hass.states.async_remove("light.ceiling")
+    await hass.async_block_till_done()
+
+    assert hass.states.get(test_group.entity_id).state == STATE_ON
@@ -30,6 +30,25 @@ async def test_default_state(hass):
     assert state.attributes.get("effect") is None
 
 
+async def test_member_changes_coalesced(hass):
+    """Test member changes before the group update run only one update."""
+    await async_setup_component(
+        hass,
+        "light",
+        {"light": {"platform": "group", "entities": ["light.test1", "light.test2"]}},
+    )
+    await hass.async_block_till_done()
+
+    with asynctest.patch.object(
+        group.LightGroup, "async_update", autospec=True
+    ) as update_mock:
+        hass.states.async_set("light.test1", "on")
+        hass.states.async_set("light.test2", "on")
+        await hass.async_block_till_done()
+
+    assert update_mock.call_count == 1
+
+
 async def test_state_reporting(hass):
     """Test the state reporting."""
     await async_setup_component(
@@ -448,3 +467,54 @@ async def test_invalid_service_calls(hass):
         data.pop("rgb_color")
         data.pop("xy_color")
         mock_call.assert_called_once_with("light", "turn_on", data, blocking=True)
+
+
+async def test_member_changes_counted(hass):
+    """Test the group follows member changes without reading all members."""
+    await async_setup_component(
+        hass,
+        "light",
+        {
+            "light": {
+                "platform": "group",
+                "entities": ["light.test1", "light.test2", "light.test3"],
+            }
+        },
+    )
+    hass.states.async_set(
+        "light.test1",
+        "on",
+        {"brightness": 255, "min_mireds": 200, "supported_features": 3},
+    )
+    hass.states.async_set(
+        "light.test2",
+        "on",
+        {"brightness": 100, "min_mireds": 150, "supported_features": 3},
+    )
+    hass.states.async_set(
+        "light.test3",
+        "off",
+        {"brightness": 50, "min_mireds": 160, "supported_features": 3},
+    )
+    await hass.async_block_till_done()
+
+    state = hass.states.get("light.light_group")
+    assert state.attributes["brightness"] == 177
+    assert state.attributes["min_mireds"] == 150
+
+    with asynctest.patch.object(hass.states, "get", wraps=hass.states.get) as mock_get:
+        hass.states.async_set(
+            "light.test3", "on", {"brightness": 50, "supported_features": 3}
+        )
+        hass.states.async_remove("light.test2")
+        await hass.async_block_till_done()
+
+    assert not any(call[1][0].startswith("light.test") for call in mock_get.mock_calls)
+    state = hass.states.get("light.light_group")
+    assert state.attributes["brightness"] == 152
+    assert state.attributes["min_mireds"] == 200
+
+    hass.states.async_set("light.test1", "unavailable")
+    hass.states.async_set("light.test3", "unavailable")
+    await hass.async_block_till_done()
+    assert hass.states.get("light.light_group").state == "unavailable"
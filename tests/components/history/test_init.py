@@ -1,13 +1,19 @@
 """The tests the History component."""
 # pylint: disable=protected-access,invalid-name
 from datetime import timedelta
+import json
 import unittest
 from unittest.mock import patch, sentinel
 
+from aiohttp import ClientPayloadError
+import pytest
+
 from homeassistant.setup import setup_component, async_setup_component
 import homeassistant.core as ha
 import homeassistant.util.dt as dt_util
 from homeassistant.components import history, recorder
+from homeassistant.components.recorder.statistics import PERIOD_HOUR, compile_statistics
+from homeassistant.helpers.json import JSONEncoder
 
 from tests.common import (
     init_recorder_component,
@@ -526,6 +532,132 @@ class TestComponentHistory(unittest.TestCase):
         )
         assert list(hist.keys()) == entity_ids
 
+    def test_get_significant_states_minimal_response(self):
+        """Test that only the first state of an entity is returned in full.
+
+        Thermostats keep their attributes because those are graphed.
+        """
+        zero, four, states = self.record_states()
+        hist = history.get_significant_states(
+            self.hass, zero, four, filters=history.Filters(), minimal_response=True
+        )
+        assert hist.keys() == states.keys()
+
+        for entity_id, state_list in states.items():
+            assert hist[entity_id][0] == state_list[0]
+            for state, minimal in zip(state_list[1:], hist[entity_id][1:]):
+                if state.domain == "thermostat":
+                    assert minimal == state
+                else:
+                    assert minimal == [state.state, state.last_changed.isoformat()]
+
+    def test_get_significant_states_minimal_response_skips_decoding(self):
+        """Test attributes are only decoded for the first state."""
+        zero, four, states = self.record_states()
+        with patch(
+            "homeassistant.components.recorder.models.json.loads",
+            side_effect=json.loads,
+        ) as mock_loads:
+            history.get_significant_states(
+                self.hass,
+                zero,
+                four,
+                ["media_player.test"],
+                filters=history.Filters(),
+                minimal_response=True,
+            )
+        assert len(states["media_player.test"]) == 3
+        assert mock_loads.call_count == 1
+
+    def test_get_significant_states_statistics(self):
+        """Test numeric sensors are served from the statistics when asked."""
+        self.init_recorder()
+        start = dt_util.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(
+            hours=3
+        )
+        attributes = {"unit_of_measurement": "°C"}
+        for minutes, value in ((10, "10"), (40, "20"), (90, "30"), (190, "40")):
+            with patch(
+                "homeassistant.components.recorder.dt_util.utcnow",
+                return_value=start + timedelta(minutes=minutes),
+            ):
+                self.hass.states.set("sensor.temperature", value, attributes)
+                self.hass.states.set("media_player.test", value)
+                self.wait_recording_done()
+
+        # The states of compiled hours are served from their statistics
+        with patch(
+            "homeassistant.components.recorder.dt_util.utcnow",
+            return_value=start + timedelta(minutes=150),
+        ):
+            self.hass.states.set("sensor.temperature", "unavailable", attributes)
+            self.wait_recording_done()
+
+        instance = self.hass.data[recorder.DATA_INSTANCE]
+        while not compile_statistics(instance, start + timedelta(hours=3)):
+            pass
+
+        hist = history.get_significant_states(
+            self.hass,
+            start,
+            start + timedelta(hours=4),
+            filters=history.Filters(),
+            statistics_period=PERIOD_HOUR,
+        )
+        assert [
+            (state.state, state.last_updated) for state in hist["sensor.temperature"]
+        ] == [
+            ("14.0", start),
+            ("25.0", start + timedelta(hours=1)),
+            ("30.0", start + timedelta(hours=2)),
+            ("40", start + timedelta(minutes=190)),
+        ]
+        assert hist["sensor.temperature"][0].attributes == {
+            "unit_of_measurement": "°C",
+            "min": 10.0,
+            "max": 20.0,
+        }
+        assert len(hist["media_player.test"]) == 4
+
+    def test_stream_significant_states(self):
+        """Test streamed states match the significant states."""
+        zero, four, states = self.record_states()
+        expected = history.get_significant_states(
+            self.hass, zero, four, filters=history.Filters()
+        )
+        chunks = list(
+            history.stream_significant_states(
+                self.hass, zero, four, filters=history.Filters(), chunk_size=100
+            )
+        )
+        assert len(chunks) > 1
+
+        hist = json.loads("".join(chunks))
+        assert [state_list[0]["entity_id"] for state_list in hist] == sorted(expected)
+        assert hist == [
+            json.loads(json.dumps(expected[entity_id], cls=JSONEncoder))
+            for entity_id in sorted(expected)
+        ]
+
+    def test_stream_significant_states_with_initial(self):
+        """Test streaming includes entities that only have a start state."""
+        zero, four, states = self.record_states()
+        one = zero + timedelta(seconds=1)
+        expected = history.get_significant_states(
+            self.hass, one, four, filters=history.Filters()
+        )
+        hist = json.loads(
+            "".join(
+                history.stream_significant_states(
+                    self.hass, one, four, filters=history.Filters()
+                )
+            )
+        )
+        assert sorted(hist, key=lambda state_list: state_list[0]["entity_id"]) == [
+            json.loads(json.dumps(expected[entity_id], cls=JSONEncoder))
+            for entity_id in sorted(expected)
+        ]
+
     def check_significant_states(self, zero, four, states, config):
         """Check if significant states are retrieved."""
         filters = history.Filters()
@@ -650,3 +782,75 @@ async def test_fetch_period_api_with_include_order(hass, hass_client):
         params={"filter_entity_id": "non.existing,something.else"},
     )
     assert response.status == 200
+
+
+async def test_fetch_period_api_stream(hass, hass_client):
+    """Test the fetch period view streaming the history."""
+    await hass.async_add_job(init_recorder_component, hass)
+    await async_setup_component(hass, "history", {})
+    start = dt_util.utcnow()
+    hass.states.async_set("light.kitchen", "on")
+    hass.states.async_set("light.kitchen", "off")
+    hass.states.async_set("switch.fan", "on")
+    await hass.async_block_till_done()
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+    client = await hass_client()
+    response = await client.get(
+        "/api/history/period/{}".format(start.isoformat()), params={"stream": ""}
+    )
+    assert response.status == 200
+    hist = await response.json()
+    assert [[state["state"] for state in state_list] for state_list in hist] == [
+        ["on", "off"],
+        ["on"],
+    ]
+
+
+async def test_fetch_period_api_stream_error(hass, hass_client):
+    """Test the streamed history is aborted when the query fails mid stream."""
+    await hass.async_add_job(init_recorder_component, hass)
+    await async_setup_component(hass, "history", {})
+
+    def failing_stream(*args, **kwargs):
+        """Fail after the first chunk."""
+        yield "[["
+        raise ValueError("Query failed")
+
+    client = await hass_client()
+    with patch(
+        "homeassistant.components.history.stream_significant_states", failing_stream
+    ):
+        response = await client.get(
+            "/api/history/period/{}".format(dt_util.utcnow().isoformat()),
+            params={"stream": ""},
+        )
+        assert response.status == 200
+        with pytest.raises(ClientPayloadError):
+            await response.read()
+
+
+async def test_fetch_period_api_minimal_response(hass, hass_client):
+    """Test the fetch period view returning minimal states."""
+    await hass.async_add_job(init_recorder_component, hass)
+    await async_setup_component(hass, "history", {})
+    start = dt_util.utcnow()
+    hass.states.async_set("light.kitchen", "on", {"brightness": 100})
+    hass.states.async_set("light.kitchen", "off")
+    await hass.async_block_till_done()
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+    client = await hass_client()
+
+    for params in ({"minimal_response": ""}, {"minimal_response": "", "stream": ""}):
+        response = await client.get(
+            "/api/history/period/{}".format(start.isoformat()), params=params
+        )
+        assert response.status == 200
+        hist = await response.json()
+        assert len(hist) == 1
+        first, second = hist[0]
+        assert first["entity_id"] == "light.kitchen"
+        assert first["attributes"] == {"brightness": 100}
+        assert second == [
+            "off",
+            hass.states.get("light.kitchen").last_changed.isoformat(),
+        ]
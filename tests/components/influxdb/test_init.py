@@ -1,8 +1,12 @@
 """The tests for the InfluxDB component."""
 import datetime
+import os
+import tempfile
 import unittest
 from unittest import mock
 
+from influxdb import exceptions
+
 from homeassistant.setup import setup_component
 import homeassistant.components.influxdb as influxdb
 from homeassistant.const import EVENT_STATE_CHANGED, STATE_OFF, STATE_ON, STATE_STANDBY
@@ -750,3 +754,110 @@ class TestInfluxDB(unittest.TestCase):
             assert mock_client.return_value.write_points.call_count == 0
 
         mock_client.return_value.write_points.reset_mock()
+
+    def test_buffer_spill_and_replay(self, mock_client):
+        """Test events are buffered while writes fail and replayed in order."""
+        with tempfile.TemporaryDirectory() as path:
+            self._setup(mock_client, buffer={"path": path})
+            instance = self.hass.data[influxdb.DOMAIN]
+            write_points = mock_client.return_value.write_points
+
+            def event(value):
+                """Return a state changed event with a value."""
+                state = mock.MagicMock(
+                    state=value,
+                    domain="fake",
+                    entity_id="fake.entity",
+                    object_id="entity",
+                    attributes={},
+                )
+                return mock.MagicMock(data={"new_state": state}, time_fired=12345)
+
+            def body(value):
+                """Return the point written for a value."""
+                return {
+                    "measurement": "fake.entity",
+                    "tags": {"domain": "fake", "entity_id": "entity"},
+                    "time": 12345,
+                    "fields": {"value": value},
+                }
+
+            monotonic_time = 0
+
+            with mock.patch(
+                "homeassistant.components.influxdb.time.monotonic",
+                new=lambda: monotonic_time,
+            ):
+                # Write fails, so the events are buffered
+                write_points.side_effect = IOError("foo")
+                self.handler_method(event(1))
+                instance.block_till_done()
+                assert write_points.call_count == 1
+                assert instance.buffer.backlog_points == 1
+
+                # No replay before the retry interval passed
+                self.handler_method(event(2))
+                instance.block_till_done()
+                assert write_points.call_count == 1
+                assert instance.buffer.backlog_points == 2
+                assert len(os.listdir(path)) == 1
+
+                # The buffer is replayed before new events are written
+                write_points.side_effect = None
+                monotonic_time += influxdb.BUFFER_RETRY_INTERVAL
+                self.handler_method(event(3))
+                instance.block_till_done()
+
+            assert write_points.call_args_list[1:] == [
+                mock.call(
+                    [body(1.0), body(2.0)], batch_size=influxdb.BUFFER_REPLAY_BATCH_SIZE
+                ),
+                mock.call([body(3.0)]),
+            ]
+            assert instance.buffer.backlog_points == 0
+            assert os.listdir(path) == []
+
+    def test_buffer_drops_rejected(self, mock_client):
+        """Test buffered events rejected by influxdb are dropped."""
+        with tempfile.TemporaryDirectory() as path:
+            self._setup(mock_client, buffer={"path": path})
+            instance = self.hass.data[influxdb.DOMAIN]
+            write_points = mock_client.return_value.write_points
+
+            state = mock.MagicMock(
+                state=1,
+                domain="fake",
+                entity_id="fake.entity",
+                object_id="entity",
+                attributes={},
+            )
+            event = mock.MagicMock(data={"new_state": state}, time_fired=12345)
+
+            monotonic_time = 0
+
+            with mock.patch(
+                "homeassistant.components.influxdb.time.monotonic",
+                new=lambda: monotonic_time,
+            ):
+                write_points.side_effect = IOError("foo")
+                self.handler_method(event)
+                instance.block_till_done()
+                assert instance.buffer.backlog_points == 1
+
+                # Server errors keep the events buffered
+                write_points.side_effect = exceptions.InfluxDBServerError("foo")
+                monotonic_time += influxdb.BUFFER_RETRY_INTERVAL
+                self.handler_method(event)
+                instance.block_till_done()
+                assert instance.buffer.backlog_points == 2
+
+                # Rejected events are dropped instead of retried
+                write_points.side_effect = exceptions.InfluxDBClientError("foo", 400)
+                monotonic_time += influxdb.BUFFER_RETRY_INTERVAL
+                self.handler_method(event)
+                instance.block_till_done()
+
+            # Both buffered segments and the new events were written once
+            assert write_points.call_count == 5
+            assert not instance.buffer.has_data
+            assert os.listdir(path) == []
@@ -318,6 +318,33 @@ class TestMQTTCallbacks(unittest.TestCase):
         self.hass.block_till_done()
         assert len(self.calls) == 1
 
+    def test_overlapping_subscriptions_run_in_order(self):
+        """Test matching subscriptions run in the order they subscribed."""
+        calls = []
+
+        for topic in ("test/#", "test/+/state", "test/light/state", "test/+"):
+            mqtt.subscribe(
+                self.hass,
+                topic,
+                lambda msg, topic=topic: calls.append((topic, msg.payload)),
+            )
+        mqtt.subscribe(
+            self.hass,
+            "test/light/state",
+            lambda msg: calls.append(("raw", msg.payload)),
+            encoding=None,
+        )
+
+        fire_mqtt_message(self.hass, "test/light/state", "on")
+
+        self.hass.block_till_done()
+        assert calls == [
+            ("test/#", "on"),
+            ("test/+/state", "on"),
+            ("test/light/state", "on"),
+            ("raw", b"on"),
+        ]
+
     def test_subscribe_topic(self):
         """Test the subscription of a topic."""
         unsub = mqtt.subscribe(self.hass, "test-topic", self.record_calls)
@@ -808,3 +835,82 @@ async def test_mqtt_ws_subscription(hass, hass_ws_client):
     await client.send_json({"id": 8, "type": "unsubscribe_events", "subscription": 5})
     response = await client.receive_json()
     assert response["success"]
+
+
+async def test_mqtt_ws_stats(hass, hass_ws_client):
+    """Test MQTT websocket stats of messages handed off in batches."""
+    await async_mock_mqtt_component(hass)
+    calls = []
+
+    @callback
+    def record_calls(msg):
+        """Record the received payloads."""
+        calls.append(msg.payload)
+
+    await mqtt.async_subscribe(hass, "test-topic", record_calls)
+
+    for payload in (b"test1", b"test2"):
+        hass.data["mqtt"]._mqtt_on_message(
+            None, None, mqtt.Message("test-topic", payload, 0, False)
+        )
+    await hass.async_block_till_done()
+    assert calls == ["test1", "test2"]
+
+    client = await hass_ws_client(hass)
+    await client.send_json({"id": 5, "type": "mqtt/stats"})
+    response = await client.receive_json()
+    assert response["success"]
+    assert response["result"]["messages_received"] == 2
+    assert response["result"]["batches"] == 1
+    assert response["result"]["max_batch_size"] == 2
+    assert response["result"]["queue_depth"] == 0
+
+
+async def test_mqtt_raising_message(hass, caplog):
+    """Test a message failing to be handled does not drop the rest of the batch."""
+    mqtt_mock = await async_mock_mqtt_component(hass)
+    calls = []
+
+    @callback
+    def record_calls(msg):
+        """Record the received payloads."""
+        calls.append(msg.payload)
+
+    await mqtt.async_subscribe(hass, "test-topic", record_calls)
+
+    client = mqtt_mock._mock_wraps
+    handle_message = client._mqtt_handle_message
+
+    def handle_bad_message(msg):
+        """Fail to handle the first message."""
+        if msg.payload == b"test1":
+            raise ValueError("Bad message")
+        handle_message(msg)
+
+    with mock.patch.object(client, "_mqtt_handle_message", handle_bad_message):
+        for payload in (b"test1", b"test2"):
+            client._mqtt_on_message(
+                None, None, mqtt.Message("test-topic", payload, 0, False)
+            )
+        await hass.async_block_till_done()
+
+    assert calls == ["test2"]
+    assert "Bad message" in caplog.text
+
+
+async def test_mqtt_publish_cancelled(hass):
+    """Test a cancelled publish does not fail the other pending publishes."""
+    mqtt_mock = await async_mock_mqtt_component(hass)
+
+    cancelled = hass.async_create_task(
+        mqtt_mock.async_publish("test-topic", "test1", 0, False)
+    )
+    published = hass.async_create_task(
+        mqtt_mock.async_publish("test-topic", "test2", 0, False)
+    )
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    await hass.async_block_till_done()
+
+    assert cancelled.cancelled()
+    assert published.done() and published.exception() is None
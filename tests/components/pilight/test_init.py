@@ -7,12 +7,15 @@ from datetime import timedelta
 
 import pytest
 
-from homeassistant import core as ha
 from homeassistant.setup import setup_component
 from homeassistant.components import pilight
 from homeassistant.util import dt as dt_util
 
-from tests.common import get_test_home_assistant, assert_setup_component
+from tests.common import (
+    assert_setup_component,
+    fire_time_changed,
+    get_test_home_assistant,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -196,13 +199,13 @@ class TestPilight(unittest.TestCase):
             service_data1["protocol"] = [service_data1["protocol"]]
             service_data2["protocol"] = [service_data2["protocol"]]
 
-            self.hass.bus.fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: dt_util.utcnow()})
+            fire_time_changed(self.hass, dt_util.utcnow())
             self.hass.block_till_done()
             error_log_call = mock_pilight_error.call_args_list[-1]
             assert str(service_data1) in str(error_log_call)
 
             new_time = dt_util.utcnow() + timedelta(seconds=5)
-            self.hass.bus.fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: new_time})
+            fire_time_changed(self.hass, new_time)
             self.hass.block_till_done()
             error_log_call = mock_pilight_error.call_args_list[-1]
             assert str(service_data2) in str(error_log_call)
@@ -403,13 +406,15 @@ class TestPilightCallrateThrottler(unittest.TestCase):
         for i in range(3):
             action(i)
 
-        assert runs == []
+        # The first call is due right away, the others wait for the delay
+        self.hass.block_till_done()
+        assert runs == [0]
 
-        exp = []
+        exp = [0]
         now = dt_util.utcnow()
-        for i in range(3):
+        for i in range(1, 3):
             exp.append(i)
             shifted_time = now + (timedelta(seconds=delay + 0.1) * i)
-            self.hass.bus.fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: shifted_time})
+            fire_time_changed(self.hass, shifted_time)
             self.hass.block_till_done()
             assert runs == exp
@@ -103,3 +103,71 @@ def test_view(prometheus_client):  # pylint: disable=redefined-outer-name
         'entity="sensor.electricity_price",'
         'friendly_name="Electricity price"} 0.123' in body
     )
+
+
+async def test_view_scrape_mode(hass, hass_client):
+    """Test metrics are collected from the states when they are scraped."""
+    assert await async_setup_component(
+        hass, prometheus.DOMAIN, {prometheus.DOMAIN: {"mode": "scrape"}}
+    )
+    await setup.async_setup_component(
+        hass, sensor.DOMAIN, {"sensor": [{"platform": "demo"}]}
+    )
+    for last_triggered in ("07:00", "07:30"):
+        hass.states.async_set(
+            "automation.wake_up",
+            "on",
+            {"friendly_name": "Wake up", "last_triggered": last_triggered},
+        )
+    await hass.async_block_till_done()
+
+    client = await hass_client()
+    resp = await client.get(prometheus.API_ENDPOINT)
+    assert resp.status == 200
+    body = (await resp.text()).split("\n")
+
+    assert "# HELP python_info Python platform information" in body
+    assert (
+        'temperature_c{domain="sensor",'
+        'entity="sensor.outside_temperature",'
+        'friendly_name="Outside Temperature"} 15.6' in body
+    )
+    assert (
+        'state_change_total{domain="automation",'
+        'entity="automation.wake_up",'
+        'friendly_name="Wake up"} 2.0' in body
+    )
+    assert (
+        'automation_triggered_count_total{domain="automation",'
+        'entity="automation.wake_up",'
+        'friendly_name="Wake up"} 2.0' in body
+    )
+
+    # The rendered metrics are cached
+    hass.states.async_set(
+        "sensor.outside_temperature", 20, {"unit_of_measurement": "°C"}
+    )
+    await hass.async_block_till_done()
+    resp = await client.get(prometheus.API_ENDPOINT)
+    assert (await resp.text()).split("\n") == body
+
+
+async def test_scrape_mode_removed_entities(hass, hass_client):
+    """Test state change counts of removed entities are dropped."""
+    assert await async_setup_component(
+        hass,
+        prometheus.DOMAIN,
+        {prometheus.DOMAIN: {"mode": "scrape", "cache_time": 0}},
+    )
+    hass.states.async_set("automation.wake_up", "on", {"friendly_name": "Wake up"})
+    hass.states.async_set("automation.sleep", "on", {"friendly_name": "Sleep"})
+    await hass.async_block_till_done()
+
+    hass.states.async_remove("automation.wake_up")
+    await hass.async_block_till_done()
+
+    client = await hass_client()
+    resp = await client.get(prometheus.API_ENDPOINT)
+    body = await resp.text()
+    assert 'entity="automation.sleep"' in body
+    assert 'entity="automation.wake_up"' not in body
@@ -4,6 +4,7 @@ import unittest
 from unittest.mock import patch
 
 import pytest
+from sqlalchemy.exc import SQLAlchemyError
 
 from homeassistant.core import callback
 from homeassistant.const import MATCH_ALL
@@ -11,7 +12,7 @@ from homeassistant.setup import async_setup_component
 from homeassistant.components.recorder import Recorder
 from homeassistant.components.recorder.const import DATA_INSTANCE
 from homeassistant.components.recorder.util import session_scope
-from homeassistant.components.recorder.models import States, Events
+from homeassistant.components.recorder.models import States, StateAttributes, Events
 
 from tests.common import get_test_home_assistant, init_recorder_component
 
@@ -222,3 +223,139 @@ async def test_defaults_set(hass):
     assert recorder_config is not None
     assert recorder_config["purge_keep_days"] == 10
     assert recorder_config["purge_interval"] == 1
+
+
+def test_saving_state_batched(hass_recorder):
+    """Test states arriving within the commit interval share one commit."""
+    hass = hass_recorder({"commit_interval": 0.5})
+    instance = hass.data[DATA_INSTANCE]
+    commits = instance.stats["commits"]
+
+    entity_ids = ["test.recorder{}".format(idx) for idx in range(10)]
+    for entity_id in entity_ids:
+        hass.states.set(entity_id, "on", {"test_attr": 5})
+    hass.block_till_done()
+    instance.block_till_done()
+
+    assert instance.stats["commits"] == commits + 1
+    assert instance.stats["last_batch_size"] == 10
+
+    with session_scope(hass=hass) as session:
+        db_states = list(session.query(States))
+        db_events = {
+            event.event_id: event
+            for event in session.query(Events).filter_by(event_type="state_changed")
+        }
+        assert len(db_states) == 10
+        for db_state in db_states:
+            assert db_state.event_id in db_events
+            assert (
+                db_state.entity_id
+                in db_events[db_state.event_id].to_native().data["entity_id"]
+            )
+            assert db_state.to_native() == hass.states.get(db_state.entity_id)
+
+
+def test_saving_state_batch_error(hass_recorder):
+    """Test a batch failing to save is saved one event at a time."""
+    hass = hass_recorder({"commit_interval": 0.5})
+    instance = hass.data[DATA_INSTANCE]
+    save_batch = instance._save_batch
+
+    def fail_on_bad_state(session, batch):
+        """Fail to save batches with the bad state."""
+        if any(event.data.get("entity_id") == "test.bad" for event in batch):
+            raise SQLAlchemyError("Bad state")
+        return save_batch(session, batch)
+
+    with patch.object(instance, "_save_batch", fail_on_bad_state):
+        for entity_id in ("test.recorder1", "test.bad", "test.recorder2"):
+            hass.states.set(entity_id, "on")
+        hass.block_till_done()
+        instance.block_till_done()
+
+    with session_scope(hass=hass) as session:
+        assert sorted(state.entity_id for state in session.query(States)) == [
+            "test.recorder1",
+            "test.recorder2",
+        ]
+
+
+def test_saving_state_max_events(hass_recorder):
+    """Test a batch is committed when commit_max_events is reached."""
+    hass = hass_recorder({"commit_interval": 10, "commit_max_events": 2})
+    instance = hass.data[DATA_INSTANCE]
+    commits = instance.stats["commits"]
+
+    hass.states.set("test.recorder1", "on")
+    hass.states.set("test.recorder2", "on")
+    hass.block_till_done()
+    instance.block_till_done()
+
+    assert instance.stats["commits"] == commits + 1
+    assert instance.stats["last_batch_size"] == 2
+
+
+def test_saving_state_shared_attributes(hass_recorder):
+    """Test states with equal attributes reference a single attributes row."""
+    hass = hass_recorder({"commit_interval": 0.5})
+    instance = hass.data[DATA_INSTANCE]
+
+    for idx in range(3):
+        hass.states.set("test.recorder{}".format(idx), "on", {"test_attr": 5})
+    hass.states.set("test.recorder3", "on", {"test_attr": 6})
+    hass.block_till_done()
+    instance.block_till_done()
+
+    # Attributes stored by an earlier run are found in the database
+    instance.clear_attributes_cache()
+    hass.states.set("test.recorder0", "off", {"test_attr": 5})
+    hass.block_till_done()
+    instance.block_till_done()
+
+    with session_scope(hass=hass) as session:
+        db_attributes = list(session.query(StateAttributes))
+        assert sorted(attr.shared_attrs for attr in db_attributes) == [
+            '{"test_attr": 5}',
+            '{"test_attr": 6}',
+        ]
+        db_states = list(session.query(States))
+        assert len(db_states) == 5
+        for db_state in db_states:
+            assert db_state.attributes is None
+            assert db_state.attributes_id is not None
+
+        assert db_states[-1].to_native() == hass.states.get("test.recorder0")
+
+
+async def test_websocket_stats(hass, hass_ws_client):
+    """Test the recorder metrics are returned over the websocket API."""
+    with patch("homeassistant.components.recorder.migration.migrate_schema"):
+        assert await async_setup_component(
+            hass, "recorder", {"recorder": {"db_url": "sqlite://"}}
+        )
+
+    client = await hass_ws_client(hass)
+    await client.send_json({"id": 5, "type": "recorder/stats"})
+    response = await client.receive_json()
+    assert response["success"]
+    assert set(response["result"]) == {
+        *hass.data[DATA_INSTANCE].stats,
+        "current_queue_depth",
+    }
+    assert response["result"]["max_queue_depth"] >= 0
+
+
+async def test_websocket_stats_admin_only(hass, hass_ws_client, hass_admin_user):
+    """Test the recorder metrics are only returned to admins."""
+    hass_admin_user.groups = []
+    with patch("homeassistant.components.recorder.migration.migrate_schema"):
+        assert await async_setup_component(
+            hass, "recorder", {"recorder": {"db_url": "sqlite://"}}
+        )
+
+    client = await hass_ws_client(hass)
+    await client.send_json({"id": 5, "type": "recorder/stats"})
+    response = await client.receive_json()
+    assert not response["success"]
+    assert response["error"]["code"] == "unauthorized"
@@ -0,0 +1,95 @@
+"""Test loading the states of several entities together."""
+import asyncio
+from datetime import timedelta
+import unittest
+from unittest.mock import patch
+
+from homeassistant.components.recorder import preload
+from homeassistant.components.recorder.const import DATA_INSTANCE
+from homeassistant.util.async_ import run_coroutine_threadsafe
+import homeassistant.util.dt as dt_util
+from tests.common import get_test_home_assistant, init_recorder_component
+
+
+class TestPreload(unittest.TestCase):
+    """Test preloading recorded states."""
+
+    def setUp(self):  # pylint: disable=invalid-name
+        """Set up things to be run when tests are started."""
+        self.hass = get_test_home_assistant()
+        init_recorder_component(self.hass)
+        self.hass.start()
+        self.instance = self.hass.data[DATA_INSTANCE]
+
+    def tearDown(self):  # pylint: disable=invalid-name
+        """Stop everything that was started."""
+        self.hass.stop()
+
+    def _set_state(self, point_in_time, entity_id, state, attributes=None):
+        """Record a state as if it was set at point_in_time."""
+        with patch(
+            "homeassistant.components.recorder.dt_util.utcnow",
+            return_value=point_in_time,
+        ), patch("homeassistant.core.dt_util.utcnow", return_value=point_in_time):
+            self.hass.states.set(entity_id, state, attributes)
+            self.hass.block_till_done()
+            self.instance.block_till_done()
+
+    def test_get_preload_states(self):
+        """Test the states of each request are queried together."""
+        start = dt_util.utcnow() - timedelta(minutes=10)
+        for minute in range(5):
+            point_in_time = start + timedelta(minutes=minute)
+            self._set_state(point_in_time, "sensor.one", str(minute))
+            self._set_state(point_in_time, "sensor.two", str(minute * 10))
+        # An update of only the attributes
+        self._set_state(
+            start + timedelta(minutes=5), "sensor.one", "4", {"updated": True}
+        )
+
+        requests = [
+            ("sensor.one", 2, None, True),
+            ("sensor.one", 2, None, False),
+            ("sensor.two", None, start + timedelta(minutes=2, seconds=30), True),
+            ("sensor.two", 2, start + timedelta(minutes=3, seconds=30), True),
+            ("sensor.missing", 5, None, True),
+        ]
+        with patch.object(
+            preload, "_preload_query", wraps=preload._preload_query
+        ) as query_mock, patch.object(preload, "PRELOAD_MAX_REQUESTS", 3):
+            results = preload.get_preload_states(self.hass, requests)
+
+        assert query_mock.call_count == 2
+        assert [[state.state for state in states] for states in results] == [
+            ["3", "4"],
+            ["4", "4"],
+            ["30", "40"],
+            ["40"],
+            [],
+        ]
+        assert results[1][-1].attributes == {"updated": True}
+
+    def test_async_preload_states(self):
+        """Test requests made at the same time are loaded in one job."""
+        start = dt_util.utcnow() - timedelta(minutes=10)
+        for minute in range(3):
+            point_in_time = start + timedelta(minutes=minute)
+            self._set_state(point_in_time, "sensor.one", str(minute))
+            self._set_state(point_in_time, "sensor.two", str(minute * 10))
+
+        async def preload_both():
+            """Request the states of both sensors."""
+            return await asyncio.gather(
+                preload.async_preload_states(self.hass, "sensor.one", 1),
+                preload.async_preload_states(self.hass, "SENSOR.TWO", start_time=start),
+            )
+
+        with patch.object(
+            preload, "get_preload_states", wraps=preload.get_preload_states
+        ) as get_mock:
+            one, two = run_coroutine_threadsafe(preload_both(), self.hass.loop).result()
+
+        assert get_mock.call_count == 1
+        assert [state.state for state in one] == ["2"]
+        # States updated at start_time are included
+        assert [state.state for state in two] == ["0", "10", "20"]
@@ -7,7 +7,7 @@ from unittest.mock import patch
 from homeassistant.components import recorder
 from homeassistant.components.recorder.const import DATA_INSTANCE
 from homeassistant.components.recorder.purge import purge_old_data
-from homeassistant.components.recorder.models import States, Events
+from homeassistant.components.recorder.models import States, StateAttributes, Events
 from homeassistant.components.recorder.util import session_scope
 from tests.common import get_test_home_assistant, init_recorder_component
 
@@ -106,6 +106,22 @@ class TestRecorderPurge(unittest.TestCase):
             # we should only have 2 states left after purging
             assert states.count() == 2
 
+    def test_purge_unused_attributes(self):
+        """Test deleting attributes no state refers to anymore."""
+        self.hass.states.set("test.recorder", "on", {"test_attr": 5})
+        self.hass.states.set("test.recorder", "off", {"test_attr": 6})
+        self.hass.block_till_done()
+        self.hass.data[DATA_INSTANCE].block_till_done()
+
+        with session_scope(hass=self.hass) as session:
+            session.query(States).filter_by(state="on").delete()
+
+        purge_old_data(self.hass.data[DATA_INSTANCE], 4, repack=False)
+
+        with session_scope(hass=self.hass) as session:
+            attributes = [attr.shared_attrs for attr in session.query(StateAttributes)]
+            assert attributes == ['{"test_attr": 6}']
+
     def test_purge_old_events(self):
         """Test deleting old events."""
         self._add_test_events()
@@ -120,6 +136,102 @@ class TestRecorderPurge(unittest.TestCase):
             # we should only have 2 events left
             assert events.count() == 2
 
+    def test_purge_old_states_in_batches(self):
+        """Test deleting old states takes several steps."""
+        self._add_test_states()
+        instance = self.hass.data[DATA_INSTANCE]
+
+        with session_scope(hass=self.hass) as session, patch(
+            "homeassistant.components.recorder.purge.PURGE_BATCH_SIZE", 2
+        ):
+            states = session.query(States)
+
+            assert not purge_old_data(instance, 4, repack=False)
+            assert states.count() == 4
+            assert not purge_old_data(instance, 4, repack=False)
+            assert states.count() == 2
+            assert purge_old_data(instance, 4, repack=False)
+            assert states.count() == 2
+
+        assert instance.stats["rows_purged"] >= 4
+
+    def test_purge_keeps_events_of_states(self):
+        """Test events are not purged before the states referring to them."""
+        now = datetime.now()
+        instance = self.hass.data[DATA_INSTANCE]
+        self.hass.block_till_done()
+        instance.block_till_done()
+
+        with session_scope(hass=self.hass) as session:
+            events = [
+                Events(
+                    event_type="EVENT_TEST_PURGE",
+                    origin="LOCAL",
+                    time_fired=now - timedelta(days=days),
+                )
+                for days in (11, 10)
+            ]
+            session.add_all(events)
+            session.flush()
+            # The states are purged in the reverse order of their events
+            for event, days in zip(reversed(events), (11, 10)):
+                timestamp = now - timedelta(days=days)
+                session.add(
+                    States(
+                        entity_id="test.recorder2",
+                        domain="sensor",
+                        state="purgeme",
+                        last_changed=timestamp,
+                        last_updated=timestamp,
+                        event_id=event.event_id,
+                    )
+                )
+
+        def assert_events_of_states_kept():
+            """Assert every state still refers to an existing event."""
+            with session_scope(hass=self.hass) as session:
+                for state in session.query(States).filter_by(state="purgeme"):
+                    assert (
+                        session.query(Events).filter_by(event_id=state.event_id).count()
+                        == 1
+                    )
+
+        with patch("homeassistant.components.recorder.purge.PURGE_BATCH_SIZE", 1):
+            while not purge_old_data(instance, 4, repack=False):
+                assert_events_of_states_kept()
+
+        with session_scope(hass=self.hass) as session:
+            assert session.query(States).filter_by(state="purgeme").count() == 0
+            assert (
+                session.query(Events).filter_by(event_type="EVENT_TEST_PURGE").count()
+                == 0
+            )
+
+    def test_purge_method_in_batches(self):
+        """Test the purge service keeps going until all data is purged."""
+        self._add_test_states()
+
+        with patch("homeassistant.components.recorder.purge.PURGE_BATCH_SIZE", 1):
+            self.hass.services.call("recorder", "purge", service_data={"keep_days": 4})
+            self.hass.block_till_done()
+            self.hass.data[DATA_INSTANCE].block_till_done()
+
+        with session_scope(hass=self.hass) as session:
+            assert session.query(States).count() == 2
+
+    def test_repack_method(self):
+        """Test the repack service without deleting anything."""
+        self._add_test_states()
+
+        with patch("homeassistant.components.recorder.purge._LOGGER") as mock_logger:
+            self.hass.services.call("recorder", "repack")
+            self.hass.block_till_done()
+            self.hass.data[DATA_INSTANCE].block_till_done()
+
+        assert mock_logger.debug.mock_calls[0][1][0] == "Vacuuming SQLite to free space"
+        with session_scope(hass=self.hass) as session:
+            assert session.query(States).count() == 6
+
     def test_purge_method(self):
         """Test purge method."""
         service_data = {"keep_days": 4}
@@ -173,6 +285,6 @@ class TestRecorderPurge(unittest.TestCase):
                 self.hass.block_till_done()
                 self.hass.data[DATA_INSTANCE].block_till_done()
                 assert (
-                    mock_logger.debug.mock_calls[3][1][0]
+                    mock_logger.debug.mock_calls[5][1][0]
                     == "Vacuuming SQLite to free space"
                 )
@@ -0,0 +1,92 @@
+"""Test the snapshots of the latest states."""
+from datetime import timedelta
+from operator import attrgetter
+import unittest
+from unittest.mock import patch
+
+from homeassistant.components import history
+from homeassistant.components.recorder import SnapshotTask
+from homeassistant.components.recorder.const import DATA_INSTANCE
+from homeassistant.components.recorder.models import SnapshotStates, StateSnapshots
+from homeassistant.components.recorder.snapshot import create_snapshot, states_at
+from homeassistant.components.recorder.util import session_scope
+import homeassistant.util.dt as dt_util
+from tests.common import get_test_home_assistant, init_recorder_component
+
+
+class TestSnapshot(unittest.TestCase):
+    """Test storing and using state snapshots."""
+
+    def setUp(self):  # pylint: disable=invalid-name
+        """Set up things to be run when tests are started."""
+        self.hass = get_test_home_assistant()
+        init_recorder_component(self.hass)
+        self.hass.start()
+        self.instance = self.hass.data[DATA_INSTANCE]
+
+    def tearDown(self):  # pylint: disable=invalid-name
+        """Stop everything that was started."""
+        self.hass.stop()
+
+    def _set_states(self, point_in_time, states):
+        """Record states as if they were set at point_in_time."""
+        with patch(
+            "homeassistant.components.recorder.dt_util.utcnow",
+            return_value=point_in_time,
+        ):
+            for entity_id, state in states:
+                self.hass.states.set(entity_id, state)
+            self.hass.block_till_done()
+            self.instance.block_till_done()
+
+    def _snapshot(self, point_in_time):
+        """Store a snapshot at point_in_time."""
+        with session_scope(hass=self.hass) as session:
+            create_snapshot(session, self.instance.run_info.start, point_in_time)
+
+    def test_get_states_with_snapshots(self):
+        """Test the states at a point in time are the same with snapshots."""
+        one = dt_util.utcnow() + timedelta(seconds=1)
+        two = one + timedelta(seconds=1)
+        three = two + timedelta(seconds=1)
+        four = three + timedelta(seconds=1)
+
+        self._set_states(one, [("light.kitchen", "on"), ("light.hall", "on")])
+        self._set_states(two, [("light.kitchen", "off"), ("switch.fan", "on")])
+        self._set_states(three, [("light.hall", "off")])
+
+        expected = {
+            point_in_time: history.get_states(self.hass, point_in_time)
+            for point_in_time in (two, three, four)
+        }
+
+        self._snapshot(two)
+        self._snapshot(three)
+        with session_scope(hass=self.hass) as session:
+            assert session.query(StateSnapshots).count() == 2
+            assert session.query(SnapshotStates).count() == 5
+            _, snapshot_query = states_at(session, self.instance.run_info.start, four)
+            assert snapshot_query is not None
+
+        key = attrgetter("entity_id")
+        for point_in_time, states in expected.items():
+            assert sorted(
+                history.get_states(self.hass, point_in_time), key=key
+            ) == sorted(states, key=key)
+
+        filters = history.Filters()
+        filters.included_domains = ["light"]
+        assert sorted(
+            state.state
+            for state in history.get_states(self.hass, four, filters=filters)
+        ) == ["off", "off"]
+
+    def test_snapshot_task(self):
+        """Test the recorder stores snapshots when asked."""
+        self._set_states(dt_util.utcnow(), [("light.kitchen", "on")])
+        self.instance.queue.put(SnapshotTask(dt_util.utcnow()))
+        self.instance.block_till_done()
+
+        with session_scope(hass=self.hass) as session:
+            assert session.query(StateSnapshots).count() == 1
+            assert session.query(SnapshotStates).count() == 1
@@ -0,0 +1,203 @@
+"""Test the long term statistics."""
+from datetime import datetime, timedelta
+import json
+import unittest
+
+from homeassistant.components.recorder.const import DATA_INSTANCE
+from homeassistant.components.recorder.models import States, Statistics
+from homeassistant.components.recorder.statistics import (
+    PERIOD_DAY,
+    PERIOD_HOUR,
+    compile_statistics,
+    compiled_until,
+    statistics_during_period,
+)
+from homeassistant.components.recorder.util import session_scope
+import homeassistant.util.dt as dt_util
+from tests.common import get_test_home_assistant, init_recorder_component
+
+DAY = datetime(2019, 8, 1, tzinfo=dt_util.UTC)
+
+
+class TestStatistics(unittest.TestCase):
+    """Test compiling and reading statistics."""
+
+    def setUp(self):  # pylint: disable=invalid-name
+        """Set up things to be run when tests are started."""
+        self.hass = get_test_home_assistant()
+        init_recorder_component(self.hass)
+        self.hass.start()
+        self.hass.block_till_done()
+        self.hass.data[DATA_INSTANCE].block_till_done()
+
+    def tearDown(self):  # pylint: disable=invalid-name
+        """Stop everything that was started."""
+        self.hass.stop()
+
+    def _add_test_states(self):
+        """Add states of numeric and other sensors in the last two hours of DAY."""
+        temperature = json.dumps({"unit_of_measurement": "°C"})
+        states = [
+            ("sensor.temperature", "10", temperature, 22, 10),
+            ("sensor.temperature", "20", temperature, 22, 40),
+            ("sensor.temperature", "30", temperature, 23, 5),
+            ("sensor.temperature", "unavailable", temperature, 23, 10),
+            ("sensor.no_unit", "5", "{}", 22, 15),
+            ("sensor.text", "on", temperature, 22, 20),
+        ]
+        with session_scope(hass=self.hass) as session:
+            for entity_id, state, attributes, hour, minute in states:
+                timestamp = DAY.replace(hour=hour, minute=minute)
+                session.add(
+                    States(
+                        entity_id=entity_id,
+                        domain="sensor",
+                        state=state,
+                        attributes=attributes,
+                        last_changed=timestamp,
+                        last_updated=timestamp,
+                    )
+                )
+
+    def _statistics(self, period):
+        """Return the statistics of a period as tuples."""
+        with session_scope(hass=self.hass) as session:
+            return [
+                (
+                    dt_util.as_utc(stat.start),
+                    stat.entity_id,
+                    stat.unit_of_measurement,
+                    stat.mean,
+                    stat.min,
+                    stat.max,
+                    stat.last,
+                    stat.count,
+                )
+                for stat in session.query(Statistics)
+                .filter_by(period=period)
+                .order_by(Statistics.start)
+            ]
+
+    def test_compile_statistics(self):
+        """Test compiling the hours and the day of numeric sensors."""
+        self._add_test_states()
+        instance = self.hass.data[DATA_INSTANCE]
+        end = DAY + timedelta(days=1, minutes=30)
+
+        assert compiled_until(self.hass, PERIOD_HOUR) is None
+
+        # The means are weighted by how long each value was held
+        assert not compile_statistics(instance, end)
+        assert self._statistics(PERIOD_HOUR) == [
+            (
+                DAY.replace(hour=22),
+                "sensor.temperature",
+                "°C",
+                14.0,
+                10.0,
+                20.0,
+                20.0,
+                2,
+            )
+        ]
+        assert self._statistics(PERIOD_DAY) == []
+        assert compiled_until(self.hass, PERIOD_HOUR) == DAY.replace(hour=23)
+        assert compiled_until(self.hass, PERIOD_DAY) == DAY
+
+        # 20 is held until 23:05, 30 until the sensor is unavailable at 23:10
+        assert compile_statistics(instance, end)
+        assert self._statistics(PERIOD_HOUR)[1] == (
+            DAY.replace(hour=23),
+            "sensor.temperature",
+            "°C",
+            25.0,
+            20.0,
+            30.0,
+            None,
+            1,
+        )
+        # The day weighs both hours with a value the same
+        assert self._statistics(PERIOD_DAY) == [
+            (DAY, "sensor.temperature", "°C", 19.5, 10.0, 30.0, None, 3)
+        ]
+        assert compiled_until(self.hass, PERIOD_DAY) == DAY + timedelta(days=1)
+
+        # Nothing left to compile
+        assert compile_statistics(instance, end)
+        assert len(self._statistics(PERIOD_HOUR)) == 2
+
+    def test_compile_statistics_carried_value(self):
+        """Test sensors holding a value get statistics for every hour."""
+        temperature = json.dumps({"unit_of_measurement": "°C"})
+        with session_scope(hass=self.hass) as session:
+            for state, minute in (("10", 0), ("20", 30)):
+                timestamp = DAY.replace(hour=1, minute=minute)
+                session.add(
+                    States(
+                        entity_id="sensor.temperature",
+                        domain="sensor",
+                        state=state,
+                        attributes=temperature,
+                        last_changed=timestamp,
+                        last_updated=timestamp,
+                    )
+                )
+        instance = self.hass.data[DATA_INSTANCE]
+        end = DAY + timedelta(days=2)
+        while not compile_statistics(instance, end):
+            pass
+
+        hours = self._statistics(PERIOD_HOUR)
+        assert len(hours) == 47
+        assert hours[0] == (
+            DAY.replace(hour=1),
+            "sensor.temperature",
+            "°C",
+            15.0,
+            10.0,
+            20.0,
+            20.0,
+            2,
+        )
+        # The value is carried into the next day without changes
+        assert hours[-1] == (
+            DAY + timedelta(days=1, hours=23),
+            "sensor.temperature",
+            "°C",
+            20.0,
+            20.0,
+            20.0,
+            20.0,
+            0,
+        )
+        assert self._statistics(PERIOD_DAY) == [
+            (DAY, "sensor.temperature", "°C", 455 / 23, 10.0, 20.0, 20.0, 2),
+            (
+                DAY + timedelta(days=1),
+                "sensor.temperature",
+                "°C",
+                20.0,
+                20.0,
+                20.0,
+                20.0,
+                0,
+            ),
+        ]
+
+    def test_statistics_during_period(self):
+        """Test reading the statistics of a period."""
+        self._add_test_states()
+        instance = self.hass.data[DATA_INSTANCE]
+        while not compile_statistics(instance, DAY + timedelta(days=1)):
+            pass
+
+        stats = statistics_during_period(
+            self.hass, DAY.replace(hour=23), None, PERIOD_HOUR
+        )
+        assert list(stats) == ["sensor.temperature"]
+        assert [stat.mean for stat in stats["sensor.temperature"]] == [25.0]
+
+        stats = statistics_during_period(
+            self.hass, DAY, DAY + timedelta(days=1), PERIOD_DAY, ["sensor.other"]
+        )
+        assert stats == {}
@@ -1,11 +1,16 @@
 """The test for the statistics sensor platform."""
+from collections import deque
 import unittest
 import statistics
 
 import pytest
 
 from homeassistant.setup import setup_component
-from homeassistant.components.statistics.sensor import StatisticsSensor
+from homeassistant.components.statistics.sensor import (
+    RECOMPUTE_MIN_REMOVED,
+    RollingStatistics,
+    StatisticsSensor,
+)
 from homeassistant.const import ATTR_UNIT_OF_MEASUREMENT, TEMP_CELSIUS, STATE_UNKNOWN
 from homeassistant.util import dt as dt_util
 from tests.common import get_test_home_assistant
@@ -102,6 +107,36 @@ class TestStatisticsSensor(unittest.TestCase):
         assert self.change == state.attributes.get("change")
         assert self.average_change == state.attributes.get("average_change")
 
+    def test_sensor_source_not_finite(self):
+        """Test values that are not finite are left out."""
+        assert setup_component(
+            self.hass,
+            "sensor",
+            {
+                "sensor": {
+                    "platform": "statistics",
+                    "name": "test",
+                    "entity_id": "sensor.test_monitored",
+                }
+            },
+        )
+
+        self.hass.start()
+        self.hass.block_till_done()
+
+        for value in self.values + ["nan", "inf"]:
+            self.hass.states.set(
+                "sensor.test_monitored", value, {ATTR_UNIT_OF_MEASUREMENT: TEMP_CELSIUS}
+            )
+            self.hass.block_till_done()
+
+        state = self.hass.states.get("sensor.test")
+
+        assert str(self.mean) == state.state
+        assert self.max == state.attributes.get("max_value")
+        assert self.variance == state.attributes.get("variance")
+        assert self.count == state.attributes.get("count")
+
     def test_sampling_size(self):
         """Test rotation."""
         assert setup_component(
@@ -363,3 +398,56 @@ class TestStatisticsSensor(unittest.TestCase):
         assert mock_data["return_time"] == state.attributes.get("max_age") + timedelta(
             hours=1
         )
+
+
+def test_rolling_statistics():
+    """Test the rolling statistics match statistics of the whole window."""
+    rolling = RollingStatistics()
+    window = deque()
+    values = [(index * 7919 % 1009) / 7 for index in range(1000)]
+
+    for index, value in enumerate(values):
+        window.append(value)
+        rolling.add(value)
+        # Shrink the window now and then like a purge of old states
+        while len(window) > 50 or (index % 97 == 0 and len(window) > 2):
+            window.popleft()
+            rolling.remove()
+
+        assert list(rolling.values) == list(window)
+        assert rolling.minimum == min(window)
+        assert rolling.maximum == max(window)
+        assert rolling.median == statistics.median(window)
+        assert rolling.total == pytest.approx(sum(window))
+        assert rolling.mean == pytest.approx(statistics.mean(window))
+        if len(window) > 1:
+            assert rolling.variance == pytest.approx(statistics.variance(window))
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        [float(index) for index in range(2000)],
+        [float(-index) for index in range(2000)],
+        [float(index % 5) for index in range(2000)],
+    ],
+)
+def test_rolling_statistics_trends_and_repeats(values):
+    """Test the heaps and deques with trending and repeating values."""
+    rolling = RollingStatistics()
+    window = deque()
+
+    for value in values:
+        window.append(value)
+        rolling.add(value)
+        if len(window) > 50:
+            window.popleft()
+            rolling.remove()
+
+        assert rolling.minimum == min(window)
+        assert rolling.maximum == max(window)
+        assert rolling.median == statistics.median(window)
+
+    # Removed values don't pile up in the heaps
+    # pylint: disable=protected-access
+    assert len(rolling._lower) + len(rolling._upper) <= 2 * 50 + RECOMPUTE_MIN_REMOVED
@@ -10,6 +10,8 @@ import homeassistant.util.dt as dt_util
 from homeassistant.const import EVENT_STATE_CHANGED
 from homeassistant.setup import async_setup_component
 
+from tests.common import async_fire_time_changed
+
 
 async def test_setting_rising(hass):
     """Test retrieving sun setting and rising."""
@@ -119,9 +121,7 @@ async def test_state_change(hass):
 
     assert sun.STATE_BELOW_HORIZON == hass.states.get(sun.ENTITY_ID).state
 
-    hass.bus.async_fire(
-        ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: test_time + timedelta(seconds=5)}
-    )
+    async_fire_time_changed(hass, test_time + timedelta(seconds=5))
 
     await hass.async_block_till_done()
 
@@ -186,7 +186,7 @@ async def test_state_change_count(hass):
 
     for _ in range(24 * 60 * 60):
         now += timedelta(seconds=1)
-        hass.bus.async_fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: now})
+        async_fire_time_changed(hass, now)
         await hass.async_block_till_done()
 
     assert len(events) < 721
@@ -458,8 +458,8 @@ async def test_invalid_attribute_template(hass, caplog):
     assert ("Error rendering attribute test_attribute") in caplog.text
 
 
-async def test_no_update_template_match_all(hass, caplog):
-    """Test that we do not update sensors that match on all."""
+async def test_update_template_rendered_states(hass, caplog):
+    """Test that we update sensors on changes of the states they render."""
     hass.states.async_set("binary_sensor.test_sensor", "true")
 
     await setup.async_setup_component(
@@ -488,26 +488,7 @@ async def test_no_update_template_match_all(hass, caplog):
     )
     await hass.async_block_till_done()
     assert len(hass.states.async_all()) == 5
-    assert (
-        "Template binary sensor all_state has no entity ids "
-        "configured to track nor were we able to extract the entities to "
-        "track from the value template"
-    ) in caplog.text
-    assert (
-        "Template binary sensor all_icon has no entity ids "
-        "configured to track nor were we able to extract the entities to "
-        "track from the icon template"
-    ) in caplog.text
-    assert (
-        "Template binary sensor all_entity_picture has no entity ids "
-        "configured to track nor were we able to extract the entities to "
-        "track from the entity_picture template"
-    ) in caplog.text
-    assert (
-        "Template binary sensor all_attribute has no entity ids "
-        "configured to track nor were we able to extract the entities to "
-        "track from the test_attribute template"
-    ) in caplog.text
+    assert "has no entity ids configured to track" not in caplog.text
 
     assert hass.states.get("binary_sensor.all_state").state == "off"
     assert hass.states.get("binary_sensor.all_icon").state == "off"
@@ -517,6 +498,17 @@ async def test_no_update_template_match_all(hass, caplog):
     hass.bus.async_fire(EVENT_HOMEASSISTANT_START)
     await hass.async_block_till_done()
 
+    for entity_id, template_name in (
+        ("binary_sensor.all_state", "value"),
+        ("binary_sensor.all_icon", "icon"),
+        ("binary_sensor.all_entity_picture", "entity_picture"),
+        ("binary_sensor.all_attribute", "test_attribute"),
+    ):
+        assert (
+            "Template binary sensor {} has no entity ids configured to track nor"
+            " do its {} template(s) use any states".format(entity_id, template_name)
+        ) in caplog.text
+
     assert hass.states.get("binary_sensor.all_state").state == "on"
     assert hass.states.get("binary_sensor.all_icon").state == "on"
     assert hass.states.get("binary_sensor.all_entity_picture").state == "on"
@@ -526,20 +518,92 @@ async def test_no_update_template_match_all(hass, caplog):
     await hass.async_block_till_done()
 
     assert hass.states.get("binary_sensor.all_state").state == "on"
-    assert hass.states.get("binary_sensor.all_icon").state == "on"
-    assert hass.states.get("binary_sensor.all_entity_picture").state == "on"
-    assert hass.states.get("binary_sensor.all_attribute").state == "on"
+    assert hass.states.get("binary_sensor.all_icon").state == "off"
+    assert hass.states.get("binary_sensor.all_entity_picture").state == "off"
+    assert hass.states.get("binary_sensor.all_attribute").state == "off"
 
-    await hass.helpers.entity_component.async_update_entity("binary_sensor.all_state")
-    await hass.helpers.entity_component.async_update_entity("binary_sensor.all_icon")
-    await hass.helpers.entity_component.async_update_entity(
-        "binary_sensor.all_entity_picture"
+
+async def test_update_template_followed_branches(hass):
+    """Test that the tracked states follow the branches a template renders."""
+    hass.states.async_set("binary_sensor.switch", "off")
+    hass.states.async_set("binary_sensor.first", "off")
+    hass.states.async_set("binary_sensor.second", "off")
+
+    await setup.async_setup_component(
+        hass,
+        "binary_sensor",
+        {
+            "binary_sensor": {
+                "platform": "template",
+                "sensors": {
+                    "branch": {
+                        "value_template": (
+                            "{% if is_state('binary_sensor.switch', 'on') %}"
+                            "{{ is_state('binary_sensor.second', 'on') }}"
+                            "{% else %}"
+                            "{{ is_state('binary_sensor.first', 'on') }}"
+                            "{% endif %}"
+                        )
+                    }
+                },
+            }
+        },
     )
-    await hass.helpers.entity_component.async_update_entity(
-        "binary_sensor.all_attribute"
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_START)
+    await hass.async_block_till_done()
+    assert hass.states.get("binary_sensor.branch").state == "off"
+
+    hass.states.async_set("binary_sensor.first", "on")
+    await hass.async_block_till_done()
+    assert hass.states.get("binary_sensor.branch").state == "on"
+
+    hass.states.async_set("binary_sensor.switch", "on")
+    await hass.async_block_till_done()
+    assert hass.states.get("binary_sensor.branch").state == "off"
+
+    hass.states.async_set("binary_sensor.second", "on")
+    await hass.async_block_till_done()
+    assert hass.states.get("binary_sensor.branch").state == "on"
+
+
+async def test_update_template_rendered_once_per_change(hass):
+    """Test that a state change renders each dependent template once."""
+    hass.states.async_set("sensor.test_state", "off")
+
+    await setup.async_setup_component(
+        hass,
+        "binary_sensor",
+        {
+            "binary_sensor": {
+                "platform": "template",
+                "sensors": {
+                    "test": {
+                        "value_template": "{{ is_state('sensor.test_state', 'on') }}",
+                        "icon_template": "mdi:{{ states('sensor.test_state') }}",
+                        "attribute_templates": {
+                            "other": "{{ states('sensor.other') }}"
+                        },
+                    }
+                },
+            }
+        },
     )
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_START)
+    await hass.async_block_till_done()
 
-    assert hass.states.get("binary_sensor.all_state").state == "on"
-    assert hass.states.get("binary_sensor.all_icon").state == "off"
-    assert hass.states.get("binary_sensor.all_entity_picture").state == "off"
-    assert hass.states.get("binary_sensor.all_attribute").state == "off"
+    with mock.patch.object(
+        template_hlpr.Template,
+        "async_render",
+        side_effect=template_hlpr.Template.async_render,
+        autospec=True,
+    ) as mock_render:
+        hass.states.async_set("sensor.test_state", "on")
+        await hass.async_block_till_done()
+
+    assert sorted(call[1][0].template for call in mock_render.mock_calls) == [
+        "mdi:{{ states('sensor.test_state') }}",
+        "{{ is_state('sensor.test_state', 'on') }}",
+    ]
+    state = hass.states.get("binary_sensor.test")
+    assert state.state == "on"
+    assert state.attributes["icon"] == "mdi:on"
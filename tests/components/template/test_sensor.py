@@ -1,5 +1,8 @@
 """The test for the Template sensor platform."""
+from unittest.mock import patch
+
 from homeassistant.const import EVENT_HOMEASSISTANT_START
+from homeassistant.helpers.template import Template
 from homeassistant.setup import setup_component, async_setup_component
 
 from tests.common import get_test_home_assistant, assert_setup_component
@@ -345,8 +348,8 @@ class TestTemplateSensor:
         assert "device_class" not in state.attributes
 
 
-async def test_no_template_match_all(hass, caplog):
-    """Test that we do not allow sensors that match on all."""
+async def test_template_rendered_states(hass, caplog):
+    """Test that sensors update on changes of the states they render."""
     hass.states.async_set("sensor.test_sensor", "startup")
 
     await async_setup_component(
@@ -375,26 +378,7 @@ async def test_no_template_match_all(hass, caplog):
     )
     await hass.async_block_till_done()
     assert len(hass.states.async_all()) == 5
-    assert (
-        "Template sensor invalid_state has no entity ids "
-        "configured to track nor were we able to extract the entities to "
-        "track from the value template"
-    ) in caplog.text
-    assert (
-        "Template sensor invalid_icon has no entity ids "
-        "configured to track nor were we able to extract the entities to "
-        "track from the icon template"
-    ) in caplog.text
-    assert (
-        "Template sensor invalid_entity_picture has no entity ids "
-        "configured to track nor were we able to extract the entities to "
-        "track from the entity_picture template"
-    ) in caplog.text
-    assert (
-        "Template sensor invalid_friendly_name has no entity ids "
-        "configured to track nor were we able to extract the entities to "
-        "track from the friendly_name template"
-    ) in caplog.text
+    assert "has no entity ids configured to track" not in caplog.text
 
     assert hass.states.get("sensor.invalid_state").state == "unknown"
     assert hass.states.get("sensor.invalid_icon").state == "unknown"
@@ -404,6 +388,17 @@ async def test_no_template_match_all(hass, caplog):
     hass.bus.async_fire(EVENT_HOMEASSISTANT_START)
     await hass.async_block_till_done()
 
+    for entity_id, template_name in (
+        ("sensor.invalid_state", "value"),
+        ("sensor.invalid_icon", "icon"),
+        ("sensor.invalid_entity_picture", "entity_picture"),
+        ("sensor.invalid_friendly_name", "friendly_name"),
+    ):
+        assert (
+            "Template sensor {} has no entity ids configured to track nor do its"
+            " {} template(s) use any states".format(entity_id, template_name)
+        ) in caplog.text
+
     assert hass.states.get("sensor.invalid_state").state == "2"
     assert hass.states.get("sensor.invalid_icon").state == "startup"
     assert hass.states.get("sensor.invalid_entity_picture").state == "startup"
@@ -413,20 +408,86 @@ async def test_no_template_match_all(hass, caplog):
     await hass.async_block_till_done()
 
     assert hass.states.get("sensor.invalid_state").state == "2"
-    assert hass.states.get("sensor.invalid_icon").state == "startup"
-    assert hass.states.get("sensor.invalid_entity_picture").state == "startup"
-    assert hass.states.get("sensor.invalid_friendly_name").state == "startup"
+    assert hass.states.get("sensor.invalid_icon").state == "hello"
+    assert hass.states.get("sensor.invalid_entity_picture").state == "hello"
+    assert hass.states.get("sensor.invalid_friendly_name").state == "hello"
+
+
+async def test_template_domain_iteration(hass):
+    """Test that sensors update when entities are added to iterated domains."""
+    hass.states.async_set("light.kitchen", "on")
 
-    await hass.helpers.entity_component.async_update_entity("sensor.invalid_state")
-    await hass.helpers.entity_component.async_update_entity("sensor.invalid_icon")
-    await hass.helpers.entity_component.async_update_entity(
-        "sensor.invalid_entity_picture"
+    await async_setup_component(
+        hass,
+        "sensor",
+        {
+            "sensor": {
+                "platform": "template",
+                "sensors": {
+                    "lights": {
+                        "value_template": (
+                            "{{ states.light | selectattr('state', 'eq', 'on') "
+                            "| list | count }}"
+                        )
+                    }
+                },
+            }
+        },
     )
-    await hass.helpers.entity_component.async_update_entity(
-        "sensor.invalid_friendly_name"
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_START)
+    await hass.async_block_till_done()
+    assert hass.states.get("sensor.lights").state == "1"
+
+    hass.states.async_set("light.bed", "on")
+    await hass.async_block_till_done()
+    assert hass.states.get("sensor.lights").state == "2"
+
+    hass.states.async_set("light.kitchen", "off")
+    await hass.async_block_till_done()
+    assert hass.states.get("sensor.lights").state == "1"
+
+    hass.states.async_remove("light.bed")
+    await hass.async_block_till_done()
+    assert hass.states.get("sensor.lights").state == "0"
+
+    hass.states.async_set("switch.other", "on")
+    await hass.async_block_till_done()
+    assert hass.states.get("sensor.lights").state == "0"
+
+
+async def test_template_rendered_once_per_change(hass):
+    """Test that a state change renders each dependent template once."""
+    hass.states.async_set("sensor.test_sensor", "startup")
+
+    await async_setup_component(
+        hass,
+        "sensor",
+        {
+            "sensor": {
+                "platform": "template",
+                "sensors": {
+                    "test": {
+                        "value_template": "{{ states('sensor.test_sensor') }}",
+                        "icon_template": "mdi:{{ states('sensor.test_sensor') }}",
+                        "friendly_name_template": "{{ states('sensor.other') }}",
+                    }
+                },
+            }
+        },
     )
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_START)
+    await hass.async_block_till_done()
 
-    assert hass.states.get("sensor.invalid_state").state == "2"
-    assert hass.states.get("sensor.invalid_icon").state == "hello"
-    assert hass.states.get("sensor.invalid_entity_picture").state == "hello"
-    assert hass.states.get("sensor.invalid_friendly_name").state == "hello"
+    with patch.object(
+        Template, "async_render", side_effect=Template.async_render, autospec=True
+    ) as mock_render:
+        hass.states.async_set("sensor.test_sensor", "changed")
+        await hass.async_block_till_done()
+
+    assert sorted(call[1][0].template for call in mock_render.mock_calls) == [
+        "mdi:{{ states('sensor.test_sensor') }}",
+        "{{ states('sensor.test_sensor') }}",
+    ]
+    state = hass.states.get("sensor.test")
+    assert state.state == "changed"
+    assert state.attributes["icon"] == "mdi:changed"
@@ -5,11 +5,14 @@ from datetime import timedelta, datetime
 import pytz
 
 from homeassistant import setup
-import homeassistant.core as ha
 from homeassistant.const import STATE_OFF, STATE_ON
 import homeassistant.util.dt as dt_util
 from homeassistant.setup import setup_component
-from tests.common import get_test_home_assistant, assert_setup_component
+from tests.common import (
+    assert_setup_component,
+    fire_time_changed,
+    get_test_home_assistant,
+)
 from homeassistant.helpers.sun import get_astral_event_date, get_astral_event_next
 
 
@@ -126,9 +129,7 @@ class TestBinarySensorTod(unittest.TestCase):
             return_value=test_time + timedelta(hours=1),
         ):
 
-            self.hass.bus.fire(
-                ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: test_time + timedelta(hours=1)}
-            )
+            fire_time_changed(self.hass, test_time + timedelta(hours=1))
 
             self.hass.block_till_done()
             state = self.hass.states.get("binary_sensor.night")
@@ -183,7 +184,7 @@ class TestBinarySensorTod(unittest.TestCase):
             return_value=switchover_time,
         ):
 
-            self.hass.bus.fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: switchover_time})
+            fire_time_changed(self.hass, switchover_time)
             self.hass.block_till_done()
             state = self.hass.states.get("binary_sensor.night")
             assert state.state == STATE_ON
@@ -193,9 +194,8 @@ class TestBinarySensorTod(unittest.TestCase):
             return_value=switchover_time + timedelta(minutes=1, seconds=1),
         ):
 
-            self.hass.bus.fire(
-                ha.EVENT_TIME_CHANGED,
-                {ha.ATTR_NOW: switchover_time + timedelta(minutes=1, seconds=1)},
+            fire_time_changed(
+                self.hass, switchover_time + timedelta(minutes=1, seconds=1)
             )
 
             self.hass.block_till_done()
@@ -241,7 +241,7 @@ class TestBinarySensorTod(unittest.TestCase):
             return_value=testtime,
         ):
 
-            self.hass.bus.fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: testtime})
+            fire_time_changed(self.hass, testtime)
             self.hass.block_till_done()
 
             state = self.hass.states.get(entity_id)
@@ -253,7 +253,7 @@ class TestBinarySensorTod(unittest.TestCase):
             return_value=testtime,
         ):
 
-            self.hass.bus.fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: testtime})
+            fire_time_changed(self.hass, testtime)
             self.hass.block_till_done()
 
             state = self.hass.states.get(entity_id)
@@ -267,7 +267,7 @@ class TestBinarySensorTod(unittest.TestCase):
             return_value=testtime,
         ):
 
-            self.hass.bus.fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: testtime})
+            fire_time_changed(self.hass, testtime)
             self.hass.block_till_done()
 
             state = self.hass.states.get(entity_id)
@@ -281,7 +281,7 @@ class TestBinarySensorTod(unittest.TestCase):
             return_value=testtime,
         ):
 
-            self.hass.bus.fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: testtime})
+            fire_time_changed(self.hass, testtime)
             self.hass.block_till_done()
 
             state = self.hass.states.get(entity_id)
@@ -295,7 +295,7 @@ class TestBinarySensorTod(unittest.TestCase):
             return_value=testtime,
         ):
 
-            self.hass.bus.fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: testtime})
+            fire_time_changed(self.hass, testtime)
             self.hass.block_till_done()
 
             state = self.hass.states.get(entity_id)
@@ -337,7 +337,7 @@ class TestBinarySensorTod(unittest.TestCase):
             return_value=testtime,
         ):
 
-            self.hass.bus.fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: testtime})
+            fire_time_changed(self.hass, testtime)
             self.hass.block_till_done()
 
             state = self.hass.states.get(entity_id)
@@ -349,7 +349,7 @@ class TestBinarySensorTod(unittest.TestCase):
             return_value=testtime,
         ):
 
-            self.hass.bus.fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: testtime})
+            fire_time_changed(self.hass, testtime)
             self.hass.block_till_done()
 
             state = self.hass.states.get(entity_id)
@@ -361,7 +361,7 @@ class TestBinarySensorTod(unittest.TestCase):
             return_value=testtime,
         ):
 
-            self.hass.bus.fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: testtime})
+            fire_time_changed(self.hass, testtime)
             self.hass.block_till_done()
 
             state = self.hass.states.get(entity_id)
@@ -373,7 +373,7 @@ class TestBinarySensorTod(unittest.TestCase):
             return_value=testtime,
         ):
 
-            self.hass.bus.fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: testtime})
+            fire_time_changed(self.hass, testtime)
             self.hass.block_till_done()
 
             state = self.hass.states.get(entity_id)
@@ -387,7 +387,7 @@ class TestBinarySensorTod(unittest.TestCase):
             return_value=testtime,
         ):
 
-            self.hass.bus.fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: testtime})
+            fire_time_changed(self.hass, testtime)
             self.hass.block_till_done()
 
             state = self.hass.states.get(entity_id)
@@ -432,7 +432,7 @@ class TestBinarySensorTod(unittest.TestCase):
             "homeassistant.components.tod.binary_sensor.dt_util.utcnow",
             return_value=testtime,
         ):
-            self.hass.bus.fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: testtime})
+            fire_time_changed(self.hass, testtime)
             self.hass.block_till_done()
 
             state = self.hass.states.get(entity_id)
@@ -443,7 +443,7 @@ class TestBinarySensorTod(unittest.TestCase):
             "homeassistant.components.tod.binary_sensor.dt_util.utcnow",
             return_value=testtime,
         ):
-            self.hass.bus.fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: testtime})
+            fire_time_changed(self.hass, testtime)
             self.hass.block_till_done()
 
             state = self.hass.states.get(entity_id)
@@ -454,7 +454,7 @@ class TestBinarySensorTod(unittest.TestCase):
             "homeassistant.components.tod.binary_sensor.dt_util.utcnow",
             return_value=testtime,
         ):
-            self.hass.bus.fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: testtime})
+            fire_time_changed(self.hass, testtime)
             self.hass.block_till_done()
 
             state = self.hass.states.get(entity_id)
@@ -465,7 +465,7 @@ class TestBinarySensorTod(unittest.TestCase):
             "homeassistant.components.tod.binary_sensor.dt_util.utcnow",
             return_value=testtime,
         ):
-            self.hass.bus.fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: testtime})
+            fire_time_changed(self.hass, testtime)
             self.hass.block_till_done()
 
             state = self.hass.states.get(entity_id)
@@ -505,7 +505,7 @@ class TestBinarySensorTod(unittest.TestCase):
             "homeassistant.components.tod.binary_sensor.dt_util.utcnow",
             return_value=testtime,
         ):
-            self.hass.bus.fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: testtime})
+            fire_time_changed(self.hass, testtime)
             self.hass.block_till_done()
 
             state = self.hass.states.get(entity_id)
@@ -553,7 +553,7 @@ class TestBinarySensorTod(unittest.TestCase):
             return_value=testtime,
         ):
 
-            self.hass.bus.fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: testtime})
+            fire_time_changed(self.hass, testtime)
             self.hass.block_till_done()
 
             state = self.hass.states.get(entity_id)
@@ -565,7 +565,7 @@ class TestBinarySensorTod(unittest.TestCase):
             return_value=testtime,
         ):
 
-            self.hass.bus.fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: testtime})
+            fire_time_changed(self.hass, testtime)
             self.hass.block_till_done()
 
             state = self.hass.states.get(entity_id)
@@ -577,7 +577,7 @@ class TestBinarySensorTod(unittest.TestCase):
             return_value=testtime,
         ):
 
-            self.hass.bus.fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: testtime})
+            fire_time_changed(self.hass, testtime)
             self.hass.block_till_done()
 
             state = self.hass.states.get(entity_id)
@@ -591,7 +591,7 @@ class TestBinarySensorTod(unittest.TestCase):
             return_value=testtime,
         ):
 
-            self.hass.bus.fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: testtime})
+            fire_time_changed(self.hass, testtime)
             self.hass.block_till_done()
 
             state = self.hass.states.get(entity_id)
@@ -605,7 +605,7 @@ class TestBinarySensorTod(unittest.TestCase):
             return_value=testtime,
         ):
 
-            self.hass.bus.fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: testtime})
+            fire_time_changed(self.hass, testtime)
             self.hass.block_till_done()
 
             state = self.hass.states.get(entity_id)
@@ -619,7 +619,7 @@ class TestBinarySensorTod(unittest.TestCase):
             return_value=testtime,
         ):
 
-            self.hass.bus.fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: testtime})
+            fire_time_changed(self.hass, testtime)
             self.hass.block_till_done()
 
             state = self.hass.states.get(entity_id)
@@ -668,7 +668,7 @@ class TestBinarySensorTod(unittest.TestCase):
             return_value=testtime,
         ):
 
-            self.hass.bus.fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: testtime})
+            fire_time_changed(self.hass, testtime)
             self.hass.block_till_done()
 
             state = self.hass.states.get(entity_id)
@@ -680,7 +680,7 @@ class TestBinarySensorTod(unittest.TestCase):
             return_value=testtime,
         ):
 
-            self.hass.bus.fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: testtime})
+            fire_time_changed(self.hass, testtime)
             self.hass.block_till_done()
 
             state = self.hass.states.get(entity_id)
@@ -692,7 +692,7 @@ class TestBinarySensorTod(unittest.TestCase):
             return_value=testtime,
         ):
 
-            self.hass.bus.fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: testtime})
+            fire_time_changed(self.hass, testtime)
             self.hass.block_till_done()
 
             state = self.hass.states.get(entity_id)
@@ -706,7 +706,7 @@ class TestBinarySensorTod(unittest.TestCase):
             return_value=testtime,
         ):
 
-            self.hass.bus.fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: testtime})
+            fire_time_changed(self.hass, testtime)
             self.hass.block_till_done()
 
             state = self.hass.states.get(entity_id)
@@ -720,7 +720,7 @@ class TestBinarySensorTod(unittest.TestCase):
             return_value=testtime,
         ):
 
-            self.hass.bus.fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: testtime})
+            fire_time_changed(self.hass, testtime)
             self.hass.block_till_done()
 
             state = self.hass.states.get(entity_id)
@@ -734,7 +734,7 @@ class TestBinarySensorTod(unittest.TestCase):
             return_value=testtime,
         ):
 
-            self.hass.bus.fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: testtime})
+            fire_time_changed(self.hass, testtime)
             self.hass.block_till_done()
 
             state = self.hass.states.get(entity_id)
@@ -783,7 +783,7 @@ class TestBinarySensorTod(unittest.TestCase):
             return_value=testtime,
         ):
 
-            self.hass.bus.fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: testtime})
+            fire_time_changed(self.hass, testtime)
             self.hass.block_till_done()
 
             state = self.hass.states.get(entity_id)
@@ -795,7 +795,7 @@ class TestBinarySensorTod(unittest.TestCase):
             return_value=testtime,
         ):
 
-            self.hass.bus.fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: testtime})
+            fire_time_changed(self.hass, testtime)
             self.hass.block_till_done()
 
             state = self.hass.states.get(entity_id)
@@ -809,7 +809,7 @@ class TestBinarySensorTod(unittest.TestCase):
             return_value=testtime,
         ):
 
-            self.hass.bus.fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: testtime})
+            fire_time_changed(self.hass, testtime)
             self.hass.block_till_done()
 
             state = self.hass.states.get(entity_id)
@@ -823,7 +823,7 @@ class TestBinarySensorTod(unittest.TestCase):
             return_value=testtime,
         ):
 
-            self.hass.bus.fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: testtime})
+            fire_time_changed(self.hass, testtime)
             self.hass.block_till_done()
 
             state = self.hass.states.get(entity_id)
@@ -837,7 +837,7 @@ class TestBinarySensorTod(unittest.TestCase):
             return_value=testtime,
         ):
 
-            self.hass.bus.fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: testtime})
+            fire_time_changed(self.hass, testtime)
             self.hass.block_till_done()
 
             state = self.hass.states.get(entity_id)
@@ -854,7 +854,7 @@ class TestBinarySensorTod(unittest.TestCase):
             return_value=testtime,
         ):
 
-            self.hass.bus.fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: testtime})
+            fire_time_changed(self.hass, testtime)
             self.hass.block_till_done()
 
             state = self.hass.states.get(entity_id)
@@ -1,14 +1,17 @@
 """Tests for WebSocket API commands."""
+import json
+from unittest.mock import Mock, patch
+
 from async_timeout import timeout
 
-from homeassistant.core import callback
+from homeassistant.core import Event, callback
 from homeassistant.components.websocket_api.const import URL
 from homeassistant.components.websocket_api.auth import (
     TYPE_AUTH,
     TYPE_AUTH_OK,
     TYPE_AUTH_REQUIRED,
 )
-from homeassistant.components.websocket_api import const
+from homeassistant.components.websocket_api import const, messages
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.setup import async_setup_component
 
@@ -187,6 +190,54 @@ async def test_subscribe_unsubscribe_events(hass, websocket_client):
     assert sum(hass.bus.async_listeners().values()) == init_count
 
 
+def test_cached_event_message(hass):
+    """Test events are serialized once for the subscriptions of a hass."""
+    event = Event("test_event", {"hello": "world"})
+
+    with patch.object(const, "JSON_DUMP", wraps=const.JSON_DUMP) as dump_mock:
+        first = messages.cached_event_message(hass, 5, event)
+        second = messages.cached_event_message(hass, 6, event)
+        # The cache of another hass instance is kept apart
+        other = messages.cached_event_message(Mock(data={}), 7, event)
+
+    assert dump_mock.call_count == 2
+    assert [json.loads(msg)["id"] for msg in (first, second, other)] == [5, 6, 7]
+    assert json.loads(first)["event"] == json.loads(second)["event"]
+
+
+async def test_subscribe_state_changed_shared_payload(
+    hass, websocket_client, hass_admin_user
+):
+    """Test state changes are sent to each subscription and filtered."""
+    for iden in (5, 6):
+        await websocket_client.send_json(
+            {"id": iden, "type": "subscribe_events", "event_type": "state_changed"}
+        )
+        msg = await websocket_client.receive_json()
+        assert msg["success"]
+
+    hass.states.async_set("light.kitchen", "on")
+
+    with timeout(3):
+        messages = [await websocket_client.receive_json() for _ in range(2)]
+
+    assert [msg["id"] for msg in messages] == [5, 6]
+    assert messages[0]["event"] == messages[1]["event"]
+    assert messages[0]["event"]["data"]["new_state"]["state"] == "on"
+
+    # Changed permissions apply to the existing subscriptions
+    hass_admin_user.mock_policy({"entities": {"entity_ids": {"test.entity": True}}})
+    hass.states.async_set("light.kitchen", "off")
+    hass.states.async_set("test.entity", "hello")
+
+    with timeout(3):
+        messages = [await websocket_client.receive_json() for _ in range(2)]
+
+    assert [msg["id"] for msg in messages] == [5, 6]
+    for msg in messages:
+        assert msg["event"]["data"]["entity_id"] == "test.entity"
+
+
 async def test_get_states(hass, websocket_client):
     """Test get_states command."""
     hass.states.async_set("greeting.hello", "world")
@@ -217,6 +217,7 @@ async def test_removing_config_entries(hass, registry, update_events):
     assert update_events[2]["device_id"] == entry3.id
     assert update_events[3]["action"] == "update"
     assert update_events[3]["device_id"] == entry.id
+    assert update_events[3]["changes"] == ["config_entries"]
     assert update_events[4]["action"] == "remove"
     assert update_events[4]["device_id"] == entry3.id
 
@@ -421,3 +422,49 @@ async def test_loading_race_condition(hass):
 
         mock_load.assert_called_once_with()
         assert results[0] == results[1]
+
+
+async def test_indexes_follow_changes(registry):
+    """Test devices are found by their current identifiers, connections and area."""
+    entry = registry.async_get_or_create(
+        config_entry_id="1234",
+        connections={(device_registry.CONNECTION_NETWORK_MAC, "12:34:56:AB:CD:EF")},
+        identifiers={("hue", "456")},
+    )
+    registry.async_update_device(
+        entry.id, area_id="kitchen", new_identifiers={("hue", "654")}
+    )
+
+    assert registry.async_get_device({("hue", "456")}, set()) is None
+    assert registry.async_get_device({("hue", "654")}, set()).id == entry.id
+    assert (
+        registry.async_get_device(
+            set(), {(device_registry.CONNECTION_NETWORK_MAC, "12:34:56:ab:cd:ef")}
+        ).id
+        == entry.id
+    )
+    assert [device.id for device in registry.async_entries_for_area("kitchen")] == [
+        entry.id
+    ]
+
+    registry.async_clear_area_id("kitchen")
+    assert registry.async_entries_for_area("kitchen") == []
+
+    registry.async_remove_device(entry.id)
+    assert registry.async_get_device({("hue", "654")}, set()) is None
+
+
+async def test_get_device_multiple_matches(registry):
+    """Test the first registered device is returned when several match."""
+    entry1 = registry.async_get_or_create(
+        config_entry_id="1234", identifiers={("bridgeid", "0123")}
+    )
+    entry2 = registry.async_get_or_create(
+        config_entry_id="1234", identifiers={("bridgeid", "4567")}
+    )
+
+    assert (
+        registry.async_get_device({("bridgeid", "4567"), ("bridgeid", "0123")}, set())
+        == entry1
+    )
+    assert registry.async_get_device({("bridgeid", "4567")}, set()) == entry2
@@ -418,3 +418,23 @@ async def test_disabled_by_system_options(registry):
         "light", "hue", "BBBB", config_entry=mock_config, disabled_by="user"
     )
     assert entry2.disabled_by == "user"
+
+
+async def test_indexes_follow_changes(registry):
+    """Test entries are found by their current unique id and device."""
+    entry = registry.async_get_or_create("light", "hue", "5678", device_id="device-1")
+    registry.async_update_entity(entry.entity_id, new_unique_id="1234")
+    updated_entry = registry.async_get_or_create(
+        "light", "hue", "1234", device_id="device-2"
+    )
+
+    assert registry.async_get_entity_id("light", "hue", "5678") is None
+    assert registry.async_get_entity_id("light", "hue", "1234") == entry.entity_id
+    assert entity_registry.async_entries_for_device(registry, "device-1") == []
+    assert entity_registry.async_entries_for_device(registry, "device-2") == [
+        updated_entry
+    ]
+
+    registry.async_remove(entry.entity_id)
+    assert registry.async_get_entity_id("light", "hue", "1234") is None
+    assert entity_registry.async_entries_for_device(registry, "device-2") == []
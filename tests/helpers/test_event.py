@@ -10,8 +10,10 @@ import pytest
 from homeassistant.core import callback
 from homeassistant.setup import async_setup_component
 import homeassistant.core as ha
-from homeassistant.const import MATCH_ALL
+from homeassistant.const import EVENT_TIME_CHANGED, MATCH_ALL
 from homeassistant.helpers.event import (
+    DATA_POINT_IN_TIME_SCHEDULER,
+    DATA_TIME_PATTERN_SCHEDULERS,
     async_call_later,
     async_track_point_in_time,
     async_track_point_in_utc_time,
@@ -20,10 +22,12 @@ from homeassistant.helpers.event import (
     async_track_sunrise,
     async_track_sunset,
     async_track_template,
+    async_track_template_result,
     async_track_time_change,
     async_track_time_interval,
     async_track_utc_time_change,
 )
+from homeassistant.exceptions import TemplateError
 from homeassistant.helpers.template import Template
 from homeassistant.components import sun
 import homeassistant.util.dt as dt_util
@@ -40,14 +44,15 @@ def teardown():
 
 def _send_time_changed(hass, now):
     """Send a time changed event."""
-    hass.bus.async_fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: now})
+    async_fire_time_changed(hass, now)
 
 
 async def test_track_point_in_time(hass):
     """Test track point in time."""
-    before_birthday = datetime(1985, 7, 9, 12, 0, 0, tzinfo=dt_util.UTC)
-    birthday_paulus = datetime(1986, 7, 9, 12, 0, 0, tzinfo=dt_util.UTC)
-    after_birthday = datetime(1987, 7, 9, 12, 0, 0, tzinfo=dt_util.UTC)
+    now = dt_util.utcnow()
+    before_birthday = now + timedelta(days=1)
+    birthday_paulus = now + timedelta(days=2)
+    after_birthday = now + timedelta(days=3)
 
     runs = []
 
@@ -86,6 +91,130 @@ async def test_track_point_in_time(hass):
     assert len(runs) == 2
 
 
+async def test_track_point_in_time_order(hass):
+    """Test due point in time trackers run in order with the event now."""
+    start = dt_util.utcnow() + timedelta(days=1)
+    runs = []
+
+    for seconds in (3, 1, 2, 1):
+        async_track_point_in_utc_time(
+            hass,
+            callback(lambda now, seconds=seconds: runs.append((seconds, now))),
+            start + timedelta(seconds=seconds),
+        )
+
+    unsub = async_track_point_in_utc_time(
+        hass, callback(lambda now: runs.append(None)), start
+    )
+    unsub()
+    unsub()
+
+    # A clock jump runs everything that was skipped over
+    jump = start + timedelta(hours=1)
+    _send_time_changed(hass, jump)
+    await hass.async_block_till_done()
+    assert runs == [(1, jump), (1, jump), (2, jump), (3, jump)]
+    assert hass.data[DATA_POINT_IN_TIME_SCHEDULER]._timer is None
+
+
+async def test_track_point_in_time_from_action(hass):
+    """Test trackers added by an action wait for the next time changed event."""
+    start = dt_util.utcnow() + timedelta(days=1)
+    runs = []
+
+    @callback
+    def action(now):
+        """Track the same point in time again."""
+        runs.append(now)
+        async_track_point_in_utc_time(hass, action, start)
+
+    async_track_point_in_utc_time(hass, action, start)
+
+    _send_time_changed(hass, start)
+    await hass.async_block_till_done()
+    assert len(runs) == 1
+
+    _send_time_changed(hass, start)
+    await hass.async_block_till_done()
+    assert len(runs) == 2
+
+
+async def test_track_point_in_time_raising_action(hass, caplog):
+    """Test an action raising does not stop the other due actions."""
+    start = dt_util.utcnow() + timedelta(days=1)
+    runs = []
+
+    @callback
+    def raising_action(now):
+        """Raise an error."""
+        raise ValueError("Bad action")
+
+    async_track_point_in_utc_time(hass, raising_action, start)
+    async_track_point_in_utc_time(hass, callback(lambda now: runs.append(now)), start)
+
+    _send_time_changed(hass, start)
+    await hass.async_block_till_done()
+    assert runs == [start]
+    assert "Bad action" in caplog.text
+
+
+async def test_track_point_in_time_cancel_many(hass):
+    """Test cancelling many point in time trackers."""
+    start = dt_util.utcnow() + timedelta(days=1)
+    runs = []
+
+    unsubs = [
+        async_track_point_in_utc_time(
+            hass,
+            callback(lambda now, index=index: runs.append(index)),
+            start + timedelta(seconds=index),
+        )
+        for index in range(1000)
+    ]
+    for unsub in unsubs[:-1]:
+        unsub()
+
+    _send_time_changed(hass, start + timedelta(seconds=999))
+    await hass.async_block_till_done()
+    assert runs == [999]
+
+
+async def test_track_point_in_time_timer(hass):
+    """Test point in time trackers run from a loop timer."""
+    runs = []
+
+    async_track_point_in_utc_time(
+        hass,
+        callback(lambda now: runs.append(now)),
+        dt_util.utcnow() + timedelta(milliseconds=10),
+    )
+    assert EVENT_TIME_CHANGED not in hass.bus.async_listeners()
+
+    await asyncio.sleep(0.1)
+    assert len(runs) == 1
+    assert hass.data[DATA_POINT_IN_TIME_SCHEDULER]._timer is None
+
+
+async def test_track_point_in_time_cancel_timer(hass):
+    """Test the loop timer is cancelled once all trackers are cancelled."""
+    start = dt_util.utcnow() + timedelta(days=1)
+
+    unsubs = [
+        async_track_point_in_utc_time(
+            hass, callback(lambda now: None), start + timedelta(seconds=seconds)
+        )
+        for seconds in (2, 1)
+    ]
+    scheduler = hass.data[DATA_POINT_IN_TIME_SCHEDULER]
+    assert scheduler._timer_time == start + timedelta(seconds=1)
+
+    unsubs[1]()
+    assert scheduler._timer is not None
+
+    unsubs[0]()
+    assert scheduler._timer is None
+
+
 async def test_track_state_change(hass):
     """Test track_state_change."""
     # 2 lists to track how often our callbacks get called
@@ -233,6 +362,124 @@ async def test_track_template(hass):
     assert len(wildercard_runs) == 2
 
 
+async def test_track_template_all_states_without_dependencies(hass):
+    """Test tracking a template that doesn't access any state."""
+    runs = []
+
+    template_condition = Template("{{ test == 5 }}", hass)
+
+    @ha.callback
+    def run_callback(entity_id, old_state, new_state):
+        runs.append(entity_id)
+
+    async_track_template(hass, template_condition, run_callback, {"test": 5})
+
+    hass.states.async_set("switch.test", "on")
+    await hass.async_block_till_done()
+
+    assert runs == ["switch.test"]
+
+
+async def test_track_template_result(hass):
+    """Test tracking the states a template renders."""
+    results = []
+
+    template = Template(
+        "{% if is_state('switch.test', 'on') %}"
+        "{{ states('sensor.on') }}"
+        "{% else %}"
+        "{{ states('sensor.off') }}"
+        "{% endif %}",
+        hass,
+    )
+
+    hass.states.async_set("switch.test", "off")
+    hass.states.async_set("sensor.on", "1")
+    hass.states.async_set("sensor.off", "2")
+    await hass.async_block_till_done()
+
+    @ha.callback
+    def result_callback(event, result):
+        results.append((event.data["entity_id"], result))
+
+    unsub = async_track_template_result(hass, template, result_callback)
+
+    hass.states.async_set("sensor.on", "3")
+    await hass.async_block_till_done()
+    assert results == []
+
+    hass.states.async_set("sensor.off", "4")
+    await hass.async_block_till_done()
+    assert results == [("sensor.off", "4")]
+
+    hass.states.async_set("switch.test", "on")
+    await hass.async_block_till_done()
+    assert results[-1] == ("switch.test", "3")
+
+    hass.states.async_set("sensor.off", "5")
+    await hass.async_block_till_done()
+    assert len(results) == 2
+
+    hass.states.async_set("sensor.on", "6")
+    await hass.async_block_till_done()
+    assert results[-1] == ("sensor.on", "6")
+
+    unsub()
+
+    hass.states.async_set("sensor.on", "7")
+    await hass.async_block_till_done()
+    assert len(results) == 3
+
+
+async def test_track_template_result_domain(hass):
+    """Test tracking a template iterating the states of a domain."""
+    results = []
+
+    template = Template("{{ states.light | count }}", hass)
+
+    @ha.callback
+    def result_callback(event, result):
+        results.append(result)
+
+    async_track_template_result(hass, template, result_callback)
+
+    hass.states.async_set("light.kitchen", "on")
+    await hass.async_block_till_done()
+    assert results == ["1"]
+
+    hass.states.async_set("switch.kitchen", "on")
+    await hass.async_block_till_done()
+    assert results == ["1"]
+
+    hass.states.async_set("light.bed", "on")
+    await hass.async_block_till_done()
+    assert results == ["1", "2"]
+
+    hass.states.async_remove("light.kitchen")
+    await hass.async_block_till_done()
+    assert results == ["1", "2", "1"]
+
+
+async def test_track_template_result_error(hass):
+    """Test tracking a template whose render raises."""
+    results = []
+
+    template = Template("{{ states.switch.test.state.missing.attr }}", hass)
+
+    @ha.callback
+    def result_callback(event, result):
+        results.append(result)
+
+    hass.states.async_set("switch.test", "on")
+    async_track_template_result(hass, template, result_callback)
+
+    hass.states.async_set("switch.test", "off")
+    await hass.async_block_till_done()
+
+    assert len(results) == 1
+    assert isinstance(results[0], TemplateError)
+
+
 async def test_track_same_state_simple_trigger(hass):
     """Test track_same_change with trigger simple."""
     thread_runs = []
@@ -736,6 +983,87 @@ async def test_periodic_task_duplicate_time(hass):
     unsub()
 
 
+async def test_periodic_task_raising_action(hass, caplog):
+    """Test a periodic action raising does not stop the other actions."""
+    runs = []
+
+    @callback
+    def raising_action(now):
+        """Raise an error."""
+        raise ValueError("Bad action")
+
+    unsubs = [
+        async_track_utc_time_change(hass, raising_action, second=0),
+        async_track_utc_time_change(
+            hass, callback(lambda now: runs.append(now)), second=0
+        ),
+    ]
+
+    now = datetime(2014, 5, 24, 12, 0, 0, tzinfo=dt_util.UTC)
+    _send_time_changed(hass, now)
+    await hass.async_block_till_done()
+    assert runs == [now]
+    assert "Bad action" in caplog.text
+
+    for unsub in unsubs:
+        unsub()
+
+
+async def test_periodic_task_same_time(hass):
+    """Test periodic tasks matching at the same time."""
+    runs = []
+    unsubs = []
+
+    @callback
+    def first(now):
+        """Run first and stop the second task."""
+        runs.append("first")
+        unsubs[1]()
+
+    unsubs.append(async_track_utc_time_change(hass, first, minute=0, second=0))
+    unsubs.append(
+        async_track_utc_time_change(
+            hass, callback(lambda now: runs.append("second")), minute=0, second=0
+        )
+    )
+    unsubs.append(
+        async_track_utc_time_change(
+            hass, callback(lambda now: runs.append("third")), second=0
+        )
+    )
+
+    _send_time_changed(hass, datetime(2014, 5, 24, 12, 0, 0))
+    await hass.async_block_till_done()
+    assert runs == ["first", "third"]
+
+    _send_time_changed(hass, datetime(2014, 5, 24, 13, 0, 0))
+    await hass.async_block_till_done()
+    assert runs == ["first", "third", "first", "third"]
+
+    unsubs[0]()
+    unsubs[2]()
+    assert hass.data[DATA_TIME_PATTERN_SCHEDULERS][False]._timer is None
+
+
+async def test_periodic_task_timer(hass):
+    """Test periodic tasks run from a loop timer."""
+    runs = []
+    start = (dt_util.utcnow() - timedelta(seconds=1)).replace(microsecond=999000)
+
+    # The first match is the second after start, which already passed
+    with patch("homeassistant.util.dt.utcnow", return_value=start):
+        unsub = async_track_utc_time_change(
+            hass, callback(lambda now: runs.append(now)), second="/1"
+        )
+    assert EVENT_TIME_CHANGED not in hass.bus.async_listeners()
+
+    await asyncio.sleep(0.1)
+    assert len(runs) == 1
+
+    unsub()
+    assert hass.data[DATA_TIME_PATTERN_SCHEDULERS][False]._timer is None
+
+
 async def test_periodic_task_entering_dst(hass):
     """Test periodic task behavior when entering dst."""
     tz = dt_util.get_time_zone("Europe/Vienna")
@@ -4,6 +4,7 @@ import random
 from datetime import datetime
 from unittest.mock import patch
 
+import jinja2
 import pytest
 import pytz
 
@@ -79,6 +80,61 @@ def test_template_equality():
         template.Template(["{{ template_one }}"])
 
 
+def test_compile_cache_shared(hass):
+    """Test compiled code is shared between templates with the same source."""
+    source = "{{ 'shared' ~ states('sensor.compile_cache') }}"
+    stats = template.compile_cache_stats()
+
+    first = template.Template(source, hass)
+    assert first.async_render() == "sharedunknown"
+    assert template.compile_cache_stats()["misses"] == stats["misses"] + 1
+
+    second = template.Template(source, hass)
+    assert second.async_render() == "sharedunknown"
+    assert second._compiled_code is first._compiled_code
+    assert template.compile_cache_stats()["misses"] == stats["misses"] + 1
+    assert template.compile_cache_stats()["hits"] == stats["hits"] + 1
+
+
+def test_compile_cache_eviction():
+    """Test the compile cache evicts the least recently used code."""
+    cache = template.CompileCache(2)
+    env = template.TemplateEnvironment(None)
+
+    first = cache.get(env, "{{ 1 }}")
+    cache.get(env, "{{ 2 }}")
+    assert cache.get(env, "{{ 1 }}") is first
+    cache.get(env, "{{ 3 }}")
+
+    stats = cache.stats()
+    assert stats["size"] == 2
+    assert stats["hits"] == 1
+    assert stats["misses"] == 3
+    assert stats["evictions"] == 1
+    assert stats["compile_time"] > 0
+
+    # {{ 2 }} was least recently used
+    cache.get(env, "{{ 2 }}")
+    assert cache.stats()["misses"] == 4
+    assert cache.get(env, "{{ 3 }}") is not None
+    assert cache.stats()["hits"] == 2
+
+    with pytest.raises(jinja2.TemplateSyntaxError):
+        cache.get(env, "{{")
+    assert cache.stats()["size"] == 2
+
+
+def test_compile_cache_hass_filters(hass):
+    """Test validating hass filters does not depend on the validation order."""
+    source = "{{ 'group.cache_order' | expand }}"
+
+    with pytest.raises(TemplateError):
+        template.Template(source).ensure_valid()
+    template.Template(source, hass).ensure_valid()
+    with pytest.raises(TemplateError):
+        template.Template(source).ensure_valid()
+
+
 def test_invalid_template(hass):
     """Invalid template raises error."""
     tmpl = template.Template("{{", hass)
@@ -465,6 +465,75 @@ class TestEventBus(unittest.TestCase):
         assert len(coroutine_calls) == 1
 
 
+async def test_keyed_event_listener(hass):
+    """Test keyed listeners only receive events for their keys."""
+    calls = []
+
+    @ha.callback
+    def listener(event):
+        """Mock listener."""
+        calls.append(event)
+
+    unsub = hass.bus.async_listen_keyed(
+        "test", "entity_id", ["light.kitchen", "light.bed", "light.kitchen"], listener
+    )
+    assert hass.bus.async_listeners()["test"] == 1
+
+    hass.bus.async_fire("test", {"entity_id": "light.kitchen"})
+    hass.bus.async_fire("test", {"entity_id": "light.hall"})
+    hass.bus.async_fire("test", {"entity_id": ["light.bed"]})
+    hass.bus.async_fire("test")
+    hass.bus.async_fire("other", {"entity_id": "light.bed"})
+    hass.bus.async_fire("test", {"entity_id": "light.bed"})
+    await hass.async_block_till_done()
+
+    assert [event.data["entity_id"] for event in calls] == [
+        "light.kitchen",
+        "light.bed",
+    ]
+
+    unsub()
+    assert "test" not in hass.bus.async_listeners()
+
+    hass.bus.async_fire("test", {"entity_id": "light.kitchen"})
+    await hass.async_block_till_done()
+    assert len(calls) == 2
+
+    # Should do nothing now
+    unsub()
+
+
+async def test_keyed_event_listener_with_plain_listener(hass):
+    """Test keyed and plain listeners of the same event type."""
+    calls = []
+
+    @ha.callback
+    def listener(event):
+        """Mock listener."""
+        calls.append("keyed")
+
+    @ha.callback
+    def plain_listener(event):
+        """Mock listener."""
+        calls.append("plain")
+
+    hass.bus.async_listen("test", plain_listener)
+    unsub = hass.bus.async_listen_keyed("test", "entity_id", ["light.bed"], listener)
+    hass.bus.async_listen_keyed("test", "entity_id", ["light.bed"], listener)
+    assert hass.bus.async_listeners()["test"] == 3
+
+    hass.bus.async_fire("test", {"entity_id": "light.bed"})
+    await hass.async_block_till_done()
+    assert calls == ["plain", "keyed", "keyed"]
+
+    unsub()
+    assert hass.bus.async_listeners()["test"] == 2
+
+    hass.bus.async_fire("test", {"entity_id": "light.bed"})
+    await hass.async_block_till_done()
+    assert calls == ["plain", "keyed", "keyed", "plain", "keyed"]
+
+
 def test_state_init():
     """Test state.init."""
     with pytest.raises(InvalidEntityFormatError):